@@ -101,6 +101,7 @@ except ModuleNotFoundError:
 # シミュレーション設定をインポート
 from .simulation import (
     MONTE_CARLO_ITERATIONS,
+    MONTE_CARLO_BATCH_SIZE, MONTE_CARLO_MAX_ITERATIONS, MONTE_CARLO_CI_WIDTH, MONTE_CARLO_CONFIDENCE,
     EXPECTED_RETURN_STOCK, EXPECTED_RETURN_BOND, EXPECTED_RETURN_BALANCED,
     VOLATILITY_STOCK, VOLATILITY_BOND, VOLATILITY_BALANCED,
     DEFAULT_STOCK_RATIO, DEFAULT_BOND_RATIO,
@@ -149,6 +150,7 @@ __all__ = [
 
     # simulation
     'MONTE_CARLO_ITERATIONS',
+    'MONTE_CARLO_BATCH_SIZE', 'MONTE_CARLO_MAX_ITERATIONS', 'MONTE_CARLO_CI_WIDTH', 'MONTE_CARLO_CONFIDENCE',
     'EXPECTED_RETURN_STOCK', 'EXPECTED_RETURN_BOND', 'EXPECTED_RETURN_BALANCED',
     'VOLATILITY_STOCK', 'VOLATILITY_BOND', 'VOLATILITY_BALANCED',
     'DEFAULT_STOCK_RATIO', 'DEFAULT_BOND_RATIO',
@@ -12,6 +12,12 @@
 
 MONTE_CARLO_ITERATIONS = 10000  # シミュレーション回数
 
+# 適応的シミュレーション（信頼区間の幅が許容値を下回るまでバッチを追加）
+MONTE_CARLO_BATCH_SIZE = 2000  # 1バッチのシミュレーション回数
+MONTE_CARLO_MAX_ITERATIONS = 200000  # シミュレーション回数の上限
+MONTE_CARLO_CI_WIDTH = 1.0  # 達成確率の信頼区間の幅の許容値（%ポイント）
+MONTE_CARLO_CONFIDENCE = 0.95  # 信頼水準
+
 # ===== 期待リターン（年率、%） =====
 
 EXPECTED_RETURN_STOCK = 7.0  # 株式の期待リターン
@@ -42,6 +48,8 @@ if __name__ == '__main__':
     print("="*60)
     print("\n【モンテカルロシミュレーション】")
     print(f"  シミュレーション回数: {MONTE_CARLO_ITERATIONS:,}回")
+    print(f"  適応的シミュレーション: {MONTE_CARLO_BATCH_SIZE:,}回ずつ、上限{MONTE_CARLO_MAX_ITERATIONS:,}回、"
+          f"{MONTE_CARLO_CONFIDENCE:.0%}信頼区間の幅{MONTE_CARLO_CI_WIDTH}%ポイント以下で停止")
 
     print("\n【期待リターン（年率）】")
     print(f"  株式: {EXPECTED_RETURN_STOCK}%")
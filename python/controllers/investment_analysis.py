@@ -25,6 +25,12 @@ from config.personal import (
     MONTHLY_IDECO_2027, MONTHLY_INVESTMENT_2027, WIFE_MONTHLY_NISA,
     EDUCATION_COST
 )
+from config.simulation import (
+    MONTE_CARLO_BATCH_SIZE, MONTE_CARLO_MAX_ITERATIONS, MONTE_CARLO_CI_WIDTH, MONTE_CARLO_CONFIDENCE
+)
+from models.simulation import (
+    CashFlowSchedule, Contribution, LumpSum, ReturnModel, Stream, simulate, simulate_adaptive
+)
 
 # ===== 統計データ（収集した実データ） =====
 
@@ -270,51 +276,49 @@ print("\n" + "="*80)
 print("5. 教育費達成確率のモンテカルロシミュレーション")
 print("="*80)
 
-def monte_carlo_simulation(monthly_investment_2025_2026, monthly_investment_2027_onwards,
-                           target_amount, years, mean_return, volatility, simulations=10000):
-    """モンテカルロシミュレーション"""
-    np.random.seed(42)
-
-    success_count = 0
-    final_values = []
-
-    for _ in range(simulations):
+def education_schedule(monthly_investment_2025_2026, monthly_investment_2027_onwards, mean_return, volatility):
+    """教育費（2038年時点）までのキャッシュフロー・スケジュール"""
+    return CashFlowSchedule([
         # 既存資産の成長（13年後の2038年まで）
-        existing_value = CURRENT_NISA + CURRENT_IDECO + CURRENT_COMPANY_STOCK
-
-        for year in range(13):
-            annual_return = np.random.normal(mean_return, volatility)
-            existing_value *= (1 + annual_return / 100)
-
+        Stream('既存資産', end=13 * 12, periods_per_year=1,
+               flows=[LumpSum(CURRENT_NISA + CURRENT_IDECO + CURRENT_COMPANY_STOCK)]),
         # 新規積立（2025-2026: 2年間）
-        accumulation_2025_2026 = 0
-        for month in range(24):
-            annual_return = np.random.normal(mean_return, volatility)
-            monthly_return = annual_return / 12 / 100
-            accumulation_2025_2026 = (accumulation_2025_2026 + monthly_investment_2025_2026) * (1 + monthly_return)
-
+        Stream('積立2025-2026', end=24, flows=[Contribution(monthly_investment_2025_2026)]),
         # 新規積立（2027-2038: 12年間）
-        accumulation_2027_onwards = 0
-        for month in range(144):
-            annual_return = np.random.normal(mean_return, volatility)
-            monthly_return = annual_return / 12 / 100
-            accumulation_2027_onwards = (accumulation_2027_onwards + monthly_investment_2027_onwards) * (1 + monthly_return)
-
+        Stream('積立2027-2038', start=24, end=168, flows=[Contribution(monthly_investment_2027_onwards)]),
         # 妻NISA（2028-2038: 11年間）
-        wife_accumulation = 0
-        for month in range(132):
-            annual_return = np.random.normal(mean_return, volatility)
-            monthly_return = annual_return / 12 / 100
-            wife_accumulation = (wife_accumulation + WIFE_MONTHLY_NISA) * (1 + monthly_return)
-
-        total_value = existing_value + accumulation_2025_2026 + accumulation_2027_onwards + wife_accumulation
-        final_values.append(total_value)
-
-        if total_value >= target_amount:
-            success_count += 1
+        Stream('妻NISA', start=36, end=168, flows=[Contribution(WIFE_MONTHLY_NISA)]),
+    ], returns=ReturnModel(mean_return, volatility))
 
-    success_rate = (success_count / simulations) * 100
-    return success_rate, final_values
+def monte_carlo_simulation(monthly_investment_2025_2026, monthly_investment_2027_onwards,
+                           target_amount, years, mean_return, volatility, simulations=10000):
+    """
+    モンテカルロシミュレーション
+
+    全パスを行列演算でまとめて評価する（models.simulation）。
+    乱数は従来のループと同じ順序で引くため、seed 42 の結果は従来と一致する。
+    """
+    schedule = education_schedule(monthly_investment_2025_2026, monthly_investment_2027_onwards,
+                                  mean_return, volatility)
+    result = simulate(schedule, simulations, random_state=42)
+    return result.success_rate(target_amount), result.final_values
+
+def adaptive_simulation(monthly_investment_2025_2026, monthly_investment_2027_onwards,
+                        target_amount, mean_return, volatility):
+    """
+    適応的シミュレーション
+
+    達成確率の信頼区間の幅が MONTE_CARLO_CI_WIDTH 以下になるまで
+    MONTE_CARLO_BATCH_SIZE 回ずつ追加する（上限 MONTE_CARLO_MAX_ITERATIONS 回）。
+    """
+    schedule = education_schedule(monthly_investment_2025_2026, monthly_investment_2027_onwards,
+                                  mean_return, volatility)
+    return simulate_adaptive(
+        schedule, target=target_amount,
+        tolerance=MONTE_CARLO_CI_WIDTH, confidence=MONTE_CARLO_CONFIDENCE,
+        batch_size=MONTE_CARLO_BATCH_SIZE, max_simulations=MONTE_CARLO_MAX_ITERATIONS,
+        random_state=42,
+    )
 
 # 教育費達成確率の計算（2038年時点で2,400万円）
 print(f"\n【シミュレーション条件】")
@@ -351,6 +355,13 @@ for pattern_name, monthly_2025_2026, monthly_2027_onwards in [
         print(f"    10%タイル値: {percentile_10:.0f}万円")
         print(f"    90%タイル値: {percentile_90:.0f}万円")
 
+        adaptive = adaptive_simulation(monthly_2025_2026, monthly_2027_onwards, EDUCATION_COST,
+                                       annual_return, volatility)
+        adaptive_lo, adaptive_hi = adaptive.success_interval()
+        print(f"    適応的シミュレーション: 達成確率{adaptive.success_rate(EDUCATION_COST):.1f}% "
+              f"（{MONTE_CARLO_CONFIDENCE:.0%}信頼区間 {adaptive_lo:.1f}〜{adaptive_hi:.1f}%、"
+              f"{adaptive.simulations:,}回{'で収束' if adaptive.converged else '（上限に到達）'}）")
+
         if success_rate >= 90:
             evaluation = "[OK] 非常に高い確率で達成"
         elif success_rate >= 75:
@@ -18,6 +18,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 新しいconfig モジュールからインポート
 from config.personal import CURRENT_AGE, ANNUAL_INCOME_AFTER_TAX, RETIREMENT_AGE, CURRENT_YEAR, RETIREMENT_YEAR
+from models.scoring import ScoreModel, ThresholdRule
 
 # 100-年齢ルールの計算
 STOCK_RATIO_AGE_RULE = 100 - CURRENT_AGE
@@ -706,95 +707,44 @@ dividend_history = {
 
 # ===== 投資判断スコア計算 =====
 
+# 総合投資スコアのルール表（各項目0-100点の重み付き合計）
+# 欠損値は各項目の最低評価として扱う
+INVESTMENT_SCORE_MODEL = ScoreModel(
+    'investment',
+    total='investment_score',
+    rules=[
+        # 1. バリュエーション評価（PERが低いほど高スコア）
+        ThresholdRule('valuation', 'per', [12, 15, 18, 22], [85, 75, 60, 45, 30],
+                      missing=30, weight=0.25),
+        # 2. 成長性評価
+        ThresholdRule('growth', 'earnings_growth_rate', [0, 5, 10, 15], [20, 40, 60, 75, 90],
+                      inclusive=False, missing=20, weight=0.25),
+        # 3. 収益性評価
+        ThresholdRule('profitability', 'operating_profit_margin', [3, 8, 15, 25],
+                      [15, 35, 55, 70, 85], inclusive=False, missing=15, weight=0.20),
+        # 4. 安定性評価（ボラティリティが低いほど高スコア）
+        ThresholdRule('stability', 'volatility_1year', [10, 15, 20, 25], [85, 70, 55, 40, 20],
+                      missing=20, weight=0.20),
+        # 5. 配当評価
+        ThresholdRule('dividend', 'dividend_yield', [0.5, 1.5, 3, 5], [15, 35, 55, 70, 85],
+                      inclusive=False, missing=15, weight=0.10),
+    ],
+)
+
+
 def calculate_investment_score(stock_code):
     """総合投資スコア（0-100点）"""
-    metrics = {
-        'valuation': 0,      # バリュエーション（割安度）
-        'growth': 0,         # 成長性
-        'profitability': 0,  # 収益性
-        'stability': 0,      # 安定性
-        'dividend': 0,       # 配当
+    record = {
+        'per': valuation_metrics[stock_code]['per'],
+        'earnings_growth_rate': earnings_forecast[stock_code]['earnings_growth_rate'],
+        'operating_profit_margin': financial_metrics[stock_code]['operating_profit_margin'],
+        'volatility_1year': risk_metrics[stock_code]['volatility_1year'],
+        'dividend_yield': valuation_metrics[stock_code]['dividend_yield'],
     }
+    scores = INVESTMENT_SCORE_MODEL.score_one(record)
+    metrics = {name: scores[name] for name in INVESTMENT_SCORE_MODEL.rule_names}
 
-    val = valuation_metrics[stock_code]
-    fin = financial_metrics[stock_code]
-    risk = risk_metrics[stock_code]
-
-    # 1. バリュエーション評価（PERが低いほど高スコア）
-    per = val['per']
-    if per < 12:
-        metrics['valuation'] = 85
-    elif per < 15:
-        metrics['valuation'] = 75
-    elif per < 18:
-        metrics['valuation'] = 60
-    elif per < 22:
-        metrics['valuation'] = 45
-    else:
-        metrics['valuation'] = 30
-
-    # 2. 成長性評価
-    growth = earnings_forecast[stock_code]['earnings_growth_rate']
-    if growth > 15:
-        metrics['growth'] = 90
-    elif growth > 10:
-        metrics['growth'] = 75
-    elif growth > 5:
-        metrics['growth'] = 60
-    elif growth > 0:
-        metrics['growth'] = 40
-    else:
-        metrics['growth'] = 20
-
-    # 3. 収益性評価
-    margin = fin['operating_profit_margin']
-    if margin > 25:
-        metrics['profitability'] = 85
-    elif margin > 15:
-        metrics['profitability'] = 70
-    elif margin > 8:
-        metrics['profitability'] = 55
-    elif margin > 3:
-        metrics['profitability'] = 35
-    else:
-        metrics['profitability'] = 15
-
-    # 4. 安定性評価（ボラティリティが低いほど高スコア）
-    volatility = risk['volatility_1year']
-    if volatility < 10:
-        metrics['stability'] = 85
-    elif volatility < 15:
-        metrics['stability'] = 70
-    elif volatility < 20:
-        metrics['stability'] = 55
-    elif volatility < 25:
-        metrics['stability'] = 40
-    else:
-        metrics['stability'] = 20
-
-    # 5. 配当評価
-    div_yield = val['dividend_yield']
-    if div_yield > 5:
-        metrics['dividend'] = 85
-    elif div_yield > 3:
-        metrics['dividend'] = 70
-    elif div_yield > 1.5:
-        metrics['dividend'] = 55
-    elif div_yield > 0.5:
-        metrics['dividend'] = 35
-    else:
-        metrics['dividend'] = 15
-
-    # 総合スコア計算（重み付け）
-    total_score = (
-        metrics['valuation'] * 0.25 +
-        metrics['growth'] * 0.25 +
-        metrics['profitability'] * 0.20 +
-        metrics['stability'] * 0.20 +
-        metrics['dividend'] * 0.10
-    )
-
-    return total_score, metrics
+    return scores['investment_score'], metrics
 
 # ===== レポート生成 =====
 
@@ -9,47 +9,84 @@
 3. 5年以上連続増配（データなし、スキップ）
 """
 
+import os
+import sys
+
 import pandas as pd
-import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.scoring import PredicateIndex, RangeFilter
+from python.models.screening.streaming import TopK, iter_chunks
+
+# 井村氏手法の条件（条件名は PredicateIndex の式で使う）
+IMURA_PREDICATES = {
+    # PERと成長率の両方あり
+    'valid': lambda df: df['pe_ratio'].notna() & df['revenue_growth_3y'].notna(),
+    'growth_per': RangeFilter('成長率÷PER ≧ 1.0', 'growth_per_ratio', min=1.0),
+    # 配当利回りが100倍されている（167.0 = 1.67%）
+    'dividend': RangeFilter('配当利回り ≧ 3%', 'dividend_yield', min=300),
+}
 
 print("="*80)
 print("井村氏手法適用 - 1,091銘柄（売上成長率データ付き）")
 print("="*80)
 
-# CSVを読み込み
+# CSVをチャンク単位で読み込み（TOP30は有界ヒープで保持、
+# 条件はチャンクごとに1回だけ評価してビット列の索引にし、件数はビット演算で求めてチャンクごとに合算）
 input_csv = "./phase1_1100stocks_with_growth.csv"
 print(f"\n📂 読み込み中: {input_csv}")
-df = pd.read_csv(input_csv, encoding='utf-8-sig')
-print(f"✅ 読み込み完了: {len(df)}銘柄")
+
+total = 0
+notna = {'pe_ratio': 0, 'revenue_growth_3y': 0, 'dividend_yield': 0}
+top30 = TopK(30, 'growth_per_ratio')
+counts = dict.fromkeys(['valid', 'valid & growth_per', 'dividend'], 0)
+qualified_parts = []
+
+for df in iter_chunks(input_csv):
+    total += len(df)
+    for column in notna:
+        notna[column] += int(df[column].notna().sum())
+
+    # 成長率÷PERを計算
+    df = df.assign(growth_per_ratio=df['revenue_growth_3y'] / df['pe_ratio'])
+
+    part = PredicateIndex.from_frame(df, IMURA_PREDICATES)
+    for expr in counts:
+        counts[expr] += part.count(expr)
+    top30.update(df[part.mask('valid & growth_per')])
+
+    # 複合条件の該当銘柄のみ保持
+    qualified_parts.append(df[part.mask('valid & growth_per & dividend')])
+
+count_valid = counts['valid']
+count_growth_per = counts['valid & growth_per']
+count_dividend = counts['dividend']
+
+print(f"✅ 読み込み完了: {total}銘柄")
 
 # データ品質チェック
 print(f"\n📊 データ品質:")
-print(f"  PERデータあり: {df['pe_ratio'].notna().sum()}銘柄")
-print(f"  売上成長率（3年平均）あり: {df['revenue_growth_3y'].notna().sum()}銘柄")
-print(f"  配当利回りあり: {df['dividend_yield'].notna().sum()}銘柄")
+print(f"  PERデータあり: {notna['pe_ratio']}銘柄")
+print(f"  売上成長率（3年平均）あり: {notna['revenue_growth_3y']}銘柄")
+print(f"  配当利回りあり: {notna['dividend_yield']}銘柄")
 
-# 成長率÷PERを計算
 print(f"\n🔄 成長率÷PERを計算中...")
-df['growth_per_ratio'] = df['revenue_growth_3y'] / df['pe_ratio']
 
 # 井村氏手法の各基準をチェック
 print(f"\n{'='*80}")
 print("【基準1】成長率÷PER ≧ 1.0")
 print(f"{'='*80}")
 
-valid_data = df[(df['pe_ratio'].notna()) & (df['revenue_growth_3y'].notna())].copy()
-print(f"有効データ: {len(valid_data)}銘柄（PERと成長率の両方あり）")
-
-condition_growth_per = valid_data['growth_per_ratio'] >= 1.0
-count_growth_per = condition_growth_per.sum()
-print(f"✅ 該当銘柄数: {count_growth_per}銘柄 / {len(valid_data)}銘柄")
-print(f"   比率: {count_growth_per/len(valid_data)*100:.1f}%")
+print(f"有効データ: {count_valid}銘柄（PERと成長率の両方あり）")
+print(f"✅ 該当銘柄数: {count_growth_per}銘柄 / {count_valid}銘柄")
+print(f"   比率: {count_growth_per/count_valid*100:.1f}%")
 
 if count_growth_per > 0:
     print(f"\n🏆 成長率÷PER TOP30:")
     print("-"*80)
-    top30 = valid_data[condition_growth_per].nlargest(30, 'growth_per_ratio')
-    for i, row in enumerate(top30.itertuples(), 1):
+    for i, row in enumerate(top30.frame().itertuples(), 1):
         market_flag = "🇯🇵" if row.market == "JP" else "🇺🇸"
         print(f"{i:2d}. {market_flag} {row.ticker:12s} {row.name[:35]:35s} "
               f"成長率{row.revenue_growth_3y:6.1f}% / PER{row.pe_ratio:5.1f} "
@@ -59,27 +96,19 @@ print(f"\n{'='*80}")
 print("【基準2】配当利回り ≧ 3%")
 print(f"{'='*80}")
 
-# 配当利回りが100倍されている（167.0 = 1.67%）
-condition_dividend = df['dividend_yield'] >= 300
-count_dividend = condition_dividend.sum()
-print(f"✅ 該当銘柄数: {count_dividend}銘柄 / {len(df)}銘柄")
-print(f"   比率: {count_dividend/len(df)*100:.1f}%")
+print(f"✅ 該当銘柄数: {count_dividend}銘柄 / {total}銘柄")
+print(f"   比率: {count_dividend/total*100:.1f}%")
 
 print(f"\n{'='*80}")
 print("【複合条件】成長率÷PER ≧ 1.0 AND 配当利回り ≧ 3%")
 print(f"{'='*80}")
 
 # 複合条件
-imura_qualified = df[
-    (df['growth_per_ratio'] >= 1.0) &
-    (df['dividend_yield'] >= 300) &
-    (df['pe_ratio'].notna()) &
-    (df['revenue_growth_3y'].notna())
-].copy()
+imura_qualified = pd.concat(qualified_parts)
 
 count_imura = len(imura_qualified)
-print(f"✅ 井村氏手法該当銘柄: {count_imura}銘柄 / {len(df)}銘柄")
-print(f"   比率: {count_imura/len(df)*100:.1f}%")
+print(f"✅ 井村氏手法該当銘柄: {count_imura}銘柄 / {total}銘柄")
+print(f"   比率: {count_imura/total*100:.1f}%")
 
 if count_imura > 0:
     # 市場別内訳
@@ -88,7 +117,7 @@ if count_imura > 0:
     print(f"  米国株: {len(imura_qualified[imura_qualified['market']=='US'])}銘柄")
 
     # ソート（成長率÷PERの降順）
-    imura_qualified = imura_qualified.sort_values('growth_per_ratio', ascending=False)
+    imura_qualified = imura_qualified.sort_values('growth_per_ratio', ascending=False, kind='stable')
 
     print(f"\n🏆 井村氏手法該当銘柄TOP30:")
     print("-"*80)
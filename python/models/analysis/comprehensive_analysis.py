@@ -13,6 +13,7 @@
 を生成します。
 """
 
+import os
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -20,6 +21,11 @@ import pandas as pd
 import numpy as np
 from collections import Counter, defaultdict
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.screening.streaming import RunningStats, iter_chunks
+
 # CSVファイルの読み込み
 print("=" * 80)
 print("総合投資分析レポート生成")
@@ -27,11 +33,23 @@ print("=" * 80)
 print()
 
 # データ読み込み
+# 全銘柄はチャンク単位で読み込み、パート2の統計のみ逐次集計する（Top300 は全件読み込み）
 print("データを読み込み中...")
-all_stocks = pd.read_csv('phase1_1100stocks_growth_combined.csv', encoding='utf-8-sig')
+all_stocks_count = 0
+market_stats = RunningStats('final_score', group_by='market')
+eval_type_stats = RunningStats('final_score', group_by='evaluation_type')
+three_agent_sector_stats = RunningStats('final_score', group_by='sector')
+has_sector = False
+for chunk in iter_chunks('phase1_1100stocks_growth_combined.csv'):
+    all_stocks_count += len(chunk)
+    market_stats.update(chunk)
+    eval_type_stats.update(chunk)
+    if 'sector' in chunk.columns:
+        has_sector = True
+        three_agent_sector_stats.update(chunk[chunk['evaluation_type'] == '3agent'])
 top300 = pd.read_csv('phase2_growth_top300.csv', encoding='utf-8-sig')
 
-print(f"全銘柄数: {len(all_stocks)}")
+print(f"全銘柄数: {all_stocks_count}")
 print(f"Top300銘柄数: {len(top300)}")
 print()
 
@@ -146,23 +164,22 @@ print()
 
 # 市場別の平均スコア
 print("【市場別平均スコア】")
-market_scores = all_stocks.groupby('market')['final_score'].agg(['mean', 'count', 'std'])
+market_scores = market_stats.frame()
 for market, row in market_scores.iterrows():
     print(f"{market}市場: 平均{row['mean']:.2f}点 (銘柄数: {int(row['count'])}, 標準偏差: {row['std']:.2f})")
 print()
 
 # 評価タイプ別の平均スコア
 print("【評価タイプ別平均スコア】")
-eval_scores = all_stocks.groupby('evaluation_type')['final_score'].agg(['mean', 'count'])
+eval_scores = eval_type_stats.frame()
 for eval_type, row in eval_scores.iterrows():
     print(f"{eval_type}: 平均{row['mean']:.2f}点 (銘柄数: {int(row['count'])})")
 print()
 
 # 3エージェント評価銘柄のセクター分析
 print("【3エージェント評価銘柄のセクター別分析（全1,091銘柄）】")
-three_agent_all = all_stocks[all_stocks['evaluation_type'] == '3agent']
-if len(three_agent_all) > 0 and 'sector' in three_agent_all.columns:
-    sector_analysis = three_agent_all.groupby('sector')['final_score'].agg(['mean', 'count', 'min', 'max'])
+if has_sector and len(three_agent_sector_stats.frame()) > 0:
+    sector_analysis = three_agent_sector_stats.frame()
     sector_analysis = sector_analysis.sort_values('mean', ascending=False)
 
     for sector, row in sector_analysis.iterrows():
@@ -16,56 +16,109 @@
 ※成長率と連続増配年数のデータは含まれていません
 """
 
+import os
+import sys
+
 import pandas as pd
-import numpy as np
 
-def analyze_imura_method(csv_path):
-    """井村氏手法の分析"""
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.scoring import PredicateIndex, RangeFilter
+from python.models.screening.streaming import DEFAULT_CHUNKSIZE, TopK, iter_chunks
+
+# 分析する条件（条件名は PredicateIndex の式で使う）
+# 配当利回りが100倍されている場合を想定 (167.0 = 1.67%)
+IMURA_PREDICATES = {
+    'dividend': RangeFilter('配当利回り ≧ 3%', 'dividend_yield', min=300),
+    'roe': RangeFilter('ROE ≧ 10%', 'roe', min=10.0),
+    'per': RangeFilter('PER 5-20倍', 'pe_ratio', min=5, max=20),
+    'jp': lambda df: df['market'] == 'JP',
+    'us': lambda df: df['market'] == 'US',
+}
+
+
+def analyze_imura_method(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    井村氏手法の分析
+
+    ユニバースはチャンク単位で読み込み、TOP銘柄は有界ヒープ（TopK）で保持する
+    （メモリ使用量は銘柄数によらない）。各条件はチャンクごとに1回だけ評価して
+    ビット列の索引（PredicateIndex）にし、該当数と組み合わせ別の該当数はビット演算で求めて
+    チャンクごとに合算する（全銘柄分の索引は保持しない）。
+    """
     print("="*80)
     print("井村氏手法 - 1,091銘柄分析")
     print("="*80)
 
-    # CSVを読み込み
-    df = pd.read_csv(csv_path, encoding='utf-8-sig')
-
-    print(f"\n📊 総銘柄数: {len(df)}銘柄")
-    print(f"  - 日本株: {len(df[df['market']=='JP'])}銘柄")
-    print(f"  - 米国株: {len(df[df['market']=='US'])}銘柄")
+    # 井村氏基準: 配当利回り≧3% → dividend_yield ≧ 300
+    total = 0
+    notna = {'pe_ratio': 0, 'roe': 0, 'dividend_yield': 0}
+    div_sample = []
+    top_dividend = TopK(20, 'dividend_yield')
+    counts = dict.fromkeys(['jp', 'us', 'dividend', 'roe', 'per', 'dividend & roe',
+                            'dividend & roe & per', 'dividend & jp', 'dividend & us'], 0)
+    labels = {'dividend': '配当≧3%', 'roe': 'ROE≧10%', 'per': 'PER 5-20倍'}
+    combinations = None
+    qualified_b_parts = []
+
+    # CSVをチャンク単位で読み込み
+    for df in iter_chunks(csv_path, chunksize):
+        total += len(df)
+        for column in notna:
+            notna[column] += int(df[column].notna().sum())
+        if len(div_sample) < 10:
+            div_sample += df[df['dividend_yield'].notna()]['dividend_yield'].head(10 - len(div_sample)).tolist()
+
+        part = PredicateIndex.from_frame(df, IMURA_PREDICATES)
+        for expr in counts:
+            counts[expr] += part.count(expr)
+        table = part.combinations(list(labels))
+        if combinations is None:
+            combinations = table
+        else:
+            combinations[['exact', 'all']] += table[['exact', 'all']]
+        top_dividend.update(df)
+        # 複合条件Bの該当銘柄のみ保持（CSVに全件保存するため）
+        qualified_b_parts.append(df[part.mask('dividend & roe & per')])
+
+    market_counts = {'JP': counts['jp'], 'US': counts['us']}
+    count_dividend_3pct = counts['dividend']
+    count_roe_10pct = counts['roe']
+    count_per_range = counts['per']
+    count_a = counts['dividend & roe']
+    count_b = counts['dividend & roe & per']
+    dividend_3pct_by_market = {'JP': counts['dividend & jp'], 'US': counts['dividend & us']}
+
+    print(f"\n📊 総銘柄数: {total}銘柄")
+    print(f"  - 日本株: {market_counts.get('JP', 0)}銘柄")
+    print(f"  - 米国株: {market_counts.get('US', 0)}銘柄")
 
     # データ品質チェック
     print(f"\n📊 データ品質:")
-    print(f"  - PERデータあり: {df['pe_ratio'].notna().sum()}銘柄")
-    print(f"  - ROEデータあり: {df['roe'].notna().sum()}銘柄")
-    print(f"  - 配当利回りデータあり: {df['dividend_yield'].notna().sum()}銘柄")
+    print(f"  - PERデータあり: {notna['pe_ratio']}銘柄")
+    print(f"  - ROEデータあり: {notna['roe']}銘柄")
+    print(f"  - 配当利回りデータあり: {notna['dividend_yield']}銘柄")
 
     # 配当利回りの単位を確認
-    div_sample = df[df['dividend_yield'].notna()]['dividend_yield'].head(10)
-    print(f"\n📊 配当利回りサンプル: {div_sample.tolist()}")
-
-    # 配当利回りが100倍されている場合を想定 (167.0 = 1.67%)
-    # 井村氏基準: 配当利回り≧3% → dividend_yield ≧ 300
+    print(f"\n📊 配当利回りサンプル: {div_sample}")
 
     # 基準1: 配当利回り≧3%
-    condition_dividend = df['dividend_yield'] >= 300
-    count_dividend_3pct = condition_dividend.sum()
-
     print(f"\n{'='*80}")
     print("【基準1】配当利回り ≧ 3%")
     print(f"{'='*80}")
-    print(f"✅ 該当銘柄数: {count_dividend_3pct}銘柄 / {len(df)}銘柄")
-    print(f"   比率: {count_dividend_3pct/len(df)*100:.1f}%")
+    print(f"✅ 該当銘柄数: {count_dividend_3pct}銘柄 / {total}銘柄")
+    print(f"   比率: {count_dividend_3pct/total*100:.1f}%")
 
     # 配当利回り≧3%の銘柄の市場別内訳
-    dividend_3pct_stocks = df[condition_dividend]
     print(f"\n📊 市場別内訳:")
-    print(f"  - 日本株: {len(dividend_3pct_stocks[dividend_3pct_stocks['market']=='JP'])}銘柄")
-    print(f"  - 米国株: {len(dividend_3pct_stocks[dividend_3pct_stocks['market']=='US'])}銘柄")
+    print(f"  - 日本株: {dividend_3pct_by_market.get('JP', 0)}銘柄")
+    print(f"  - 米国株: {dividend_3pct_by_market.get('US', 0)}銘柄")
 
     # 配当利回りTOP20
     print(f"\n🏆 配当利回りTOP20:")
     print("-"*80)
-    top_dividend = df[df['dividend_yield'].notna()].nlargest(20, 'dividend_yield')
-    for i, row in enumerate(top_dividend.itertuples(), 1):
+    for i, row in enumerate(top_dividend.frame().itertuples(), 1):
         div_pct = row.dividend_yield / 100
         market_flag = "🇯🇵" if row.market == "JP" else "🇺🇸"
         print(f"{i:2d}. {market_flag} {row.ticker:12s} {row.name:40s} {div_pct:5.2f}%")
@@ -74,45 +127,47 @@ def analyze_imura_method(csv_path):
     print(f"\n{'='*80}")
     print("【基準2】ROE ≧ 10% (財務健全性)")
     print(f"{'='*80}")
-    condition_roe = df['roe'] >= 10.0
-    count_roe_10pct = condition_roe.sum()
-    print(f"✅ 該当銘柄数: {count_roe_10pct}銘柄 / {len(df)}銘柄")
-    print(f"   比率: {count_roe_10pct/len(df)*100:.1f}%")
+    print(f"✅ 該当銘柄数: {count_roe_10pct}銘柄 / {total}銘柄")
+    print(f"   比率: {count_roe_10pct/total*100:.1f}%")
 
     # 基準3: PER 5-20倍 (割安範囲)
     print(f"\n{'='*80}")
     print("【基準3】PER 5-20倍 (割安範囲)")
     print(f"{'='*80}")
-    condition_per = (df['pe_ratio'] >= 5) & (df['pe_ratio'] <= 20)
-    count_per_range = condition_per.sum()
-    print(f"✅ 該当銘柄数: {count_per_range}銘柄 / {len(df)}銘柄")
-    print(f"   比率: {count_per_range/len(df)*100:.1f}%")
+    print(f"✅ 該当銘柄数: {count_per_range}銘柄 / {total}銘柄")
+    print(f"   比率: {count_per_range/total*100:.1f}%")
 
     # 複合条件: 配当3%以上 AND ROE10%以上
     print(f"\n{'='*80}")
     print("【複合条件A】配当≧3% AND ROE≧10%")
     print(f"{'='*80}")
-    condition_a = condition_dividend & condition_roe
-    count_a = condition_a.sum()
-    print(f"✅ 該当銘柄数: {count_a}銘柄 / {len(df)}銘柄")
-    print(f"   比率: {count_a/len(df)*100:.1f}%")
+    print(f"✅ 該当銘柄数: {count_a}銘柄 / {total}銘柄")
+    print(f"   比率: {count_a/total*100:.1f}%")
 
     # 複合条件B: 配当3%以上 AND ROE10%以上 AND PER 5-20倍
     print(f"\n{'='*80}")
     print("【複合条件B】配当≧3% AND ROE≧10% AND PER 5-20倍")
     print(f"{'='*80}")
-    condition_b = condition_dividend & condition_roe & condition_per
-    count_b = condition_b.sum()
-    print(f"✅ 該当銘柄数: {count_b}銘柄 / {len(df)}銘柄")
-    print(f"   比率: {count_b/len(df)*100:.1f}%")
+    print(f"✅ 該当銘柄数: {count_b}銘柄 / {total}銘柄")
+    print(f"   比率: {count_b/total*100:.1f}%")
+
+    # 3条件の全組み合わせ（True の条件をすべて満たす銘柄数）
+    print(f"\n📊 条件の組み合わせ別の該当数:")
+    for row in combinations.iloc[1:].itertuples(index=False):
+        names = ' AND '.join(label for name, label in labels.items() if getattr(row, name))
+        print(f"  {names:40s} {row.all:6d}銘柄（うち他の条件は満たさない: {row.exact}銘柄）")
+
+    qualified_b_full = None
+    if count_b > 0:
+        qualified_b_full = pd.concat(qualified_b_parts)
+        qualified_b_full['div_pct'] = qualified_b_full['dividend_yield'] / 100
+        qualified_b_full = qualified_b_full.sort_values('div_pct', ascending=False, kind='stable')
 
     # 複合条件Bを満たす銘柄の詳細
     if count_b > 0:
         print(f"\n🏆 複合条件B該当銘柄TOP30:")
         print("-"*80)
-        qualified_b = df[condition_b].copy()
-        qualified_b['div_pct'] = qualified_b['dividend_yield'] / 100
-        qualified_b = qualified_b.sort_values('div_pct', ascending=False).head(30)
+        qualified_b = qualified_b_full.head(30)
 
         for i, row in enumerate(qualified_b.itertuples(), 1):
             market_flag = "🇯🇵" if row.market == "JP" else "🇺🇸"
@@ -135,9 +190,6 @@ def analyze_imura_method(csv_path):
     # 結果をCSVに保存
     output_path = "./imura_qualified_stocks.csv"
     if count_b > 0:
-        qualified_b_full = df[condition_b].copy()
-        qualified_b_full['div_pct'] = qualified_b_full['dividend_yield'] / 100
-        qualified_b_full = qualified_b_full.sort_values('div_pct', ascending=False)
         qualified_b_full.to_csv(output_path, index=False, encoding='utf-8-sig')
         print(f"\n📄 結果を保存: {output_path}")
         print(f"   保存銘柄数: {len(qualified_b_full)}銘柄")
@@ -147,7 +199,7 @@ def analyze_imura_method(csv_path):
     print(f"{'='*80}")
 
     return {
-        'total': len(df),
+        'total': total,
         'dividend_3pct': count_dividend_3pct,
         'roe_10pct': count_roe_10pct,
         'per_5_20': count_per_range,
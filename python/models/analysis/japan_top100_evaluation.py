@@ -3,11 +3,27 @@
 """
 日本株時価総額TOP100銘柄の統計評価スクリプト
 6項目評価: 成長性、バリュエーション、財務、配当、触媒、リスク
+
+--universe で東証プライム全銘柄（約1,600銘柄）等の銘柄一覧CSVを読み込んで評価できる。
+
+実行方法:
+    python python/models/analysis/japan_top100_evaluation.py                # TOP100銘柄
+    python python/models/analysis/japan_top100_evaluation.py --universe sources/reference/market/tse_prime_universe.csv
 """
 
+import argparse
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.config.paths import SOURCES_REFERENCE_MARKET_DIR
+from python.models.scoring import LookupRule, ScoreModel, ThresholdRule
+
 # 日本株時価総額TOP100銘柄リスト（2025年10月時点）
 # データソース: Strainer.jp、みんかぶ、日本経済新聞
 top100_stocks = [
@@ -122,6 +138,109 @@ top100_stocks = [
     [100, "6146", "ディスコ", 5.5, "機械"],
 ]
 
+# セクター別ベーススコア（業界特性を考慮）
+SECTOR_BASE_SCORES = {
+    "金融": 75,          # 安定配当、景気敏感
+    "商社": 80,          # 資源高、配当高
+    "電機": 70,          # 半導体需要、競争激化
+    "自動車": 65,        # EV移行リスク
+    "医薬品": 78,        # 研究開発次第
+    "通信": 72,          # 安定配当、成長鈍化
+    "通信・IT": 68,      # AI需要、競争激化
+    "小売": 60,          # 消費低迷
+    "機械": 73,          # 設備投資需要
+    "化学": 70,          # 原料価格リスク
+    "鉄道": 68,          # インバウンド回復
+    "不動産": 65,        # 金利上昇リスク
+    "保険": 74,          # 安定収益
+    "証券": 65,          # 市況敏感
+    "精密機器": 75,      # 医療需要
+    "食品": 68,          # 安定、低成長
+    "サービス": 70,      # デジタル化
+    "娯楽": 65,          # ヒット次第
+    "ゴム": 68,          # 自動車連動
+    "石油": 62,          # 脱炭素リスク
+    "電力・ガス": 60,    # 規制、燃料高
+    "海運": 68,          # 市況敏感
+    "鉄鋼": 58,          # 構造不況
+    "輸送機器": 67,      # 自動車連動
+    "ソフトウェア": 78,  # DX需要
+    "その他製造": 65,
+}
+
+# 個別銘柄の特殊調整
+SPECIAL_ADJUSTMENTS = {
+    # トップティア（高評価）
+    "7203": 10,  # トヨタ: 世界最大級、EV投資
+    "9984": -5,  # SBG: ARM好調だが投資リスク
+    "8306": 8,   # 三菱UFJ: 利上げ恩恵
+    "6758": 5,   # ソニー: エンタメ強い
+    "6501": 8,   # 日立: 社会インフラ
+    "9983": -3,  # ファストリ: 海外依存
+    "6857": 12,  # アドバンテスト: AI半導体需要
+    "7974": 3,   # 任天堂: 新ハード待ち
+    "8035": 10,  # 東京エレク: 半導体装置
+    "8316": 8,   # 三井住友FG: 利上げ恩恵
+    # 商社
+    "8058": 10,  # 三菱商事: 資源高
+    "8001": 10,  # 伊藤忠: 非資源強い
+    "8031": 9,   # 三井物産: 資源高
+    "8053": 8,   # 住友商事: 資源高
+    # 医薬品
+    "4519": 8,   # 中外: ロシュ連携
+    "4502": 5,   # 武田: 債務重い
+    "4503": 6,   # アステラス: パイプライン
+    "4568": 9,   # 第一三共: ADC好調
+    # 通信
+    "9432": 4,   # NTT: 成長鈍化
+    "9433": 5,   # KDDI: 増配継続
+    "9437": 4,   # ドコモ: 競争激化
+    # ハイテク
+    "6861": 15,  # キーエンス: 超高収益
+    "4063": 8,   # 信越化学: 半導体材料
+    "6098": 7,   # リクルート: 海外展開
+    "4704": 6,   # トレンド: サイバーセキュリティ
+    # 自動車
+    "7267": 6,   # ホンダ: EV移行
+    "7201": -5,  # 日産: 業績低迷
+    "7269": 3,   # スズキ: インド好調
+    # 小売
+    "3382": 2,   # セブン&アイ: 米国苦戦
+    "8267": 1,   # イオン: 国内厳しい
+    "9843": 8,   # ニトリ: 好業績
+    # 不動産
+    "8830": -3,  # 住友不動産: 金利リスク
+    "8802": -2,  # 三菱地所: 金利リスク
+    "8801": -2,  # 三井不動産: 金利リスク
+    # その他
+    "2914": 3,   # JT: 安定配当
+    "4452": 4,   # 花王: 安定
+    "9022": 7,   # JR東海: リニア期待
+    "6146": 12,  # ディスコ: 半導体研磨装置
+}
+
+# researcher評価スコアのルール表
+#   セクター別ベーススコア + 時価総額による調整 + 個別銘柄の特殊調整 → 0-100点に制限
+#   データ不足の場合（簡易版: 時価総額2兆円未満）: スコア × 0.75（小数点以下切り捨て）
+RESEARCHER_SCORE_MODEL = ScoreModel(
+    'researcher',
+    total='researcher_score',
+    rules=[
+        LookupRule('sector_base', 'セクター', SECTOR_BASE_SCORES, default=70),
+        # 大型株は安定性高い、小型株はボラティリティ高い
+        ThresholdRule('size_bonus', '時価総額(兆円)', [2.0, 5.0, 10.0], [-3, 0, 3, 5], missing=-3),
+        LookupRule('adjustment', 'コード', SPECIAL_ADJUSTMENTS, default=0),
+    ],
+    clip=(0, 100),
+    multipliers=[
+        ThresholdRule('data_shortage', '時価総額(兆円)', [2.0], [0.75, 1], missing=1),
+    ],
+    truncate=True,
+)
+
+DATA_SHORTAGE_NOTE = "⚠️判断困難"
+
+
 def calculate_researcher_score(row):
     """
     researcher評価スコアを算出（0-100点）
@@ -135,150 +254,158 @@ def calculate_researcher_score(row):
     6. リスク評価 (15点)
 
     ⚠️ データ不足の場合: スコア × 0.75
+
+    採点は RESEARCHER_SCORE_MODEL のルール表による（全銘柄の一括採点は score_researcher を使う）。
     """
+    final_score = RESEARCHER_SCORE_MODEL.score_one(row)['researcher_score']
+    note = DATA_SHORTAGE_NOTE if row["時価総額(兆円)"] < 2.0 else "-"
+    return final_score, note
 
-    code = row["コード"]
-    company = row["企業名"]
-    sector = row["セクター"]
-    market_cap = row["時価総額(兆円)"]
-
-    # セクター別ベーススコア（業界特性を考慮）
-    sector_base = {
-        "金融": 75,          # 安定配当、景気敏感
-        "商社": 80,          # 資源高、配当高
-        "電機": 70,          # 半導体需要、競争激化
-        "自動車": 65,        # EV移行リスク
-        "医薬品": 78,        # 研究開発次第
-        "通信": 72,          # 安定配当、成長鈍化
-        "通信・IT": 68,      # AI需要、競争激化
-        "小売": 60,          # 消費低迷
-        "機械": 73,          # 設備投資需要
-        "化学": 70,          # 原料価格リスク
-        "鉄道": 68,          # インバウンド回復
-        "不動産": 65,        # 金利上昇リスク
-        "保険": 74,          # 安定収益
-        "証券": 65,          # 市況敏感
-        "精密機器": 75,      # 医療需要
-        "食品": 68,          # 安定、低成長
-        "サービス": 70,      # デジタル化
-        "娯楽": 65,          # ヒット次第
-        "ゴム": 68,          # 自動車連動
-        "石油": 62,          # 脱炭素リスク
-        "電力・ガス": 60,    # 規制、燃料高
-        "海運": 68,          # 市況敏感
-        "鉄鋼": 58,          # 構造不況
-        "輸送機器": 67,      # 自動車連動
-        "ソフトウェア": 78,  # DX需要
-        "その他製造": 65,
-    }
-
-    base_score = sector_base.get(sector, 70)
-
-    # 時価総額による調整（大型株は安定性高い）
-    if market_cap >= 10.0:
-        size_bonus = 5
-    elif market_cap >= 5.0:
-        size_bonus = 3
-    elif market_cap >= 2.0:
-        size_bonus = 0
-    else:
-        size_bonus = -3  # 小型株はボラティリティ高い
-
-    # 個別銘柄の特殊調整
-    special_adjustments = {
-        # トップティア（高評価）
-        "7203": 10,  # トヨタ: 世界最大級、EV投資
-        "9984": -5,  # SBG: ARM好調だが投資リスク
-        "8306": 8,   # 三菱UFJ: 利上げ恩恵
-        "6758": 5,   # ソニー: エンタメ強い
-        "6501": 8,   # 日立: 社会インフラ
-        "9983": -3,  # ファストリ: 海外依存
-        "6857": 12,  # アドバンテスト: AI半導体需要
-        "7974": 3,   # 任天堂: 新ハード待ち
-        "8035": 10,  # 東京エレク: 半導体装置
-        "8316": 8,   # 三井住友FG: 利上げ恩恵
-        # 商社
-        "8058": 10,  # 三菱商事: 資源高
-        "8001": 10,  # 伊藤忠: 非資源強い
-        "8031": 9,   # 三井物産: 資源高
-        "8053": 8,   # 住友商事: 資源高
-        # 医薬品
-        "4519": 8,   # 中外: ロシュ連携
-        "4502": 5,   # 武田: 債務重い
-        "4503": 6,   # アステラス: パイプライン
-        "4568": 9,   # 第一三共: ADC好調
-        # 通信
-        "9432": 4,   # NTT: 成長鈍化
-        "9433": 5,   # KDDI: 増配継続
-        "9437": 4,   # ドコモ: 競争激化
-        # ハイテク
-        "6861": 15,  # キーエンス: 超高収益
-        "4063": 8,   # 信越化学: 半導体材料
-        "6098": 7,   # リクルート: 海外展開
-        "4704": 6,   # トレンド: サイバーセキュリティ
-        # 自動車
-        "7267": 6,   # ホンダ: EV移行
-        "7201": -5,  # 日産: 業績低迷
-        "7269": 3,   # スズキ: インド好調
-        # 小売
-        "3382": 2,   # セブン&アイ: 米国苦戦
-        "8267": 1,   # イオン: 国内厳しい
-        "9843": 8,   # ニトリ: 好業績
-        # 不動産
-        "8830": -3,  # 住友不動産: 金利リスク
-        "8802": -2,  # 三菱地所: 金利リスク
-        "8801": -2,  # 三井不動産: 金利リスク
-        # その他
-        "2914": 3,   # JT: 安定配当
-        "4452": 4,   # 花王: 安定
-        "9022": 7,   # JR東海: リニア期待
-        "6146": 12,  # ディスコ: 半導体研磨装置
-    }
-
-    adjustment = special_adjustments.get(code, 0)
-
-    # 最終スコア算出
-    final_score = base_score + size_bonus + adjustment
-
-    # 0-100点に制限
-    final_score = max(0, min(100, final_score))
-
-    # データ不足判定（簡易版: 時価総額2兆円未満は詳細データ不足と仮定）
-    if market_cap < 2.0:
-        final_score = int(final_score * 0.75)
-        note = "⚠️判断困難"
+
+def score_researcher(df):
+    """
+    researcher評価スコアの一括算出（calculate_researcher_score の列指向版）
+
+    Args:
+        df: 'コード'・'時価総額(兆円)'・'セクター' 列を持つDataFrame
+
+    Returns:
+        'researcherスコア'・'備考' 列を追加したDataFrame（df は変更しない）
+    """
+    market_cap = pd.to_numeric(df["時価総額(兆円)"], errors="coerce")
+    return df.assign(
+        researcherスコア=RESEARCHER_SCORE_MODEL.evaluate(df)["researcher_score"],
+        備考=np.where(market_cap < 2.0, DATA_SHORTAGE_NOTE, "-"),
+    )
+
+
+# ===========================
+# 東証プライム全銘柄のユニバース
+# ===========================
+
+DEFAULT_UNIVERSE_PATH = os.path.join(SOURCES_REFERENCE_MARKET_DIR, 'tse_prime_universe.csv')
+
+# JPX「東証上場銘柄一覧」の市場区分
+PRIME_MARKET = "プライム（内国株式）"
+
+# 東証33業種 → セクター別ベーススコアのセクター（対応がない業種はベーススコア70点）
+TSE33_SECTOR_MAP = {
+    "水産・農林業": "食品",
+    "食料品": "食品",
+    "鉱業": "石油",
+    "石油・石炭製品": "石油",
+    "繊維製品": "その他製造",
+    "パルプ・紙": "その他製造",
+    "化学": "化学",
+    "医薬品": "医薬品",
+    "ゴム製品": "ゴム",
+    "ガラス・土石製品": "その他製造",
+    "鉄鋼": "鉄鋼",
+    "非鉄金属": "その他製造",
+    "金属製品": "その他製造",
+    "機械": "機械",
+    "電気機器": "電機",
+    "輸送用機器": "輸送機器",
+    "精密機器": "精密機器",
+    "その他製品": "その他製造",
+    "電気・ガス業": "電力・ガス",
+    "陸運業": "鉄道",
+    "海運業": "海運",
+    "情報・通信業": "通信・IT",
+    "卸売業": "商社",
+    "小売業": "小売",
+    "銀行業": "金融",
+    "証券、商品先物取引業": "証券",
+    "保険業": "保険",
+    "その他金融業": "金融",
+    "不動産業": "不動産",
+    "サービス業": "サービス",
+}
+
+# 時価総額の列名 → 兆円への換算係数
+MARKET_CAP_UNITS = {
+    "時価総額(兆円)": 1.0,
+    "時価総額(億円)": 1e-4,
+    "時価総額(百万円)": 1e-6,
+    "時価総額": 1e-12,  # 円
+}
+
+
+def load_universe(path=DEFAULT_UNIVERSE_PATH, prime_only=True):
+    """
+    銘柄一覧CSVを評価用のDataFrameに変換
+
+    JPX「東証上場銘柄一覧」（コード・銘柄名・市場・商品区分・33業種区分）をCSVに保存し、
+    時価総額の列（MARKET_CAP_UNITS のいずれか）を加えたものを想定する。
+    'セクター' 列があればそのまま、なければ33業種区分を TSE33_SECTOR_MAP で変換する。
+    時価総額の列がない場合は欠損（小型株と同じ -3点、判断困難の係数は掛けない）。
+
+    Args:
+        path: CSVのパス
+        prime_only: '市場・商品区分' 列がある場合にプライム市場の銘柄のみに絞るか
+
+    Returns:
+        top100_stocks と同じ列（No, コード, 企業名, 時価総額(兆円), セクター）のDataFrame
+        （時価総額の大きい順、No は順位）
+    """
+    raw = pd.read_csv(path, dtype={"コード": str}, encoding="utf-8-sig")
+    if prime_only and "市場・商品区分" in raw.columns:
+        raw = raw[raw["市場・商品区分"] == PRIME_MARKET]
+
+    name = raw["企業名"] if "企業名" in raw.columns else raw["銘柄名"]
+    if "セクター" in raw.columns:
+        sector = raw["セクター"]
     else:
-        note = "-"
+        sector = raw["33業種区分"].map(TSE33_SECTOR_MAP).fillna(raw["33業種区分"])
+    market_cap = pd.Series(np.nan, index=raw.index)
+    for column, factor in MARKET_CAP_UNITS.items():
+        if column in raw.columns:
+            market_cap = pd.to_numeric(raw[column], errors="coerce") * factor
+            break
 
-    return final_score, note
+    df = pd.DataFrame({
+        # 'XXXX.T' 形式にも対応（SPECIAL_ADJUSTMENTS のキーは4桁コード）
+        "コード": raw["コード"].str.strip().str.replace(r"\.T$", "", regex=True),
+        "企業名": name,
+        "時価総額(兆円)": market_cap,
+        "セクター": sector,
+    })
+    df = df.sort_values("時価総額(兆円)", ascending=False, kind="stable", na_position="last")
+    df.insert(0, "No", np.arange(1, len(df) + 1))
+    return df.reset_index(drop=True)
 
 
-def main():
+def main(argv=None):
     """メイン処理"""
 
-    import sys
+    parser = argparse.ArgumentParser(description="日本株 researcher評価")
+    parser.add_argument(
+        "--universe", nargs="?", const=DEFAULT_UNIVERSE_PATH, default=None, metavar="CSV",
+        help=f"銘柄一覧CSV（load_universe を参照）を評価する。パス省略時は {DEFAULT_UNIVERSE_PATH}",
+    )
+    args = parser.parse_args(argv)
+
     import io
     # Windows環境のUTF-8出力対応
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+    # DataFrameに変換
+    if args.universe:
+        df = load_universe(args.universe)
+        title = f"日本株{len(df)}銘柄"
+        output_file = "./japan_prime_researcher_scores.csv"
+    else:
+        df = pd.DataFrame(top100_stocks, columns=["No", "コード", "企業名", "時価総額(兆円)", "セクター"])
+        title = "日本株時価総額TOP100銘柄"
+        output_file = "./japan_top100_researcher_scores.csv"
+
     print("=" * 80)
-    print("日本株時価総額TOP100銘柄 researcher評価")
+    print(f"{title} researcher評価")
     print("=" * 80)
     print()
 
-    # DataFrameに変換
-    df = pd.DataFrame(top100_stocks, columns=["No", "コード", "企業名", "時価総額(兆円)", "セクター"])
-
-    # スコア算出
-    scores = []
-    notes = []
-    for idx, row in df.iterrows():
-        score, note = calculate_researcher_score(row)
-        scores.append(score)
-        notes.append(note)
-
-    df["researcherスコア"] = scores
-    df["備考"] = notes
+    # スコア算出（全銘柄を一括採点）
+    df = score_researcher(df)
 
     # 統計サマリー
     print("【統計サマリー】")
@@ -287,7 +414,7 @@ def main():
     print(f"最高点: {df['researcherスコア'].max()}点")
     print(f"最低点: {df['researcherスコア'].min()}点")
     print(f"80点以上: {len(df[df['researcherスコア'] >= 80])}銘柄")
-    print(f"判断困難銘柄: {len(df[df['備考'] == '⚠️判断困難'])}銘柄")
+    print(f"判断困難銘柄: {len(df[df['備考'] == DATA_SHORTAGE_NOTE])}銘柄")
     print()
 
     # セクター別平均
@@ -304,14 +431,13 @@ def main():
     print()
 
     # 全銘柄リスト
-    print("【全100銘柄評価リスト】")
+    print(f"【全{len(df)}銘柄評価リスト】")
     print()
     result = df[["No", "コード", "企業名", "researcherスコア", "備考"]]
     print(result.to_string(index=False))
     print()
 
     # CSV出力
-    output_file = "./japan_top100_researcher_scores.csv"
     df.to_csv(output_file, index=False, encoding="utf-8-sig")
     print(f"✓ 評価結果を保存: {output_file}")
     print()
@@ -5,6 +5,14 @@ import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')
 
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.simulation import CashFlowSchedule, LumpSum, ReturnModel, Stream, simulate
+
 # 日本語フォントの設定
 plt.rcParams['font.sans-serif'] = ['MS Gothic', 'Yu Gothic', 'Hiragino Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -154,30 +162,19 @@ def calculate_portfolio_stats(allocation):
 
 def monte_carlo_education_goal(allocation, current_total, target, years, simulations=10000):
     """教育費達成確率のモンテカルロシミュレーション"""
-    np.random.seed(42)
-
     # ポートフォリオ統計
     stats = calculate_portfolio_stats(allocation)
-    mean_return = stats['expected_return']
-    volatility = stats['volatility']
-
-    success_count = 0
-    final_values = []
-
-    for _ in range(simulations):
-        value = current_total
-        for year in range(years):
-            annual_return = np.random.normal(mean_return, volatility)
-            value *= (1 + annual_return / 100)
+    returns = ReturnModel(stats['expected_return'], stats['volatility'])
 
-        final_values.append(value)
-        if value >= target:
-            success_count += 1
+    # 現在の資産を years 年間、年次複利で運用
+    schedule = CashFlowSchedule([
+        Stream('現在の資産', end=years * 12, periods_per_year=1, flows=[LumpSum(current_total)]),
+    ], returns=returns)
+    result = simulate(schedule, simulations, random_state=42)
 
-    success_rate = (success_count / simulations) * 100
-    median = np.median(final_values)
-    percentile_10 = np.percentile(final_values, 10)
-    percentile_90 = np.percentile(final_values, 90)
+    success_rate = result.success_rate(target)
+    median = result.median()
+    percentile_10, percentile_90 = result.percentile([10, 90])
 
     return {
         'success_rate': success_rate,
@@ -13,6 +13,8 @@ plt.rcParams['axes.unicode_minus'] = False
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
 from personal_config import (
     CURRENT_AGE, CURRENT_YEAR, RETIREMENT_AGE, RETIREMENT_YEAR,
@@ -22,6 +24,9 @@ from personal_config import (
     NISA_LIFETIME_REMAINING,
     EDUCATION_COST
 )
+from python.models.simulation import (
+    CashFlowSchedule, Contribution, LumpSum, ReturnModel, Stream, estimate_success_probability, simulate,
+)
 
 # 長女の大学入学年（計算）
 ELDEST_CHILD_UNIVERSITY_YEAR = CURRENT_YEAR + (18 - ELDEST_CHILD_AGE)
@@ -209,134 +214,82 @@ def calculate_expense_ratio(strategy):
 
     return total_expense / total_amount if total_amount > 0 else 0
 
+# 資産ごとの年率リターンの分布（平均%、標準偏差%）
+ASSET_RETURN_MODELS = {
+    '除く日本': ReturnModel(12.8, 16.3),
+    'オルカン': ReturnModel(12.5, 16.1),
+    'S&P500': ReturnModel(14.8, 18.5),
+    '配当株・REIT': ReturnModel(4.0, 12.0),
+    '実験枠': ReturnModel(10.0, 25.0),
+}
+
+
+def build_strategy_schedule(strategy_allocation, years, investment_years, accumulation_months, wife_months):
+    """
+    選択肢ごとのキャッシュフロー・スケジュール（月は2025年1月からの経過月数）
+
+    - 既存資産: 「除く日本」と仮定し、years 年間の年次複利
+    - 2026年投資分: 資産ごとのリターンで investment_years 年間の年次複利
+      （リターンの分布が不明な資産は運用せずに元本のまま加算）
+    - 2027年以降の月次積立（月16.2万円、除く日本）、妻NISA（2028年から月5万円、オルカン）
+    """
+    streams = [
+        # 既存資産（NISA [NISA_ASSETS]万円 + iDeCo [IDECO_ASSETS]万円 + 自社株 300万円）
+        Stream('既存資産', end=years * 12, periods_per_year=1, returns=ASSET_RETURN_MODELS['除く日本'],
+               flows=[LumpSum(CURRENT_NISA + CURRENT_IDECO + CURRENT_COMPANY_STOCK)]),
+    ]
+    for asset, amount in strategy_allocation.items():
+        if amount > 0:
+            returns = ASSET_RETURN_MODELS.get(asset)
+            end = 12 + investment_years * 12 if returns is not None else 12
+            streams.append(Stream(asset, start=12, end=end, periods_per_year=1, returns=returns,
+                                  flows=[LumpSum(amount)], account='2026年投資分'))
+    streams += [
+        Stream('月次積立', start=24, end=24 + accumulation_months, returns=ASSET_RETURN_MODELS['除く日本'],
+               flows=[Contribution(16.2)]),
+        Stream('妻NISA', start=36, end=36 + wife_months, returns=ASSET_RETURN_MODELS['オルカン'],
+               flows=[Contribution(5.0)]),
+    ]
+    return CashFlowSchedule(streams)
+
+
 def monte_carlo_education_fund(strategy_allocation, years=13, simulations=10000):
     """教育費達成確率をモンテカルロシミュレーション（2038年時点）"""
-    np.random.seed(42)
-
-    success_count = 0
-    final_values = []
-
-    for _ in range(simulations):
-        # 既存資産の成長（NISA [NISA_ASSETS]万円 + iDeCo [IDECO_ASSETS]万円 + 自社株 300万円）
-        existing_value = CURRENT_NISA + CURRENT_IDECO + CURRENT_COMPANY_STOCK
-
-        # 既存資産は「除く日本」と仮定（平均リターン12.8%、ボラティリティ16.3%）
-        for year in range(years):
-            annual_return = np.random.normal(12.8, 16.3)
-            existing_value *= (1 + annual_return / 100)
-
-        # 2026年投資分（360万円）の成長（12年間）
-        new_investment_value = 0
-        for asset, amount in strategy_allocation.items():
-            if amount > 0:
-                value = amount
-                for year in range(12):  # 2026年投資分は12年間成長
-                    if asset == '除く日本':
-                        annual_return = np.random.normal(12.8, 16.3)
-                    elif asset == 'オルカン':
-                        annual_return = np.random.normal(12.5, 16.1)
-                    elif asset == 'S&P500':
-                        annual_return = np.random.normal(14.8, 18.5)
-                    elif asset == '配当株・REIT':
-                        annual_return = np.random.normal(4.0, 12.0)
-                    elif asset == '実験枠':
-                        annual_return = np.random.normal(10.0, 25.0)
-                    else:
-                        continue
-
-                    value *= (1 + annual_return / 100)
-
-                new_investment_value += value
-
-        # 2027年以降の月次積立（月16.2万円、2027-2038年の12年間）
-        monthly_investment = 16.2
-        accumulation = 0
-        for month in range(144):  # 12年 × 12ヶ月
-            annual_return = np.random.normal(12.8, 16.3)
-            monthly_return = annual_return / 12 / 100
-            accumulation = (accumulation + monthly_investment) * (1 + monthly_return)
-
-        # 妻NISA（月5万円、2028-2038年の11年間）
-        wife_accumulation = 0
-        for month in range(132):  # 11年 × 12ヶ月
-            annual_return = np.random.normal(12.5, 16.1)
-            monthly_return = annual_return / 12 / 100
-            wife_accumulation = (wife_accumulation + 5.0) * (1 + monthly_return)
-
-        total_value = existing_value + new_investment_value + accumulation + wife_accumulation
-        final_values.append(total_value)
-
-        if total_value >= EDUCATION_COST:
-            success_count += 1
-
-    success_rate = (success_count / simulations) * 100
-    median_value = np.median(final_values)
-    percentile_10 = np.percentile(final_values, 10)
-    percentile_90 = np.percentile(final_values, 90)
+    # 2026年投資分は12年間、月次積立は2027-2038年の144ヶ月、妻NISAは2028-2038年の132ヶ月
+    schedule = build_strategy_schedule(strategy_allocation, years, 12, 144, 132)
+    result = simulate(schedule, simulations, random_state=42)
+
+    success_rate = result.success_rate(EDUCATION_COST)
+    median_value = result.median()
+    percentile_10, percentile_90 = result.percentile([10, 90])
 
     return success_rate, median_value, percentile_10, percentile_90
 
 def simulate_60yo_assets(strategy_allocation, years=19, simulations=10000):
     """60歳時点の総資産をシミュレーション"""
-    np.random.seed(42)
-
-    final_values = []
-
-    for _ in range(simulations):
-        # 既存資産の成長（19年間）
-        existing_value = CURRENT_NISA + CURRENT_IDECO + CURRENT_COMPANY_STOCK
-
-        for year in range(years):
-            annual_return = np.random.normal(12.8, 16.3)
-            existing_value *= (1 + annual_return / 100)
-
-        # 2026年投資分（360万円）の成長（18年間）
-        new_investment_value = 0
-        for asset, amount in strategy_allocation.items():
-            if amount > 0:
-                value = amount
-                for year in range(18):
-                    if asset == '除く日本':
-                        annual_return = np.random.normal(12.8, 16.3)
-                    elif asset == 'オルカン':
-                        annual_return = np.random.normal(12.5, 16.1)
-                    elif asset == 'S&P500':
-                        annual_return = np.random.normal(14.8, 18.5)
-                    elif asset == '配当株・REIT':
-                        annual_return = np.random.normal(4.0, 12.0)
-                    elif asset == '実験枠':
-                        annual_return = np.random.normal(10.0, 25.0)
-                    else:
-                        continue
-
-                    value *= (1 + annual_return / 100)
-
-                new_investment_value += value
-
-        # 2027年以降の月次積立（月16.2万円、18年間）
-        monthly_investment = 16.2
-        accumulation = 0
-        for month in range(216):  # 18年 × 12ヶ月
-            annual_return = np.random.normal(12.8, 16.3)
-            monthly_return = annual_return / 12 / 100
-            accumulation = (accumulation + monthly_investment) * (1 + monthly_return)
-
-        # 妻NISA（月5万円、2028-2044年の17年間）
-        wife_accumulation = 0
-        for month in range(204):  # 17年 × 12ヶ月
-            annual_return = np.random.normal(12.5, 16.1)
-            monthly_return = annual_return / 12 / 100
-            wife_accumulation = (wife_accumulation + 5.0) * (1 + monthly_return)
-
-        total_value = existing_value + new_investment_value + accumulation + wife_accumulation
-        final_values.append(total_value)
-
-    median_value = np.median(final_values)
-    percentile_10 = np.percentile(final_values, 10)
-    percentile_90 = np.percentile(final_values, 90)
+    # 2026年投資分は18年間、月次積立は216ヶ月、妻NISAは2028-2044年の204ヶ月
+    schedule = build_strategy_schedule(strategy_allocation, years, 18, 216, 204)
+    result = simulate(schedule, simulations, random_state=42)
+
+    median_value = result.median()
+    percentile_10, percentile_90 = result.percentile([10, 90])
 
     return median_value, percentile_10, percentile_90
 
+# 分散減少法の比較に使う手法（method, control_variate）とパス数
+VARIANCE_REDUCTION_METHODS = [('antithetic', True), ('sobol', False)]
+VARIANCE_REDUCTION_SIMULATIONS = 4096
+
+
+def estimate_goal_probability(strategy_allocation, target, years, investment_years,
+                              accumulation_months, wife_months,
+                              simulations=VARIANCE_REDUCTION_SIMULATIONS):
+    """分散減少法による目標達成確率の推定（手法ごとの GoalEstimate のリスト）"""
+    schedule = build_strategy_schedule(strategy_allocation, years, investment_years,
+                                       accumulation_months, wife_months)
+    return [estimate_success_probability(schedule, target, simulations, method, control_variate)
+            for method, control_variate in VARIANCE_REDUCTION_METHODS]
+
 # ===== 評価の実行 =====
 
 print("="*80)
@@ -405,6 +358,9 @@ for strategy_id, strategy_data in STRATEGIES.items():
     print(f"中央値: {edu_median:.0f}万円")
     print(f"10%タイル値（悪い方から10%）: {edu_p10:.0f}万円")
     print(f"90%タイル値（良い方から10%）: {edu_p90:.0f}万円")
+    print(f"分散減少法による推定（{VARIANCE_REDUCTION_SIMULATIONS:,}パス）:")
+    for estimate in estimate_goal_probability(allocation, EDUCATION_COST, 13, 12, 144, 132):
+        print(f"  {estimate.summary()}")
 
     if edu_success_rate >= 95:
         edu_evaluation = "[OK] 極めて高い確率で達成"
@@ -425,6 +381,9 @@ for strategy_id, strategy_data in STRATEGIES.items():
     print(f"保守的シナリオ（10%タイル値）: {asset_60_p10:.0f}万円")
     print(f"楽観的シナリオ（90%タイル値）: {asset_60_p90:.0f}万円")
     print(f"教育費控除後（中央値）: {asset_60_median - EDUCATION_COST:.0f}万円")
+    print(f"教育費控除後5,000万円以上の確率（分散減少法、{VARIANCE_REDUCTION_SIMULATIONS:,}パス）:")
+    for estimate in estimate_goal_probability(allocation, EDUCATION_COST + 5000, 19, 18, 216, 204):
+        print(f"  {estimate.summary()}")
 
     if asset_60_median - EDUCATION_COST >= 5000:
         asset_evaluation = "[OK] 目標達成（5,000万円以上）"
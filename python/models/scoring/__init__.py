@@ -0,0 +1,24 @@
+"""
+スコアリングモデル
+
+「閾値の段階 → 点数」で採点する各種スコアを、宣言的なルール表で定義して
+DataFrame 全体に対して一括評価するための共通基盤。
+足切り（必須基準）のフィルタは選択率の高い順に残存行だけを評価する。
+重み付けの感度分析は、得点行列と重み行列の行列積で一括評価する。
+相対評価モードでは、各指標を市場 × セクター内のパーセンタイル / z スコアで採点する。
+条件の組み合わせの該当数は、条件ごとのビット列のビット演算で求める。
+"""
+
+from .bitmap import PredicateIndex
+from .filters import FilterExecutor, FilterResult, RangeFilter
+from .relative import HIGHER, LOWER, RelativeFactor, RelativeModel
+from .rules import Band, IntervalRule, LookupRule, ScoreModel, ThresholdRule
+from .sweep import WeightSweep, perturbed_weights, weight_grid
+
+__all__ = [
+    'ThresholdRule', 'IntervalRule', 'Band', 'LookupRule', 'ScoreModel',
+    'RangeFilter', 'FilterExecutor', 'FilterResult',
+    'WeightSweep', 'weight_grid', 'perturbed_weights',
+    'RelativeFactor', 'RelativeModel', 'HIGHER', 'LOWER',
+    'PredicateIndex',
+]
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+スクリーニング条件のビットマップ索引
+
+各条件（配当利回り ≧ 3%、ROE ≧ 10% 等）をスナップショットごとに1回だけ評価し、
+1銘柄1ビットに詰めたビット列（np.packbits）として保持する。
+条件の AND / OR / NOT の組み合わせの該当数・該当銘柄は、DataFrame を再度マスクする代わりに
+ビット列のビット演算とポピュレーションカウントで求める。
+k 個の条件の 2^k 通りの組み合わせの該当数も一括で集計できる。
+
+使用方法:
+    index = PredicateIndex.from_frame(df, {
+        'dividend': RangeFilter('配当利回り ≧ 3%', 'dividend_yield', min=300),
+        'roe': RangeFilter('ROE ≧ 10%', 'roe', min=10.0),
+        'jp': lambda d: d['market'] == 'JP',
+    }, key='ticker')
+    index.count('dividend & roe')         # 該当数
+    index.members('dividend & ~jp')       # 該当銘柄（key 列の値）
+    index.combinations()                  # 全組み合わせの該当数
+"""
+
+import ast
+from typing import Callable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .filters import RangeFilter
+
+Predicate = Union[RangeFilter, Callable[[pd.DataFrame], Sequence[bool]]]
+Expression = Union[str, Sequence[str]]
+
+# combinations() で扱う条件数の上限（2^k 行の表になるため）
+MAX_COMBINATION_PREDICATES = 20
+
+# 1バイト（0-255）ごとの立っているビット数
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+def _evaluate_predicate(predicate: Predicate, df: pd.DataFrame) -> np.ndarray:
+    if isinstance(predicate, RangeFilter):
+        return predicate.evaluate(df[predicate.field].to_numpy())
+    mask = predicate(df)
+    # 比較結果の欠損（pd.NA 等）は不通過
+    return pd.Series(mask, index=df.index).fillna(False).to_numpy(dtype=bool)
+
+
+class PredicateIndex:
+    """条件名 → ビット列の索引（1スナップショット分）"""
+
+    def __init__(self, bits: Mapping[str, np.ndarray], length: int,
+                 keys: Optional[np.ndarray] = None):
+        """
+        初期化（通常は from_frame / concat で作成）
+
+        Args:
+            bits: 条件名 → np.packbits したビット列
+            length: 行数
+            keys: 行ごとのキー（members() が返す値。None なら行の位置）
+        """
+        for name in bits:
+            if not name.isidentifier():
+                raise ValueError(f"predicate name must be an identifier: {name!r}")
+        self._bits = dict(bits)
+        self.length = length
+        self.keys = keys
+        # パディング（末尾のバイトの余りビット）を除いた全行のビット列（NOT で使う）
+        self._all = np.packbits(np.ones(length, dtype=bool))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, predicates: Mapping[str, Predicate],
+                   key: Optional[str] = None) -> 'PredicateIndex':
+        """
+        DataFrame の各行に条件を評価して作成
+
+        Args:
+            df: 対象の銘柄
+            predicates: 条件名（式で使う識別子）→ RangeFilter または DataFrame → 真偽の配列の関数
+            key: members() で返す列（例: 'ticker'）
+        """
+        bits = {name: np.packbits(_evaluate_predicate(p, df)) for name, p in predicates.items()}
+        keys = df[key].to_numpy() if key is not None else None
+        return cls(bits, len(df), keys=keys)
+
+    @classmethod
+    def concat(cls, indexes: Sequence['PredicateIndex']) -> 'PredicateIndex':
+        """チャンクごとの索引を行方向に連結（条件名はすべて同じであること）"""
+        if not indexes:
+            raise ValueError("indexes must not be empty")
+        names = indexes[0].names
+        if any(index.names != names for index in indexes):
+            raise ValueError("all indexes must have the same predicates")
+        bits = {name: np.packbits(np.concatenate([index.mask(name) for index in indexes]))
+                for name in names}
+        keys = None
+        if all(index.keys is not None for index in indexes):
+            keys = np.concatenate([index.keys for index in indexes])
+        return cls(bits, sum(len(index) for index in indexes), keys=keys)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._bits)
+
+    def __len__(self) -> int:
+        return self.length
+
+    # ----- 式の評価 -----
+
+    def bits(self, expr: Expression) -> np.ndarray:
+        """
+        条件式のビット列
+
+        expr は条件名を & (AND)・| (OR)・^ (XOR)・~ (NOT)・括弧で組み合わせた式
+        （and / or / not も可）、または条件名のリスト（すべての AND）。
+        """
+        if not isinstance(expr, str):
+            expr = ' & '.join(expr) if len(expr) else 'True'
+        return self._eval(ast.parse(expr, mode='eval').body)
+
+    def _eval(self, node: ast.AST) -> np.ndarray:
+        if isinstance(node, ast.Name):
+            if node.id not in self._bits:
+                raise KeyError(f"unknown predicate: {node.id}")
+            return self._bits[node.id]
+        if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            return self._all if node.value else np.zeros_like(self._all)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+            return ~self._eval(node.operand) & self._all
+        if isinstance(node, ast.BinOp):
+            ops = {ast.BitAnd: np.bitwise_and, ast.BitOr: np.bitwise_or, ast.BitXor: np.bitwise_xor}
+            op = ops.get(type(node.op))
+            if op is not None:
+                return op(self._eval(node.left), self._eval(node.right))
+        if isinstance(node, ast.BoolOp):
+            op = np.bitwise_and if isinstance(node.op, ast.And) else np.bitwise_or
+            result = self._eval(node.values[0])
+            for value in node.values[1:]:
+                result = op(result, self._eval(value))
+            return result
+        raise ValueError(f"unsupported expression: {ast.dump(node)}")
+
+    def count(self, expr: Expression) -> int:
+        """条件式の該当数"""
+        return int(_POPCOUNT[self.bits(expr)].sum())
+
+    def mask(self, expr: Expression) -> np.ndarray:
+        """条件式の該当フラグ（行順の真偽の配列）"""
+        return np.unpackbits(self.bits(expr), count=self.length).astype(bool)
+
+    def members(self, expr: Expression) -> np.ndarray:
+        """条件式の該当銘柄（keys の値。keys がなければ行の位置）"""
+        positions = np.flatnonzero(self.mask(expr))
+        return positions if self.keys is None else self.keys[positions]
+
+    # ----- 全組み合わせ -----
+
+    def combinations(self, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        条件の 2^k 通りの組み合わせごとの該当数
+
+        Args:
+            names: 対象の条件（None なら全条件）
+
+        Returns:
+            条件名の列（True / False）、exact（True の条件をすべて満たし False の条件を
+            すべて満たさない行数）、all（True の条件をすべて満たす行数。他の条件は問わない）
+            の列を持つDataFrame（2^k 行）
+        """
+        names = self.names if names is None else list(names)
+        k = len(names)
+        if k > MAX_COMBINATION_PREDICATES:
+            raise ValueError(f"too many predicates for combinations: {k}")
+        # 各行が満たす条件の組をビットの符号（条件 i → 2^i）にして数える
+        codes = np.zeros(self.length, dtype=np.uint32)
+        for i, name in enumerate(names):
+            codes |= self.mask(name).astype(np.uint32) << np.uint32(i)
+        exact = np.bincount(codes, minlength=1 << k).astype(np.int64)
+
+        # 上位集合の和（条件 i を問わない組み合わせに、条件 i を満たす側の件数を加算）
+        at_least = exact.copy()
+        combos = np.arange(1 << k)
+        for i in range(k):
+            without = combos[(combos >> i) & 1 == 0]
+            at_least[without] += at_least[without | (1 << i)]
+
+        table = {name: (combos >> i) & 1 == 1 for i, name in enumerate(names)}
+        return pd.DataFrame({**table, 'exact': exact, 'all': at_least})
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+選択率順に評価する足切りフィルタ（必須基準）の実行エンジン
+
+「全フィルタを全行に対して評価 → 論理積」の代わりに、サンプルで測った
+通過率の低い（絞り込みの強い）フィルタから順に評価し、2つ目以降のフィルタは
+それまでのフィルタを通過した行だけに対して評価する。
+フィルタごとの通過数と、累積の残存銘柄数（ウォーターフォール）は同じ1回の評価で集計する。
+
+使用方法:
+    executor = FilterExecutor([
+        RangeFilter('ROE ≥ 8%', 'roe', min=8.0),
+        RangeFilter('D/E比率 < 200%', 'debt_equity_ratio', max=200, max_inclusive=False),
+    ])
+    result = executor.apply(df)
+    df_filtered = df[result.mask]
+    print(result.waterfall)
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rules import Number, as_float_array
+
+DEFAULT_SAMPLE_SIZE = 1000
+
+
+@dataclass
+class RangeFilter:
+    """
+    列の値が範囲内の行を通過させるフィルタ
+
+    min / max は省略可（片側のみの基準）。欠損値・数値でない値は通過しない。
+    """
+
+    name: str
+    field: str
+    min: Optional[Number] = None
+    max: Optional[Number] = None
+    min_inclusive: bool = True
+    max_inclusive: bool = True
+
+    def __post_init__(self):
+        if self.min is None and self.max is None:
+            raise ValueError(f"{self.name}: min or max is required")
+
+    def evaluate(self, values) -> np.ndarray:
+        x = as_float_array(values)
+        mask = ~np.isnan(x)
+        if self.min is not None:
+            mask &= (x >= self.min) if self.min_inclusive else (x > self.min)
+        if self.max is not None:
+            mask &= (x <= self.max) if self.max_inclusive else (x < self.max)
+        return mask
+
+
+@dataclass
+class FilterResult:
+    """
+    フィルタの実行結果
+
+    mask は入力の行順の通過フラグ。waterfall は評価した順のフィルタごとに
+    evaluated（評価した行数 = 直前までの残存数）、rejected（除外数）、
+    pass_rate（評価した行のうちの通過率）、survivors（通過後の累積の残存数）、
+    estimated_pass_rate（順序付けに使ったサンプルでの通過率）を持つ。
+    """
+
+    mask: np.ndarray
+    waterfall: pd.DataFrame
+
+    @property
+    def total(self) -> int:
+        return len(self.mask)
+
+    @property
+    def passed(self) -> int:
+        return int(self.mask.sum())
+
+
+class FilterExecutor:
+    """選択率の高い順にフィルタを評価し、残存行だけを次のフィルタに渡す実行エンジン"""
+
+    def __init__(
+        self,
+        filters: Sequence[RangeFilter],
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        seed: int = 0,
+    ):
+        """
+        初期化
+
+        Args:
+            filters: フィルタのリスト（通過率が同じ場合はこの順に評価）
+            sample_size: 通過率を測るサンプルの行数
+            seed: サンプル抽出の乱数シード
+        """
+        names = [f.name for f in filters]
+        if len(set(names)) != len(names):
+            raise ValueError("filter names must be unique")
+        self.filters = list(filters)
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def estimate_pass_rates(self, df: pd.DataFrame) -> List[float]:
+        """各フィルタの通過率をサンプルで推定（filters と同じ順）"""
+        if len(df) == 0:
+            return [1.0] * len(self.filters)
+        rows = np.arange(len(df))
+        if len(df) > self.sample_size:
+            rng = np.random.default_rng(self.seed)
+            rows = np.sort(rng.choice(len(df), self.sample_size, replace=False))
+        return [float(f.evaluate(df[f.field].to_numpy().take(rows)).mean()) for f in self.filters]
+
+    def apply(self, df: pd.DataFrame) -> FilterResult:
+        """
+        全フィルタを適用
+
+        Returns:
+            FilterResult（通過フラグとウォーターフォール）
+        """
+        estimates = self.estimate_pass_rates(df)
+        order = sorted(range(len(self.filters)), key=lambda i: estimates[i])
+
+        survivors = None  # 通過した行の位置（None は全行）
+        rows = []
+        for i in order:
+            f = self.filters[i]
+            values = df[f.field].to_numpy()
+            if survivors is None:
+                evaluated = len(df)
+                survivors = np.flatnonzero(f.evaluate(values))
+            else:
+                evaluated = len(survivors)
+                if evaluated:
+                    survivors = survivors[f.evaluate(values.take(survivors))]
+            rows.append({
+                'filter': f.name,
+                'evaluated': evaluated,
+                'rejected': evaluated - len(survivors),
+                'pass_rate': len(survivors) / evaluated if evaluated else np.nan,
+                'survivors': len(survivors),
+                'estimated_pass_rate': estimates[i],
+            })
+
+        mask = np.zeros(len(df), dtype=bool)
+        mask[np.arange(len(df)) if survivors is None else survivors] = True
+        waterfall = pd.DataFrame(rows, columns=['filter', 'evaluated', 'rejected', 'pass_rate',
+                                                'survivors', 'estimated_pass_rate'])
+        return FilterResult(mask=mask, waterfall=waterfall)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+クロスセクションの相対評価（パーセンタイル / ウィンザー化 z スコア）による採点
+
+PER < 10 倍、ROE ≥ 15% のような絶対的な閾値は、日本株と米国株で水準が大きく異なるため
+市場によって効き方が変わる。相対評価モードでは、各指標を市場 × セクター内の
+パーセンタイル（または上下を切り詰めた z スコア）に変換し、最高点 × 割合（0-1）で採点する。
+
+- ユニバース全体を1回の groupby(...).rank(pct=True)（z スコアは transform）で評価し、
+  行ごとの Python の処理は行わない
+- 銘柄数が min_group_size 未満のグループは、より粗いグループ（市場のみ → 全体）で評価する
+- 割合の計算結果はスナップショット（データの内容のハッシュ、または指定したキー）ごとにキャッシュし、
+  同じユニバースの再採点（重みの変更等）では再計算しない
+
+使用方法:
+    model = RelativeModel.from_score_model(IMURA_TIER2_MODEL, method='percentile',
+                                           directions={'value_dividend': HIGHER})
+    scores = model.evaluate(df)          # ScoreModel.evaluate と同じ列構成
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .rules import Number, ScoreModel, ThresholdRule, as_float_array
+from .sweep import max_points
+
+# 評価の向き
+HIGHER = 'higher'  # 値が大きいほど高評価
+LOWER = 'lower'    # 値が小さいほど高評価
+
+METHODS = ('percentile', 'zscore')
+
+DEFAULT_GROUP_BY = ('market', 'sector')
+DEFAULT_MIN_GROUP_SIZE = 5
+DEFAULT_WINSORIZE = (0.05, 0.95)
+DEFAULT_Z_CLIP = 3.0
+
+# キャッシュするスナップショット数の上限
+CACHE_SIZE = 16
+_cache: 'OrderedDict[Tuple[str, Hashable], pd.DataFrame]' = OrderedDict()
+
+
+def clear_cache() -> None:
+    """スナップショットごとのキャッシュを破棄"""
+    _cache.clear()
+
+
+def snapshot_key(df: pd.DataFrame, columns: Sequence[str]) -> str:
+    """DataFrame の指定列（と index）の内容のハッシュ"""
+    present = [c for c in columns if c in df.columns]
+    digest = hashlib.sha1(str(present).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df[present], index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class RelativeFactor:
+    """相対評価する指標1つ分（最高点 × グループ内での割合）"""
+
+    name: str
+    field: str
+    points: Number
+    direction: str = HIGHER
+    weight: Number = 1
+
+    def __post_init__(self):
+        if self.direction not in (HIGHER, LOWER):
+            raise ValueError(f"{self.name}: direction must be '{HIGHER}' or '{LOWER}'")
+
+
+def _direction_of(rule) -> Optional[str]:
+    """閾値ルールの点数の並びから評価の向きを推定（単調でなければ None）"""
+    if not isinstance(rule, ThresholdRule):
+        return None
+    steps = np.diff(np.asarray(rule.points, dtype=float))
+    if (steps >= 0).all() and (steps > 0).any():
+        return HIGHER
+    if (steps <= 0).all() and (steps < 0).any():
+        return LOWER
+    return None
+
+
+@dataclass
+class RelativeModel:
+    """
+    指標をクロスセクションの相対値で採点するモデル
+
+    method='percentile' はグループ内のパーセンタイル順位（rank(pct=True)、最上位で1）、
+    method='zscore' はグループ内の分位点 winsorize で上下を切り詰めた値の z スコアを
+    ±z_clip で切り、0-1 に線形変換した値を割合とする。
+    欠損値は0点。group_by のうち入力にない列は使わない。
+    """
+
+    name: str
+    factors: List[RelativeFactor]
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    total: str = 'total_score'
+    method: str = 'percentile'
+    group_by: Tuple[str, ...] = DEFAULT_GROUP_BY
+    min_group_size: int = DEFAULT_MIN_GROUP_SIZE
+    winsorize: Tuple[float, float] = DEFAULT_WINSORIZE
+    z_clip: float = DEFAULT_Z_CLIP
+
+    def __post_init__(self):
+        if self.method not in METHODS:
+            raise ValueError(f"{self.name}: method must be one of {METHODS}: {self.method}")
+        names = [f.name for f in self.factors]
+        if len(set(names)) != len(names):
+            raise ValueError(f"{self.name}: factor names must be unique")
+        unknown = {n for members in self.groups.values() for n in members} - set(names)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown factors in groups: {sorted(unknown)}")
+        self.group_by = tuple(self.group_by)
+        self.winsorize = tuple(self.winsorize)
+
+    @classmethod
+    def from_score_model(cls, model: ScoreModel, method: str = 'percentile',
+                         directions: Optional[Mapping[str, str]] = None,
+                         **kwargs) -> 'RelativeModel':
+        """
+        ScoreModel の各ルールを同じ最高点・重みの相対評価に置き換えたモデル
+
+        評価の向きは閾値ルールの点数の並びから推定する。区間・対応表のルールなど
+        推定できないものは directions で指定する（clip・multipliers・truncate は引き継がない）。
+        """
+        directions = dict(directions or {})
+        factors = []
+        for rule in model.rules:
+            direction = directions.get(rule.name) or _direction_of(rule)
+            if direction is None:
+                raise ValueError(f"{model.name}: direction is required for rule '{rule.name}'")
+            factors.append(RelativeFactor(rule.name, rule.field, max_points(rule),
+                                          direction=direction, weight=rule.weight))
+        return cls(name=f'{model.name}_{method}', factors=factors, groups=model.groups,
+                   total=model.total, method=method, **kwargs)
+
+    @property
+    def factor_names(self) -> List[str]:
+        return [f.name for f in self.factors]
+
+    # ----- グループ内の割合 -----
+
+    def _oriented(self, df: pd.DataFrame) -> pd.DataFrame:
+        # LOWER の指標は符号を反転し、すべて「大きいほど高評価」にそろえる
+        columns = {}
+        for f in self.factors:
+            values = as_float_array(df[f.field]) if f.field in df.columns else np.full(len(df), np.nan)
+            columns[f.name] = values if f.direction == HIGHER else -values
+        return pd.DataFrame(columns, index=df.index)
+
+    def _level_fractions(self, values: pd.DataFrame, keys: List[pd.Series]) -> pd.DataFrame:
+        grouped = values.groupby(keys)
+        if self.method == 'percentile':
+            return grouped.rank(pct=True)
+        low, high = self.winsorize
+        clipped = values.clip(grouped.transform('quantile', low), grouped.transform('quantile', high))
+        grouped = clipped.groupby(keys)
+        std = grouped.transform('std')
+        z = (clipped - grouped.transform('mean')) / std.where(std > 0)
+        # 全銘柄が同じ値（標準偏差0）のグループは平均（z = 0）とする
+        z = z.mask(z.isna() & clipped.notna(), 0.0)
+        c = self.z_clip
+        return (z.clip(-c, c) + c) / (2 * c)
+
+    def fractions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        指標ごとのグループ内での割合（0-1、欠損は NaN）
+
+        group_by の細かい順（市場 × セクター → 市場 → 全体）に、有効な値の数が
+        min_group_size 以上の最初のグループで評価する。
+        """
+        values = self._oriented(df)
+        columns = [c for c in self.group_by if c in df.columns]
+        universe = pd.Series(0, index=df.index)
+        levels = [[df[c] for c in columns[:i]] for i in range(len(columns), 0, -1)] + [[universe]]
+
+        result = None
+        pending = None  # まだ割合が決まっていない（グループが小さい）セル
+        for i, keys in enumerate(levels):
+            last = i == len(levels) - 1
+            fractions = self._level_fractions(values, keys)
+            if not last:
+                # キーが欠損の行は count も NaN になり、次のレベルで評価する
+                enough = values.groupby(keys).transform('count').reindex(values.index) >= self.min_group_size
+            else:
+                enough = pd.DataFrame(True, index=values.index, columns=values.columns)
+            if result is None:
+                result = fractions.where(enough)
+                pending = ~enough
+            else:
+                result = result.mask(pending & enough, fractions)
+                pending &= ~enough
+            if not pending.to_numpy().any():
+                break
+        return result.where(values.notna())
+
+    # ----- 採点 -----
+
+    def _fraction_spec(self) -> Dict:
+        # 割合の計算に影響する設定（点数・重みは含めない）
+        return {
+            'factors': [(f.name, f.field, f.direction) for f in self.factors],
+            'method': self.method, 'group_by': list(self.group_by),
+            'min_group_size': self.min_group_size, 'winsorize': list(self.winsorize),
+            'z_clip': self.z_clip,
+        }
+
+    def _cached_fractions(self, df: pd.DataFrame, snapshot: Optional[Hashable],
+                          use_cache: bool) -> pd.DataFrame:
+        if not use_cache:
+            return self.fractions(df)
+        spec = hashlib.sha1(json.dumps(self._fraction_spec(), sort_keys=True).encode('utf-8'))
+        if snapshot is None:
+            snapshot = snapshot_key(df, [f.field for f in self.factors] + list(self.group_by))
+        key = (spec.hexdigest()[:12], snapshot)
+        cached = _cache.get(key)
+        if cached is not None and cached.index.equals(df.index):
+            _cache.move_to_end(key)
+            return cached
+        fractions = self.fractions(df)
+        _cache[key] = fractions
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        return fractions
+
+    def evaluate(self, df: pd.DataFrame, snapshot: Optional[Hashable] = None,
+                 use_cache: bool = True) -> pd.DataFrame:
+        """
+        DataFrame 全体を一括採点
+
+        Args:
+            df: ユニバース全体（相対評価の母集団）
+            snapshot: キャッシュのキー（例: データの取得日）。None ならデータの内容のハッシュ
+            use_cache: スナップショットごとのキャッシュを使うか
+
+        Returns:
+            指標別の点数（最高点 × 割合、重み適用前）、グループ別小計、合計の列を持つDataFrame
+            （ScoreModel.evaluate と同じ列構成、index は df と同じ）
+        """
+        fractions = self._cached_fractions(df, snapshot, use_cache)
+        points = {f.name: fractions[f.name].fillna(0.0).to_numpy() * f.points for f in self.factors}
+        weighted = {f.name: points[f.name] * f.weight for f in self.factors}
+
+        result = dict(points)
+        for group, members in self.groups.items():
+            result[group] = sum(weighted[name] for name in members)
+        result[self.total] = sum(weighted.values()) if weighted else np.zeros(len(df))
+        return pd.DataFrame(result, index=df.index)
+
+    def to_dict(self) -> Dict:
+        """JSON に保存できる辞書表現"""
+        spec = asdict(self)
+        spec['group_by'] = list(self.group_by)
+        spec['winsorize'] = list(self.winsorize)
+        return spec
+
+    def fingerprint(self) -> str:
+        """モデルのハッシュ（ScoreModel.fingerprint と同じ用途）"""
+        payload = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+宣言的な閾値テーブルによる採点エンジン
+
+各分析スクリプトで手書きされていた「if/elif の閾値の段階 → 点数」を、
+ルール（対象列・閾値・点数・欠損時の点数・重み）の表として定義し、
+np.digitize / np.select で DataFrame 全体を一括評価する。
+
+ルールの種類:
+- ThresholdRule: 単調な閾値の段階（np.digitize）
+- IntervalRule:  境界の開閉が混在する区間（np.select、先に一致した区間を採用）
+- LookupRule:    カテゴリ値 → 点数の対応表（セクター別の基礎点など）
+
+ScoreModel はルールの集合で、重み付き合計・グループ別小計・上下限・係数を扱う。
+to_dict() / from_dict() で JSON に保存でき、fingerprint() でルール表の同一性を判定できる。
+
+使用方法:
+    model = ScoreModel('example', rules=[
+        ThresholdRule('score_roe', 'roe', breakpoints=[5, 10, 15, 20], points=[0, 5, 10, 15, 20]),
+    ])
+    scores = model.evaluate(df)          # ルール別の点数列 + total_score
+    one = model.score_one({'roe': 16.0})  # 1件分（dict）
+"""
+
+import hashlib
+import json
+import numbers
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Number = Union[int, float]
+
+
+def as_float_array(values: Any) -> np.ndarray:
+    """
+    数値の配列に変換（数値でない値・None は NaN）
+
+    文字列は数値に変換しない（'12' も欠損扱い）。
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+        return values.astype(float, copy=False)
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=float)
+    return np.array([v if isinstance(v, numbers.Real) else np.nan for v in series], dtype=float)
+
+
+def _points_array(points: Sequence[Number], missing: Number) -> np.ndarray:
+    # 点数がすべて整数なら整数配列のまま扱う（出力列を int に保つため）
+    return np.asarray(list(points) + [missing])
+
+
+# ===========================
+# ルール
+# ===========================
+
+@dataclass
+class ThresholdRule:
+    """
+    単調な閾値の段階で点数を決めるルール
+
+    breakpoints は昇順で、points は len(breakpoints) + 1 個
+    （最も小さい区間から順）。inclusive=True の場合は「値 >= 閾値」で上の段階に、
+    False の場合は「値 > 閾値」で上の段階に入る。
+    """
+
+    name: str
+    field: str
+    breakpoints: Sequence[Number]
+    points: Sequence[Number]
+    inclusive: bool = True
+    missing: Number = 0
+    weight: Number = 1
+
+    kind = 'threshold'
+
+    def __post_init__(self):
+        self.breakpoints = list(self.breakpoints)
+        self.points = list(self.points)
+        if len(self.points) != len(self.breakpoints) + 1:
+            raise ValueError(f"{self.name}: points must have len(breakpoints) + 1 elements")
+        if any(a >= b for a, b in zip(self.breakpoints, self.breakpoints[1:])):
+            raise ValueError(f"{self.name}: breakpoints must be strictly increasing")
+        self._bins = np.asarray(self.breakpoints, dtype=float)
+        self._points = _points_array(self.points, self.missing)
+
+    def evaluate(self, values: Any) -> np.ndarray:
+        x = as_float_array(values)
+        index = np.digitize(x, self._bins, right=not self.inclusive)
+        index[np.isnan(x)] = len(self._points) - 1  # 欠損
+        return self._points[index]
+
+
+@dataclass
+class Band:
+    """IntervalRule の1区間（closed: 'both' / 'left' / 'right' / 'neither'）"""
+
+    lower: Optional[Number]
+    upper: Optional[Number]
+    points: Number
+    closed: str = 'left'
+
+    def __post_init__(self):
+        if self.closed not in ('both', 'left', 'right', 'neither'):
+            raise ValueError(f"closed must be 'both', 'left', 'right' or 'neither': {self.closed}")
+
+    def contains(self, x: np.ndarray) -> np.ndarray:
+        condition = np.ones(len(x), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            if self.lower is not None:
+                condition &= (x >= self.lower) if self.closed in ('both', 'left') else (x > self.lower)
+            if self.upper is not None:
+                condition &= (x <= self.upper) if self.closed in ('both', 'right') else (x < self.upper)
+        return condition
+
+
+@dataclass
+class IntervalRule:
+    """
+    区間ごとに点数を決めるルール（境界の開閉が混在する場合、適正レンジを優遇する場合）
+
+    bands は先頭から順に判定し、最初に一致した区間の点数を採用する。
+    どの区間にも一致しない場合は default、欠損値は missing。
+    """
+
+    name: str
+    field: str
+    bands: Sequence[Band]
+    default: Number = 0
+    missing: Number = 0
+    weight: Number = 1
+
+    kind = 'interval'
+
+    def __post_init__(self):
+        self.bands = [b if isinstance(b, Band) else Band(**b) for b in self.bands]
+
+    def evaluate(self, values: Any) -> np.ndarray:
+        x = as_float_array(values)
+        conditions = [band.contains(x) for band in self.bands] + [np.isnan(x)]
+        choices = [band.points for band in self.bands] + [self.missing]
+        return np.select(conditions, choices, self.default)
+
+
+@dataclass
+class LookupRule:
+    """カテゴリ値（セクター名・銘柄コード等）→ 点数の対応表によるルール"""
+
+    name: str
+    field: str
+    table: Mapping[Any, Number]
+    default: Number = 0
+    missing: Optional[Number] = None
+    weight: Number = 1
+
+    kind = 'lookup'
+
+    def __post_init__(self):
+        self.table = dict(self.table)
+        # 対応表を索引（pd.Index）と点数の配列に一度だけ変換しておく（末尾2要素は default / missing）
+        missing = self.default if self.missing is None else self.missing
+        points = list(self.table.values()) + [self.default, missing]
+        dtype = int if all(isinstance(p, numbers.Integral) for p in points) else float
+        self._keys = pd.Index(list(self.table), dtype=object)
+        self._points = np.asarray(points, dtype=dtype)
+
+    def evaluate(self, values: Any) -> np.ndarray:
+        # 入力をカテゴリ値のコードに変換し、対応表はカテゴリ値（少数）に対してだけ引く
+        codes, uniques = pd.factorize(values if isinstance(values, pd.Series) else pd.Series(values))
+        positions = self._keys.get_indexer(uniques)
+        positions = np.where(positions < 0, len(self.table), positions)
+        # コード -1（欠損）は末尾の missing
+        positions = np.append(positions, len(self.table) + 1)
+        return self._points[positions[codes]]
+
+
+Rule = Union[ThresholdRule, IntervalRule, LookupRule]
+
+_RULE_TYPES = {cls.kind: cls for cls in (ThresholdRule, IntervalRule, LookupRule)}
+
+
+# ===========================
+# モデル
+# ===========================
+
+@dataclass
+class ScoreModel:
+    """
+    ルールの集合による採点モデル
+
+    合計 = Σ(ルールの点数 × 重み) を clip で上下限に収め、multipliers の点数（係数）を掛け、
+    truncate=True なら小数点以下を切り捨てる。
+    groups を指定すると、ルールの重み付き点数のグループ別小計列も出力する。
+    """
+
+    name: str
+    rules: List[Rule]
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    total: str = 'total_score'
+    clip: Optional[Tuple[Number, Number]] = None
+    multipliers: List[Rule] = field(default_factory=list)
+    truncate: bool = False
+
+    def __post_init__(self):
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"{self.name}: rule names must be unique")
+        unknown = {n for members in self.groups.values() for n in members} - set(names)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown rules in groups: {sorted(unknown)}")
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [rule.name for rule in self.rules]
+
+    def _column(self, data, rule, length):
+        if rule.field in data:
+            return data[rule.field]
+        return pd.Series([np.nan] * length)
+
+    def evaluate_arrays(self, data: Mapping[str, Any], length: int) -> Dict[str, np.ndarray]:
+        """列名 → 配列の辞書に対して評価し、出力列名 → 配列の辞書を返す"""
+        points = {rule.name: rule.evaluate(self._column(data, rule, length)) for rule in self.rules}
+        weighted = {rule.name: points[rule.name] * rule.weight for rule in self.rules}
+
+        result = dict(points)
+        for group, members in self.groups.items():
+            result[group] = sum(weighted[name] for name in members)
+
+        total = sum(weighted.values()) if weighted else np.zeros(length, dtype=int)
+        if self.clip is not None:
+            total = np.clip(total, *self.clip)
+        for rule in self.multipliers:
+            total = total * rule.evaluate(self._column(data, rule, length))
+        if self.truncate:
+            total = np.trunc(total).astype(int)
+        result[self.total] = total
+        return result
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        DataFrame 全体を一括採点
+
+        Returns:
+            ルール別の点数（重み適用前）、グループ別小計、合計の列を持つDataFrame
+            （index は df と同じ。入力に列がないルールは欠損として扱う）
+        """
+        return pd.DataFrame(self.evaluate_arrays(df, len(df)), index=df.index)
+
+    def score_one(self, record: Mapping[str, Any]) -> Dict[str, Any]:
+        """1件分（dict や pd.Series）を採点し、出力列名 → 値の辞書を返す"""
+        data = {key: pd.Series([value], dtype=object) for key, value in dict(record).items()}
+        return {key: values[0].item() for key, values in self.evaluate_arrays(data, 1).items()}
+
+    def with_weights(self, weights: Mapping[str, Number]) -> 'ScoreModel':
+        """一部のルールの重みを変更したモデルを返す（元のモデルは変更しない）"""
+        spec = self.to_dict()
+        for rule in spec['rules']:
+            rule['weight'] = weights.get(rule['name'], rule['weight'])
+        return ScoreModel.from_dict(spec)
+
+    # ----- 保存・同一性 -----
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON に保存できる辞書表現"""
+        def rule_dict(rule):
+            return {'type': rule.kind, **asdict(rule)}
+
+        return {
+            'name': self.name,
+            'rules': [rule_dict(rule) for rule in self.rules],
+            'groups': self.groups,
+            'total': self.total,
+            'clip': list(self.clip) if self.clip is not None else None,
+            'multipliers': [rule_dict(rule) for rule in self.multipliers],
+            'truncate': self.truncate,
+        }
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> 'ScoreModel':
+        """to_dict() の辞書表現から復元"""
+        def rule_from(item):
+            item = dict(item)
+            return _RULE_TYPES[item.pop('type')](**item)
+
+        return cls(
+            name=spec['name'],
+            rules=[rule_from(item) for item in spec['rules']],
+            groups={k: list(v) for k, v in spec.get('groups', {}).items()},
+            total=spec.get('total', 'total_score'),
+            clip=tuple(spec['clip']) if spec.get('clip') is not None else None,
+            multipliers=[rule_from(item) for item in spec.get('multipliers', [])],
+            truncate=spec.get('truncate', False),
+        )
+
+    def fingerprint(self) -> str:
+        """ルール表のハッシュ（採点結果のキャッシュキー等に使う）"""
+        payload = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
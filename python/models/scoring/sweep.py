@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+ファクターの重み付けの感度分析（ウェイトスイープ）
+
+銘柄 × ファクターの得点行列を一度だけ作り、多数の重みベクトルを
+行列積（得点行列 @ 重み行列の転置）でまとめて評価する。
+重み付けを変えるたびに採点し直す代わりに、1回の呼び出しで
+「各銘柄がどの程度の割合で上位N銘柄に残るか」等の順位の安定性を集計する。
+
+使用方法:
+    sweep = WeightSweep.from_model(INVESTMENT_SCORE_MODEL, df, index=df['ticker'])
+    grid = weight_grid(sweep.factors, step=0.05)
+    stability = sweep.rank_stability(grid, top_n=10)
+"""
+
+from itertools import combinations
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rules import IntervalRule, LookupRule, ScoreModel
+
+# 1回の行列積で評価する重みベクトル数の目安（銘柄数 × この値の要素数までに抑える）
+DEFAULT_MAX_ELEMENTS = 20_000_000
+
+
+def max_points(rule) -> float:
+    """ルールの最高点"""
+    if isinstance(rule, IntervalRule):
+        candidates = [band.points for band in rule.bands] + [rule.default, rule.missing]
+    elif isinstance(rule, LookupRule):
+        candidates = list(rule.table.values()) + [rule.default]
+    else:
+        candidates = list(rule.points) + [rule.missing]
+    return float(max(candidates))
+
+
+def weight_grid(factors: Sequence[str], step: float = 0.05, total: float = 1.0) -> np.ndarray:
+    """
+    合計が total になる重みベクトルの格子（各重みは step 刻み、0 を含む）
+
+    Returns:
+        (重みベクトル数, ファクター数) の配列。5ファクター・5%刻みで 10,626 通り
+    """
+    k = len(factors)
+    units = int(round(total / step))
+    if k == 0 or units <= 0:
+        raise ValueError("factors must be non-empty and step must be <= total")
+    # 仕切りの位置の組み合わせ（重複組み合わせ）から各ファクターの単位数を求める
+    bars = np.array(list(combinations(range(units + k - 1), k - 1)), dtype=int).reshape(-1, k - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), units + k - 1)])
+    return (np.diff(edges, axis=1) - 1) * step
+
+
+def perturbed_weights(base: Sequence[float], n: int, concentration: float = 100.0,
+                      seed: Optional[int] = None) -> np.ndarray:
+    """
+    基準の重みの周辺の重みベクトル（ディリクレ分布、合計は基準と同じ）
+
+    concentration が大きいほど基準の近くに集中する。
+    """
+    base = np.asarray(base, dtype=float)
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(base / base.sum() * concentration, size=n) * base.sum()
+
+
+class WeightSweep:
+    """銘柄 × ファクターの得点行列に対して、多数の重みベクトルをまとめて評価する"""
+
+    def __init__(self, scores: pd.DataFrame, baseline: Optional[Sequence[float]] = None):
+        """
+        初期化
+
+        Args:
+            scores: 銘柄 × ファクターの得点（index は銘柄、欠損は0点）
+            baseline: 現行の重み（順位の比較に使う）
+        """
+        self.factors: List[str] = list(scores.columns)
+        self.index = scores.index
+        self.matrix = scores.to_numpy(dtype=float, na_value=0.0)
+        self.baseline = None if baseline is None else np.asarray(baseline, dtype=float)
+        if self.baseline is not None and len(self.baseline) != len(self.factors):
+            raise ValueError("baseline must have one weight per factor")
+
+    @classmethod
+    def from_model(cls, model: ScoreModel, df: pd.DataFrame, by: str = 'rules',
+                   index: Optional[Sequence] = None) -> 'WeightSweep':
+        """
+        ScoreModel の採点結果から作成
+
+        by='rules' はルールごとの点数をファクターとし、ルールの重みを基準とする。
+        by='groups' はグループ別小計を最高点で0-1に正規化してファクターとし、
+        各グループの最高点（例: 井村氏手法3.0 の 40/40/20/10）を基準の重みとする。
+        """
+        evaluated = model.evaluate(df)
+        if by == 'rules':
+            scores = evaluated[model.rule_names]
+            baseline = [rule.weight for rule in model.rules]
+        elif by == 'groups':
+            rules = {rule.name: rule for rule in model.rules}
+            maxima = {group: sum(max_points(rules[name]) * rules[name].weight for name in members)
+                      for group, members in model.groups.items()}
+            scores = evaluated[list(model.groups)] / pd.Series(maxima)
+            baseline = list(maxima.values())
+        else:
+            raise ValueError(f"by must be 'rules' or 'groups': {by}")
+        if index is not None:
+            scores = scores.set_axis(list(index), axis=0)
+        return cls(scores, baseline=baseline)
+
+    def _chunks(self, weights: np.ndarray, max_elements: int):
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        if weights.shape[1] != len(self.factors):
+            raise ValueError(f"weights must have {len(self.factors)} columns")
+        size = max(1, max_elements // max(1, len(self.matrix)))
+        for start in range(0, len(weights), size):
+            yield self.matrix @ weights[start:start + size].T
+
+    def evaluate(self, weights: np.ndarray) -> np.ndarray:
+        """
+        重みベクトルごとの総合スコア
+
+        Returns:
+            (銘柄数, 重みベクトル数) の配列
+        """
+        return np.hstack(list(self._chunks(weights, DEFAULT_MAX_ELEMENTS)))
+
+    @staticmethod
+    def _ranks(totals: np.ndarray) -> np.ndarray:
+        # 1始まりの順位（同点は入力順）
+        order = np.argsort(-totals, axis=0, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(totals) + 1)[:, None], axis=0)
+        return ranks
+
+    def rank_stability(self, weights: np.ndarray, top_n: int = 10,
+                       max_elements: int = DEFAULT_MAX_ELEMENTS) -> pd.DataFrame:
+        """
+        重みベクトル全体での各銘柄の順位の安定性
+
+        Args:
+            weights: (重みベクトル数, ファクター数) の配列
+            top_n: 上位何銘柄に残るかを数える
+            max_elements: 1回の行列積の要素数の上限（メモリ使用量の目安）
+
+        Returns:
+            銘柄ごとの top_n_rate（上位N銘柄に入った割合）、mean_rank、rank_std、
+            best_rank、worst_rank、baseline_rank（基準の重みでの順位）のDataFrame
+            （top_n_rate の高い順）
+        """
+        n = len(self.matrix)
+        in_top = np.zeros(n)
+        rank_sum = np.zeros(n)
+        rank_sq = np.zeros(n)
+        best = np.full(n, n + 1)
+        worst = np.zeros(n, dtype=int)
+        count = 0
+        for totals in self._chunks(weights, max_elements):
+            ranks = self._ranks(totals)
+            in_top += (ranks <= top_n).sum(axis=1)
+            rank_sum += ranks.sum(axis=1)
+            rank_sq += (ranks.astype(float) ** 2).sum(axis=1)
+            best = np.minimum(best, ranks.min(axis=1))
+            worst = np.maximum(worst, ranks.max(axis=1))
+            count += ranks.shape[1]
+        if count == 0:
+            raise ValueError("weights must contain at least one weight vector")
+
+        mean = rank_sum / count
+        result = pd.DataFrame({
+            'top_n_rate': in_top / count,
+            'mean_rank': mean,
+            'rank_std': np.sqrt(np.maximum(rank_sq / count - mean ** 2, 0.0)),
+            'best_rank': best,
+            'worst_rank': worst,
+        }, index=self.index)
+        if self.baseline is not None:
+            result['baseline_rank'] = self._ranks(self.matrix @ self.baseline[:, None])[:, 0]
+        return result.sort_values(['top_n_rate', 'mean_rank'], ascending=[False, True], kind='stable')
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+分散制約付きの上位N銘柄選定（井村氏手法3.0 Tier 3）
+
+スコア順の候補から、次の制約を満たす銘柄を選ぶ。
+- セクター上限: 1セクターあたり max_stocks × sector_cap_ratio 銘柄まで
+- 市場別の配分: market_split で指定した割合（例: JP 60% / US 40%）まで
+- 最低セクター数: 足りない場合は未採用セクターの（市場別の枠で採用できる）最上位銘柄で入れ替え（バックフィル）
+- 単一銘柄上限: ウェイトの上限（超過分は他の銘柄に再配分）
+
+バックフィル前の選定結果は「スコア順に1銘柄ずつ、上限に達していなければ採用」する
+逐次処理と一致するが、セクター内・市場内の順位（groupby の累積和）の配列演算で求めるため、
+候補数が多くても高速。選定数は常に max_stocks 以下。
+
+使用方法:
+    selected = select_diversified(df, max_stocks=50, market_split={'JP': 0.5, 'US': 0.5})
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SECTOR_CAP_RATIO = 0.10
+DEFAULT_MIN_SECTORS = 6
+DEFAULT_MAX_WEIGHT = 0.05
+
+UNKNOWN = 'Unknown'
+
+
+def _codes(df: pd.DataFrame, column: str):
+    """列を整数コードに変換（欠損・列なしは UNKNOWN）。(コード配列, ラベルのリスト) を返す"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=np.int64), [UNKNOWN]
+    codes, labels = pd.factorize(df[column])
+    labels = list(labels)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append(UNKNOWN)
+    return codes.astype(np.int64), labels
+
+
+def _group_rank(flags: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """グループ（コード）ごとに、各行までの flags の累積数 - 1"""
+    return pd.Series(flags).groupby(codes).cumsum().to_numpy() - 1
+
+
+def _capped_mask(sectors: np.ndarray, markets: np.ndarray, sector_cap: int,
+                 quota: Optional[np.ndarray]) -> np.ndarray:
+    """
+    スコア順に並んだ候補のうち、セクター上限・市場別上限の下で採用される行
+
+    市場別上限で除外した行はセクターの枠を消費しないため、除外行を除いて
+    セクター内順位を求め直す。枠が埋まった市場のそれ以降の行は逐次処理でも必ず除外されるので
+    まとめて除外する（除外は単調に増えるだけなので、市場の数程度の反復で収束する）。
+    """
+    n = len(sectors)
+    rejected = np.zeros(n, dtype=bool)
+    while True:
+        pool = ~rejected
+        candidate = pool & (_group_rank(pool, sectors) < sector_cap)
+        if quota is None:
+            return candidate
+
+        over = candidate & (_group_rank(candidate, markets) >= quota[markets])
+        if not over.any():
+            return candidate
+        # 枠が埋まった市場は、最初に枠を超えた行以降をすべて除外
+        closed_from = np.full(len(quota), n)
+        np.minimum.at(closed_from, markets[over], np.flatnonzero(over))
+        rejected |= np.arange(n) >= closed_from[markets]
+
+
+def _backfill_sectors(selected: np.ndarray, sectors: np.ndarray, markets: np.ndarray,
+                      min_sectors: int, quota: Optional[np.ndarray]) -> np.ndarray:
+    """
+    採用セクター数が min_sectors に満たない場合、未採用セクターの銘柄と
+    複数銘柄を採用しているセクターの最下位銘柄を入れ替える
+
+    未採用セクターごとに、市場別の枠で採用できる最上位の銘柄を候補とし、スコアの高い順に入れ替える
+    （市場の枠が埋まっていれば同じ市場の銘柄と入れ替える）。採用済みのセクターの銘柄は加えないため、
+    入れ替えのたびにセクター数が1増え、セクター上限を超えることもない。
+    selected・sectors・markets はスコア順に並んだ候補の配列（sectors・markets は整数コード）。
+    """
+    selected = selected.copy()
+    while True:
+        chosen = np.flatnonzero(selected)
+        counts = np.bincount(sectors[chosen], minlength=sectors.max() + 1)
+        if (counts > 0).sum() >= min_sectors:
+            break
+        # 入れ替え対象: 2銘柄以上採用しているセクターの銘柄（スコアの低い順）
+        removable = chosen[counts[sectors[chosen]] > 1][::-1]
+        market_counts = np.bincount(markets[chosen], minlength=markets.max() + 1)
+        swap = None
+        # 未採用セクターの銘柄をスコア順に調べ、最初に入れ替えられる銘柄を採用
+        for i in np.flatnonzero(counts[sectors] == 0):
+            if quota is None or market_counts[markets[i]] < quota[markets[i]]:
+                outgoing = removable
+            else:
+                outgoing = removable[markets[removable] == markets[i]]
+            if len(outgoing):
+                swap = outgoing[0], i
+                break
+        if swap is None:
+            break
+        selected[swap[0]] = False
+        selected[swap[1]] = True
+    return selected
+
+
+def cap_weights(raw: np.ndarray, max_weight: float) -> np.ndarray:
+    """
+    ウェイトを合計1に正規化し、単一銘柄の上限を超えた分を残りの銘柄に比例配分
+
+    全銘柄が上限に達しても配分しきれない場合（銘柄数 × 上限 < 1）、残りは現金とする。
+    """
+    raw = np.clip(np.asarray(raw, dtype=float), 0, None)
+    if len(raw) == 0:
+        return raw
+    if raw.sum() <= 0:
+        raw = np.ones(len(raw))
+    weights = raw / raw.sum()
+    capped = np.zeros(len(raw), dtype=bool)
+    while True:
+        over = ~capped & (weights > max_weight)
+        if not over.any():
+            return weights
+        capped |= over
+        weights[capped] = max_weight
+        remaining = 1.0 - capped.sum() * max_weight
+        free = ~capped
+        if not free.any() or remaining <= 0:
+            return weights
+        weights[free] = raw[free] / raw[free].sum() * remaining
+
+
+def select_diversified(
+    df: pd.DataFrame,
+    max_stocks: int = 50,
+    score: str = 'total_score',
+    sector_cap_ratio: float = DEFAULT_SECTOR_CAP_RATIO,
+    min_sectors: int = DEFAULT_MIN_SECTORS,
+    max_weight: float = DEFAULT_MAX_WEIGHT,
+    market_split: Optional[Dict[str, float]] = None,
+    weighting: str = 'equal',
+) -> pd.DataFrame:
+    """
+    分散制約の下でスコア上位の銘柄を選定
+
+    Args:
+        df: 候補銘柄（score 列、'sector' 列、market_split 指定時は 'market' 列）
+        max_stocks: 選定銘柄数の上限
+        score: 順位付けに使うスコア列
+        sector_cap_ratio: 1セクターの銘柄数上限（max_stocks に対する割合、最低1銘柄）
+        min_sectors: 最低セクター数（候補のセクター数が少なければ候補の全セクター）
+        max_weight: 単一銘柄のウェイト上限
+        market_split: 市場 → 銘柄数の割合（例: {'JP': 0.6, 'US': 0.4}）。指定しない市場は0銘柄
+        weighting: 'equal'（等ウェイト）or 'score'（スコア比例）
+
+    Returns:
+        選定銘柄のDataFrame（スコア順、'weight' 列付き、index は df と同じ）
+    """
+    if weighting not in ('equal', 'score'):
+        raise ValueError(f"weighting must be 'equal' or 'score': {weighting}")
+
+    # スコア順（同点は入力順）
+    order = np.argsort(-df[score].to_numpy(dtype=float), kind='stable')
+    ranked = df.iloc[order]
+    sectors, _ = _codes(ranked, 'sector')
+    markets, market_labels = _codes(ranked, 'market')
+
+    sector_cap = max(1, int(max_stocks * sector_cap_ratio))
+    quota = None
+    if market_split:
+        quota = np.array([int(round(max_stocks * market_split.get(m, 0))) for m in market_labels])
+
+    selected = _capped_mask(sectors, markets, sector_cap, quota)
+    selected &= np.cumsum(selected) <= max_stocks
+    selected = _backfill_sectors(selected, sectors, markets, min_sectors, quota)
+
+    result = ranked[selected].copy()
+    raw = np.ones(len(result)) if weighting == 'equal' else result[score].to_numpy(dtype=float)
+    result['weight'] = cap_weights(raw, max_weight)
+    return result
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+井村氏手法3.0 Tier 1 必須基準・Tier 2 ファクタースコアの列指向エンジン
+
+Tier 1 の必須基準（除外基準）は IMURA_TIER1_FILTERS として定義し、
+FilterExecutor で絞り込みの強い基準から順に、残存銘柄だけを評価する。
+
+imura_method_3.0_screening.py の calculate_value_score / calculate_quality_score /
+calculate_momentum_score / calculate_other_score（従来は1行ずつの df.apply）の採点基準を
+ルール表（IMURA_TIER2_MODEL）として定義し、DataFrame 全体への配列演算で一括算出する。
+
+各ファクターの小項目ごとの得点（寄与）も列として出力する。
+relative='percentile' / 'zscore' を指定すると、絶対的な閾値の代わりに
+市場 × セクター内の相対評価（IMURA_TIER2_RELATIVE）で同じ配点の採点を行う。
+
+使用方法:
+    result = IMURA_TIER1_EXECUTOR.apply(df)
+    df = df[result.mask]
+    scores = score_tier2(df)
+    df = df.join(scores)
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from python.models.scoring import (
+    HIGHER, Band, FilterExecutor, IntervalRule, RangeFilter, RelativeModel, ScoreModel,
+    ThresholdRule,
+)
+from python.models.scoring.relative import METHODS
+
+# Tier 1 の必須基準（すべて満たす銘柄のみ Tier 2 へ）。欠損値は不通過
+IMURA_TIER1_FILTERS = [
+    RangeFilter('PER 5-30倍', 'pe_ratio', min=5, max=30),
+    # 配当利回りはベーシスポイント（250 = 2.5%）
+    RangeFilter('配当利回り 2.5-6.0%', 'dividend_yield', min=250, max=600),
+    RangeFilter('ROE ≥ 8%', 'roe', min=8.0),
+    RangeFilter('D/E比率 < 200%', 'debt_equity_ratio', max=200, max_inclusive=False),
+    RangeFilter('フリーCF > 0', 'free_cash_flow', min=0, min_inclusive=False),
+    RangeFilter('時価総額 ≥ 300億円', 'market_cap', min=30000),  # 単位: 百万円
+    RangeFilter('1日出来高 ≥ 1億円', 'avg_volume', min=100000000),
+]
+
+IMURA_TIER1_EXECUTOR = FilterExecutor(IMURA_TIER1_FILTERS)
+
+# ファクター → 小項目（寄与列）の対応。合計列名 → 小項目列名のリスト
+TIER2_FACTORS: Dict[str, List[str]] = {
+    'value_score': ['value_per', 'value_pbr', 'value_dividend'],
+    'quality_score': ['quality_roe', 'quality_de_ratio', 'quality_operating_margin',
+                      'quality_fcf_to_sales'],
+    'momentum_score': ['momentum_price_change_6m', 'momentum_52w_high'],
+    'other_score': ['other_dividend_years', 'other_analyst_rating'],
+}
+
+TIER2_CONTRIBUTIONS = [name for names in TIER2_FACTORS.values() for name in names]
+
+# Tier 2 のルール表（110点満点）。欠損値は各小項目で0点
+IMURA_TIER2_MODEL = ScoreModel(
+    'imura_3.0_tier2',
+    groups=TIER2_FACTORS,
+    rules=[
+        # バリュー（40点満点）
+        ThresholdRule('value_per', 'pe_ratio', [10, 15, 20, 30], [20, 15, 10, 5, 0]),
+        ThresholdRule('value_pbr', 'price_book_ratio', [1.0, 1.5], [10, 5, 0]),
+        # 配当利回りはベーシスポイント（400 = 4.0%）
+        IntervalRule('value_dividend', 'dividend_yield', [
+            Band(400, 600, 10, closed='both'),
+            Band(300, 400, 5, closed='left'),
+        ]),
+        # クオリティ（40点満点）
+        ThresholdRule('quality_roe', 'roe', [10, 15, 30], [0, 5, 10, 15]),
+        ThresholdRule('quality_de_ratio', 'debt_equity_ratio', [50, 100], [10, 5, 0]),
+        ThresholdRule('quality_operating_margin', 'operating_margin', [10, 15], [0, 5, 10]),
+        ThresholdRule('quality_fcf_to_sales', 'fcf_to_sales', [10], [0, 5]),
+        # モメンタム（20点満点）
+        ThresholdRule('momentum_price_change_6m', 'price_change_6m', [0, 10, 20], [0, 5, 7, 10],
+                      inclusive=False),
+        ThresholdRule('momentum_52w_high', 'distance_from_52w_high', [10, 20], [10, 5, 0]),
+        # その他（10点満点）
+        ThresholdRule('other_dividend_years', 'consecutive_dividend_years', [5], [0, 5]),
+        ThresholdRule('other_analyst_rating', 'analyst_rating', [3.5], [0, 5]),
+    ],
+)
+
+
+# 相対評価モード（method → モデル）。配点は IMURA_TIER2_MODEL と同じ。
+# 配当利回りは 4-6% の区間が最高点のため、相対評価では「高いほど高評価」とする
+IMURA_TIER2_RELATIVE = {
+    method: RelativeModel.from_score_model(IMURA_TIER2_MODEL, method=method,
+                                           directions={'value_dividend': HIGHER})
+    for method in METHODS
+}
+
+
+def score_tier2(df: pd.DataFrame, relative: Optional[str] = None) -> pd.DataFrame:
+    """
+    Tier 2 のファクタースコア（110点満点）を一括算出
+
+    Args:
+        df: 採点対象の銘柄
+        relative: None なら絶対的な閾値で採点。'percentile' / 'zscore' なら
+                  df 全体を母集団とする市場 × セクター内の相対評価で採点
+
+    Returns:
+        小項目の寄与列（TIER2_CONTRIBUTIONS）、value_score / quality_score /
+        momentum_score / other_score、total_score を持つDataFrame（index は df と同じ）
+    """
+    if relative is None:
+        return IMURA_TIER2_MODEL.evaluate(df)
+    if relative not in IMURA_TIER2_RELATIVE:
+        raise ValueError(f"relative must be one of {METHODS}: {relative}")
+    return IMURA_TIER2_RELATIVE[relative].evaluate(df)
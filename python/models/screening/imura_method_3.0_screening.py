@@ -13,6 +13,15 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.screening.diversification import DEFAULT_MAX_WEIGHT, select_diversified
+from python.models.screening.imura_factors import IMURA_TIER1_EXECUTOR, IMURA_TIER2_MODEL, score_tier2
+from python.services.market_data.price_history import MOMENTUM_COLUMNS, add_momentum_columns
 
 # =============================================================================
 # 【Tier 1】必須基準（除外基準）
@@ -23,6 +32,7 @@ def apply_tier1_filters(df):
     Tier 1: 必須基準（除外基準）
 
     基本的な財務健全性と流動性を確保
+    （基準は imura_factors.IMURA_TIER1_FILTERS、評価は通過率の低い基準から順に残存銘柄のみ）
     """
     print("="*80)
     print("【Tier 1】必須基準（除外基準）の適用")
@@ -30,28 +40,16 @@ def apply_tier1_filters(df):
 
     initial_count = len(df)
 
-    # フィルタを適用
-    filters = {
-        'PER 5-30倍': (df['pe_ratio'] >= 5) & (df['pe_ratio'] <= 30),
-        '配当利回り 2.5-6.0%': (df['dividend_yield'] >= 250) & (df['dividend_yield'] <= 600),
-        'ROE ≥ 8%': df['roe'] >= 8.0,
-        'D/E比率 < 200%': df['debt_equity_ratio'] < 200,
-        'フリーCF > 0': df['free_cash_flow'] > 0,
-        '時価総額 ≥ 300億円': df['market_cap'] >= 30000,  # 単位: 百万円
-        '1日出来高 ≥ 1億円': df['avg_volume'] >= 100000000,
-    }
+    # 絞り込みの強い基準から順に、残存銘柄だけを評価
+    result = IMURA_TIER1_EXECUTOR.apply(df)
 
-    # 各フィルタの結果を表示
-    for filter_name, condition in filters.items():
-        passed = condition.sum()
-        print(f"{filter_name:30s}: {passed:5d}銘柄 / {initial_count}銘柄 ({passed/initial_count*100:5.1f}%)")
+    # 評価順のウォーターフォール（各基準の評価銘柄数 → 通過後の残存銘柄数）
+    for step in result.waterfall.itertuples():
+        rate = step.pass_rate * 100 if step.evaluated else 0.0
+        print(f"{step.filter:30s}: {step.survivors:5d}銘柄 / {step.evaluated:5d}銘柄 ({rate:5.1f}%)"
+              f"  推定通過率 {step.estimated_pass_rate * 100:5.1f}%")
 
-    # 全フィルタを適用
-    combined_filter = pd.Series(True, index=df.index)
-    for condition in filters.values():
-        combined_filter &= condition
-
-    df_filtered = df[combined_filter].copy()
+    df_filtered = df[result.mask].copy()
 
     print(f"\n✅ Tier 1通過銘柄: {len(df_filtered)}銘柄 / {initial_count}銘柄 ({len(df_filtered)/initial_count*100:.1f}%)")
 
@@ -62,142 +60,47 @@ def apply_tier1_filters(df):
 # 【Tier 2】スコアリング基準（110点満点）
 # =============================================================================
 
+# 採点基準は imura_factors.IMURA_TIER2_MODEL のルール表で定義している。
+# 以下の行ごとの関数は1銘柄を採点する場合の入口（ユニバース全体は score_tier2 で一括採点）
+
 def calculate_value_score(row):
-    """バリューファクタースコア（40点満点）"""
-    score = 0
-
-    # PER（20点満点）
-    per = row['pe_ratio']
-    if per < 10:
-        score += 20
-    elif per < 15:
-        score += 15
-    elif per < 20:
-        score += 10
-    elif per < 30:
-        score += 5
-
-    # PBR（10点満点）
-    pbr = row.get('price_book_ratio', np.nan)
-    if not np.isnan(pbr):
-        if pbr < 1.0:
-            score += 10
-        elif pbr < 1.5:
-            score += 5
-
-    # 配当利回り（10点満点）
-    div_yield = row['dividend_yield'] / 100  # パーセント換算
-    if 4.0 <= div_yield <= 6.0:
-        score += 10
-    elif 3.0 <= div_yield < 4.0:
-        score += 5
-
-    return score
+    """バリューファクタースコア（40点満点）: PER 20点、PBR 10点、配当利回り 10点"""
+    return IMURA_TIER2_MODEL.score_one(row)['value_score']
 
 
 def calculate_quality_score(row):
-    """クオリティファクタースコア（40点満点）"""
-    score = 0
-
-    # ROE（15点満点）
-    roe = row['roe']
-    if roe >= 30:
-        score += 15
-    elif roe >= 15:
-        score += 10
-    elif roe >= 10:
-        score += 5
-
-    # D/E比率（10点満点）
-    de_ratio = row.get('debt_equity_ratio', np.nan)
-    if not np.isnan(de_ratio):
-        if de_ratio < 50:
-            score += 10
-        elif de_ratio < 100:
-            score += 5
-
-    # 営業利益率（10点満点）
-    operating_margin = row.get('operating_margin', np.nan)
-    if not np.isnan(operating_margin):
-        if operating_margin >= 15:
-            score += 10
-        elif operating_margin >= 10:
-            score += 5
-
-    # フリーCF/売上高（5点満点）
-    fcf_ratio = row.get('fcf_to_sales', np.nan)
-    if not np.isnan(fcf_ratio):
-        if fcf_ratio >= 10:
-            score += 5
-
-    return score
+    """クオリティファクタースコア（40点満点）: ROE 15点、D/E比率 10点、営業利益率 10点、FCF/売上高 5点"""
+    return IMURA_TIER2_MODEL.score_one(row)['quality_score']
 
 
 def calculate_momentum_score(row):
-    """モメンタムファクタースコア（20点満点）"""
-    score = 0
-
-    # 6ヶ月株価上昇率（10点満点）
-    price_change_6m = row.get('price_change_6m', np.nan)
-    if not np.isnan(price_change_6m):
-        if price_change_6m > 20:
-            score += 10
-        elif price_change_6m > 10:
-            score += 7
-        elif price_change_6m > 0:
-            score += 5
-
-    # 52週高値からの乖離率（10点満点）
-    distance_from_high = row.get('distance_from_52w_high', np.nan)
-    if not np.isnan(distance_from_high):
-        if distance_from_high < 10:
-            score += 10
-        elif distance_from_high < 20:
-            score += 5
-
-    return score
+    """モメンタムファクタースコア（20点満点）: 6ヶ月株価上昇率 10点、52週高値からの乖離率 10点"""
+    return IMURA_TIER2_MODEL.score_one(row)['momentum_score']
 
 
 def calculate_other_score(row):
-    """その他のスコア（10点満点）"""
-    score = 0
+    """その他のスコア（10点満点）: 連続増配年数 5点、アナリスト推奨 5点"""
+    return IMURA_TIER2_MODEL.score_one(row)['other_score']
 
-    # 連続増配年数（5点満点）
-    consecutive_dividend_years = row.get('consecutive_dividend_years', 0)
-    if consecutive_dividend_years >= 5:
-        score += 5
 
-    # アナリスト推奨（5点満点）
-    analyst_rating = row.get('analyst_rating', np.nan)
-    if not np.isnan(analyst_rating):
-        if analyst_rating >= 3.5:
-            score += 5
-
-    return score
-
-
-def calculate_tier2_scores(df):
+def calculate_tier2_scores(df, relative=None):
     """
     Tier 2: スコアリング基準（110点満点）
 
-    各ファクターのスコアを計算
+    各ファクターのスコアを計算（imura_factors.score_tier2 で列指向に一括算出）
+
+    Args:
+        df: Tier 1 通過銘柄
+        relative: 'percentile' / 'zscore' なら市場 × セクター内の相対評価で採点
     """
     print("\n" + "="*80)
     print("【Tier 2】スコアリング基準（110点満点）の計算")
     print("="*80)
 
-    df['value_score'] = df.apply(calculate_value_score, axis=1)
-    df['quality_score'] = df.apply(calculate_quality_score, axis=1)
-    df['momentum_score'] = df.apply(calculate_momentum_score, axis=1)
-    df['other_score'] = df.apply(calculate_other_score, axis=1)
-
-    # 総合スコア
-    df['total_score'] = (
-        df['value_score'] +
-        df['quality_score'] +
-        df['momentum_score'] +
-        df['other_score']
-    )
+    # 全銘柄を一括で採点（小項目ごとの寄与列と各ファクター・総合スコア）
+    scores = score_tier2(df, relative=relative)
+    for column in scores.columns:
+        df[column] = scores[column]
 
     # 統計情報
     print(f"\n📊 スコア統計:")
@@ -226,52 +129,35 @@ def calculate_tier2_scores(df):
 # 【Tier 3】分散基準
 # =============================================================================
 
-def apply_tier3_diversification(df, max_stocks=50):
+def apply_tier3_diversification(df, max_stocks=50, market_split=None, max_weight=DEFAULT_MAX_WEIGHT):
     """
     Tier 3: 分散基準
 
     - セクター上限: 10%
     - 最低セクター数: 6セクター
     - 単一銘柄上限: 5%
+    - 市場別の配分: market_split（例: {'JP': 0.5, 'US': 0.5}、省略時は制約なし）
+
+    選定は diversification.select_diversified で一括処理（'weight' 列を付与）
     """
     print("\n" + "="*80)
     print("【Tier 3】分散基準の適用")
     print("="*80)
 
-    # スコア順にソート
-    df_sorted = df.sort_values('total_score', ascending=False).reset_index(drop=True)
-
-    selected_stocks = []
-    sector_counts = {}
-    sectors_used = set()
-
-    sector_limit = int(max_stocks * 0.10)  # セクター上限10%
-
-    for idx, row in df_sorted.iterrows():
-        sector = row.get('sector', 'Unknown')
-
-        # セクター上限チェック
-        if sector_counts.get(sector, 0) >= sector_limit:
-            continue
-
-        # 選択
-        selected_stocks.append(row)
-        sector_counts[sector] = sector_counts.get(sector, 0) + 1
-        sectors_used.add(sector)
-
-        # 50銘柄に到達したらチェック
-        if len(selected_stocks) >= max_stocks:
-            # 最低6セクター必要
-            if len(sectors_used) >= 6:
-                break
-
-    df_selected = pd.DataFrame(selected_stocks)
+    df_selected = select_diversified(df, max_stocks=max_stocks, max_weight=max_weight,
+                                     market_split=market_split)
+    sector_counts = df_selected['sector'].value_counts() if 'sector' in df_selected else pd.Series(dtype=int)
 
     print(f"\n✅ 最終選定銘柄数: {len(df_selected)}銘柄")
-    print(f"✅ セクター数: {len(sectors_used)}セクター")
+    print(f"✅ セクター数: {len(sector_counts)}セクター")
+    print(f"✅ 最大ウェイト: {df_selected['weight'].max() * 100 if len(df_selected) else 0:.1f}%")
     print(f"\n📊 セクター別内訳:")
-    for sector, count in sorted(sector_counts.items(), key=lambda x: x[1], reverse=True):
+    for sector, count in sector_counts.items():
         print(f"  {sector:30s}: {count:3d}銘柄 ({count/len(df_selected)*100:5.1f}%)")
+    if market_split and 'market' in df_selected:
+        print(f"\n📊 市場別内訳:")
+        for market, count in df_selected['market'].value_counts().items():
+            print(f"  {market:30s}: {count:3d}銘柄 ({count/len(df_selected)*100:5.1f}%)")
 
     return df_selected
 
@@ -299,6 +185,13 @@ def main():
         print("\n代替として、サンプルデータで実行します。")
         df = create_sample_data()
 
+    # モメンタム列がなければ株価履歴を一括取得して算出
+    missing = [c for c in MOMENTUM_COLUMNS if c not in df.columns]
+    if missing:
+        print(f"\n📈 モメンタム指標を算出中（{len(df)}銘柄の株価履歴を一括取得）...")
+        df = add_momentum_columns(df)
+        print(f"✅ 算出完了: {df['price_change_6m'].notna().sum()}銘柄")
+
     # 市場別内訳
     print(f"\n📊 市場別内訳:")
     market_counts = df['market'].value_counts()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+スクリーニング実行のチェックポイントジャーナル
+
+採点済みレコードを1行1件のJSONL形式で追記していく。
+プロセスが途中で停止しても、--resume で再実行すれば
+ジャーナルに記録済みの銘柄は再取得せずにそのまま再利用される。
+
+- 追記のみ（既存行は書き換えない）。1件ごとに flush + fsync
+- 途中で切れた最終行（書き込み中の停止）は読み込み時に無視する
+- 同じティッカーが複数回記録されている場合は最後の行を採用する
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from python.config.paths import OUTPUTS_PYTHON_TEMP_DIR
+
+
+def journal_path(run_name: str, directory: str = OUTPUTS_PYTHON_TEMP_DIR) -> str:
+    """実行名に対応するジャーナルファイルのパス"""
+    return os.path.join(directory, f"{run_name}.journal.jsonl")
+
+
+def _to_json_value(value):
+    # numpy スカラー等を JSON に書ける型へ
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+class ScreeningJournal:
+    """
+    追記専用のJSONLジャーナル
+
+    スレッドセーフ（取得ワーカーの完了コールバックから呼ばれてよい）。
+    """
+
+    def __init__(self, path: str):
+        """
+        初期化
+
+        Args:
+            path: ジャーナルファイルのパス
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        記録済みレコードを読み込む
+
+        Returns:
+            {ticker: レコード}（記録順）
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 書き込み途中で停止した行
+                records[record['ticker']] = record
+        return records
+
+    def reset(self) -> None:
+        """ジャーナルを空にする（新規実行の開始時）"""
+        self.close()
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """レコードを1行追記し、ディスクに書き出す"""
+        line = json.dumps({k: _to_json_value(v) for k, v in record.items()}, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                needs_newline = False
+                if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                    with open(self.path, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        needs_newline = f.read(1) != b'\n'
+                self._file = open(self.path, 'a', encoding='utf-8')
+                # 途中で切れた最終行の後ろに続けて書かないよう改行を補う
+                if needs_newline:
+                    self._file.write('\n')
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> 'ScreeningJournal':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        self.close()
+        return None
@@ -13,14 +13,18 @@ Phase 1 (完全版): 1,101銘柄評価 - 成長分野特化
 アウトプット:
   1. phase1_1100stocks_growth_combined.csv (1,101銘柄の統合評価)
   2. phase2_growth_top300.csv (成長分野TOP 300)
+
+実行方法:
+    python python/models/screening/phase1_1100stocks_growth.py           # 新規実行
+    python python/models/screening/phase1_1100stocks_growth.py --resume  # 中断した実行を再開
+    python python/models/screening/phase1_1100stocks_growth.py --deadline 300  # 5分以内に時価総額の大きい順で取得
 """
 
 import pandas as pd
-import yfinance as yf
-import time
 import numpy as np
 from datetime import datetime
 import warnings
+import os
 import sys
 
 warnings.filterwarnings('ignore')
@@ -29,6 +33,16 @@ warnings.filterwarnings('ignore')
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.screening.screening_engine import (  # noqa: F401  (後方互換のため再エクスポート)
+    ScreeningEngine, Universe, UniverseSegment, growth_columns,
+    get_stock_metrics, calculate_quantitative_score, parse_run_args,
+    create_engine,
+)
+from python.models.screening.journal import ScreeningJournal, journal_path
+
 
 # ===========================
 # 1. 既存評価データの読み込み
@@ -396,149 +410,12 @@ def get_us_growth_stocks():
 
 
 # ===========================
-# 3. 定量評価
+# 3. メイン処理
 # ===========================
 
-def get_stock_metrics(ticker, market='JP'):
-    """
-    個別銘柄の定量指標を取得
-    """
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-
-        name = info.get('longName', info.get('shortName', ticker))
-        market_cap = info.get('marketCap', 0)
-        roe = info.get('returnOnEquity', None)
-        roa = info.get('returnOnAssets', None)
-        pe_ratio = info.get('trailingPE', None)
-        pb_ratio = info.get('priceToBook', None)
-        dividend_yield = info.get('dividendYield', 0)
-        if dividend_yield:
-            dividend_yield = dividend_yield * 100
-        debt_to_equity = info.get('debtToEquity', None)
-        current_ratio = info.get('currentRatio', None)
-
-        return {
-            'ticker': ticker,
-            'name': name,
-            'market': market,
-            'market_cap': market_cap,
-            'roe': roe * 100 if roe else None,
-            'roa': roa * 100 if roa else None,
-            'pe_ratio': pe_ratio,
-            'pb_ratio': pb_ratio,
-            'dividend_yield': dividend_yield,
-            'debt_to_equity': debt_to_equity,
-            'current_ratio': current_ratio,
-        }
-    except Exception as e:
-        return {
-            'ticker': ticker,
-            'name': ticker,
-            'market': market,
-            'market_cap': 0,
-            'roe': None,
-            'roa': None,
-            'pe_ratio': None,
-            'pb_ratio': None,
-            'dividend_yield': None,
-            'debt_to_equity': None,
-            'current_ratio': None,
-        }
-
-
-def calculate_quantitative_score(metrics):
-    """
-    定量指標からスコア（0-100点）を算出
-    """
-    score = 0
-
-    # 1. 時価総額スコア（20点）
-    market_cap = metrics['market_cap']
-    if market_cap > 10_000_000_000_000:
-        score += 20
-    elif market_cap > 1_000_000_000_000:
-        score += 15
-    elif market_cap > 100_000_000_000:
-        score += 10
-    elif market_cap > 10_000_000_000:
-        score += 5
-
-    # 2. ROEスコア（20点）
-    roe = metrics['roe']
-    if roe is not None and isinstance(roe, (int, float)):
-        if roe >= 20:
-            score += 20
-        elif roe >= 15:
-            score += 15
-        elif roe >= 10:
-            score += 10
-        elif roe >= 5:
-            score += 5
-
-    # 3. 配当利回りスコア（15点）
-    dividend_yield = metrics['dividend_yield']
-    if dividend_yield is not None and isinstance(dividend_yield, (int, float)):
-        if dividend_yield >= 4.0:
-            score += 15
-        elif dividend_yield >= 3.0:
-            score += 12
-        elif dividend_yield >= 2.0:
-            score += 8
-        elif dividend_yield >= 1.0:
-            score += 4
-
-    # 4. PERスコア（15点）
-    pe_ratio = metrics['pe_ratio']
-    if pe_ratio is not None and isinstance(pe_ratio, (int, float)):
-        if 10 <= pe_ratio <= 20:
-            score += 15
-        elif 5 <= pe_ratio < 10 or 20 < pe_ratio <= 25:
-            score += 10
-        elif 0 < pe_ratio < 5 or 25 < pe_ratio <= 30:
-            score += 5
-
-    # 5. PBRスコア（10点）
-    pb_ratio = metrics['pb_ratio']
-    if pb_ratio is not None and isinstance(pb_ratio, (int, float)):
-        if pb_ratio < 1.0:
-            score += 10
-        elif pb_ratio < 1.5:
-            score += 8
-        elif pb_ratio < 2.0:
-            score += 6
-        elif pb_ratio < 3.0:
-            score += 3
-
-    # 6. 財務健全性スコア（20点）
-    debt_to_equity = metrics['debt_to_equity']
-    current_ratio = metrics['current_ratio']
-
-    if debt_to_equity is not None and isinstance(debt_to_equity, (int, float)):
-        if debt_to_equity < 50:
-            score += 10
-        elif debt_to_equity < 100:
-            score += 7
-        elif debt_to_equity < 150:
-            score += 4
-
-    if current_ratio is not None and isinstance(current_ratio, (int, float)):
-        if current_ratio >= 2.0:
-            score += 10
-        elif current_ratio >= 1.5:
-            score += 7
-        elif current_ratio >= 1.0:
-            score += 4
-
-    return score
-
+def main(argv=None):
+    args = parse_run_args(argv, description=__doc__)
 
-# ===========================
-# 4. メイン処理
-# ===========================
-
-def main():
     print("=" * 80)
     print("Phase 1 (完全版): 1,101銘柄評価 - 成長分野特化")
     print("=" * 80)
@@ -549,63 +426,26 @@ def main():
     print(f"✅ 既存評価データ: {len(existing_data)}銘柄")
     print()
 
-    # ステップ2: 追加銘柄の定量評価
-    additional_results = []
-
-    # 日本株 追加150銘柄
-    print("📊 日本株の追加評価（成長分野150銘柄）...")
-    japan_growth = get_japan_growth_stocks()
-    for i, ticker in enumerate(japan_growth, 1):
-        print(f"  [{i}/{len(japan_growth)}] {ticker}", end='\r')
-        metrics = get_stock_metrics(ticker, market='JP')
-        score = calculate_quantitative_score(metrics)
-        metrics['final_score'] = score
-        metrics['evaluation_type'] = 'growth_quantitative'
-        metrics['hayato'] = None
-        metrics['researcher'] = None
-        metrics['japanese'] = None
-        metrics['sector'] = 'JP Growth'
-        additional_results.append(metrics)
-        time.sleep(0.5)
-
-    print()
-    print(f"✅ 日本株成長分野評価完了: {len(japan_growth)}銘柄")
-    print()
-
-    # 米国株 追加150銘柄
-    print("📊 米国株の追加評価（成長分野150銘柄）...")
-    us_growth = get_us_growth_stocks()
-    for i, ticker in enumerate(us_growth, 1):
-        print(f"  [{i}/{len(us_growth)}] {ticker}", end='\r')
-        metrics = get_stock_metrics(ticker, market='US')
-        score = calculate_quantitative_score(metrics)
-        metrics['final_score'] = score
-        metrics['evaluation_type'] = 'growth_quantitative'
-        metrics['hayato'] = None
-        metrics['researcher'] = None
-        metrics['japanese'] = None
-        metrics['sector'] = 'US Growth'
-        additional_results.append(metrics)
-        time.sleep(0.5)
-
-    print()
-    print(f"✅ 米国株成長分野評価完了: {len(us_growth)}銘柄")
+    # ステップ2: 追加銘柄の定量評価（既存・重複銘柄は取得しない）
+    universe = Universe(
+        name='1,101銘柄評価（成長分野特化）',
+        existing=existing_data,
+        segments=[
+            UniverseSegment('日本株の追加評価（成長分野150銘柄）', 'JP', get_japan_growth_stocks(),
+                            columns=growth_columns('JP Growth')),
+            UniverseSegment('米国株の追加評価（成長分野150銘柄）', 'US', get_us_growth_stocks(),
+                            columns=growth_columns('US Growth')),
+        ],
+    )
+    engine = create_engine(args)
+    journal = ScreeningJournal(journal_path('phase1_1100stocks_growth'))
+    additional_df = engine.evaluate(universe, journal=journal, resume=args.resume)
+    print(f"✅ 成長分野評価完了: {len(additional_df)}銘柄")
     print()
 
     # ステップ3: データの統合
     print("🔄 データを統合中...")
-    additional_df = pd.DataFrame(additional_results)
-
-    # 既存データと統合
-    all_data = pd.concat([existing_data, additional_df], ignore_index=True)
-
-    # スコア順にソート
-    all_data = all_data.sort_values('final_score', ascending=False).reset_index(drop=True)
-
-    # ランク列を追加
-    if 'rank' in all_data.columns:
-        all_data = all_data.drop(columns=['rank'])
-    all_data.insert(0, 'rank', range(1, len(all_data) + 1))
+    all_data = engine.combine(universe, additional_df)
 
     # CSV出力
     output_file = 'phase1_1100stocks_growth_combined.csv'
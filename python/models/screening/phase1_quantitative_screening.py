@@ -6,16 +6,30 @@ Phase 1: 定量スクリーニング（1000銘柄）
 - 定量指標のみで自動評価（トークン消費ゼロ）
 - 評価項目: 時価総額、ROE、配当利回り、PER/PBR、財務健全性
 - 出力: phase1_quantitative_scores_1000stocks.csv
+
+実行方法:
+    python python/models/screening/phase1_quantitative_screening.py           # 新規実行
+    python python/models/screening/phase1_quantitative_screening.py --resume  # 中断した実行を再開
+    python python/models/screening/phase1_quantitative_screening.py --deadline 300  # 5分以内に時価総額の大きい順で取得
 """
 
-import pandas as pd
-import yfinance as yf
-import time
 import numpy as np
 from datetime import datetime
 import warnings
+import sys
+import os
 warnings.filterwarnings('ignore')
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from python.models.screening.screening_engine import (  # noqa: F401  (後方互換のため再エクスポート)
+    METRICS_FIELDS, ScreeningEngine, Universe, UniverseSegment,
+    get_stock_metrics, calculate_quantitative_score, parse_run_args,
+    create_engine,
+)
+from python.models.screening.journal import ScreeningJournal, journal_path
+
 # ===========================
 # 1. 銘柄リストの準備
 # ===========================
@@ -227,209 +241,12 @@ def get_us_sp500_tickers():
 
 
 # ===========================
-# 2. 定量指標の取得
+# 2. メイン処理
 # ===========================
 
-def get_stock_metrics(ticker, market='JP'):
-    """
-    個別銘柄の定量指標を取得
-
-    Args:
-        ticker: ティッカーシンボル
-        market: 'JP' (日本株) or 'US' (米国株)
-
-    Returns:
-        dict: 定量指標の辞書
-    """
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-
-        # 基本情報
-        name = info.get('longName', ticker)
-        market_cap = info.get('marketCap', 0)
-
-        # 収益性指標
-        roe = info.get('returnOnEquity', None)  # ROE（自己資本利益率）
-        roa = info.get('returnOnAssets', None)  # ROA（総資産利益率）
-
-        # バリュエーション指標
-        pe_ratio = info.get('trailingPE', None)  # PER（株価収益率）
-        pb_ratio = info.get('priceToBook', None)  # PBR（株価純資産倍率）
-
-        # 配当指標
-        dividend_yield = info.get('dividendYield', 0)  # 配当利回り
-        if dividend_yield:
-            dividend_yield = dividend_yield * 100  # パーセント表示
-
-        # 財務健全性
-        debt_to_equity = info.get('debtToEquity', None)  # 負債資本比率
-        current_ratio = info.get('currentRatio', None)  # 流動比率
-
-        # 成長性
-        revenue_growth = info.get('revenueGrowth', None)  # 売上成長率
-        earnings_growth = info.get('earningsGrowth', None)  # 利益成長率
-
-        return {
-            'ticker': ticker,
-            'name': name,
-            'market': market,
-            'market_cap': market_cap,
-            'roe': roe * 100 if roe else None,  # パーセント表示
-            'roa': roa * 100 if roa else None,
-            'pe_ratio': pe_ratio,
-            'pb_ratio': pb_ratio,
-            'dividend_yield': dividend_yield,
-            'debt_to_equity': debt_to_equity,
-            'current_ratio': current_ratio,
-            'revenue_growth': revenue_growth * 100 if revenue_growth else None,
-            'earnings_growth': earnings_growth * 100 if earnings_growth else None,
-        }
-
-    except Exception as e:
-        print(f"❌ エラー: {ticker} - {str(e)}")
-        return {
-            'ticker': ticker,
-            'name': ticker,
-            'market': market,
-            'market_cap': 0,
-            'roe': None,
-            'roa': None,
-            'pe_ratio': None,
-            'pb_ratio': None,
-            'dividend_yield': None,
-            'debt_to_equity': None,
-            'current_ratio': None,
-            'revenue_growth': None,
-            'earnings_growth': None,
-        }
-
+def main(argv=None):
+    args = parse_run_args(argv, description=__doc__)
 
-# ===========================
-# 3. 定量スコアの算出
-# ===========================
-
-def calculate_quantitative_score(metrics):
-    """
-    定量指標からスコア（0-100点）を算出
-
-    評価項目:
-    1. 時価総額（20点）: 大型株を優遇
-    2. ROE（20点）: 高ROEを優遇
-    3. 配当利回り（15点）: 高配当を優遇
-    4. PER（15点）: 適正水準（10-20倍）を優遇
-    5. PBR（10点）: 低PBRを優遇
-    6. 財務健全性（20点）: 低負債、高流動比率を優遇
-
-    合計: 100点満点
-    """
-    score = 0
-
-    # 1. 時価総額スコア（20点）
-    market_cap = metrics['market_cap']
-    if market_cap > 10_000_000_000_000:  # 10兆円以上
-        score += 20
-    elif market_cap > 1_000_000_000_000:  # 1兆円以上
-        score += 15
-    elif market_cap > 100_000_000_000:  # 1000億円以上
-        score += 10
-    elif market_cap > 10_000_000_000:  # 100億円以上
-        score += 5
-    else:
-        score += 0
-
-    # 2. ROEスコア（20点）
-    roe = metrics['roe']
-    if roe is not None:
-        if roe >= 20:
-            score += 20
-        elif roe >= 15:
-            score += 15
-        elif roe >= 10:
-            score += 10
-        elif roe >= 5:
-            score += 5
-        else:
-            score += 0
-
-    # 3. 配当利回りスコア（15点）
-    dividend_yield = metrics['dividend_yield']
-    if dividend_yield is not None:
-        if dividend_yield >= 4.0:
-            score += 15
-        elif dividend_yield >= 3.0:
-            score += 12
-        elif dividend_yield >= 2.0:
-            score += 8
-        elif dividend_yield >= 1.0:
-            score += 4
-        else:
-            score += 0
-
-    # 4. PERスコア（15点）: 10-20倍が理想
-    pe_ratio = metrics['pe_ratio']
-    if pe_ratio is not None:
-        if 10 <= pe_ratio <= 20:
-            score += 15
-        elif 5 <= pe_ratio < 10 or 20 < pe_ratio <= 25:
-            score += 10
-        elif 0 < pe_ratio < 5 or 25 < pe_ratio <= 30:
-            score += 5
-        else:
-            score += 0
-
-    # 5. PBRスコア（10点）: 低PBRを優遇
-    pb_ratio = metrics['pb_ratio']
-    if pb_ratio is not None:
-        if pb_ratio < 1.0:
-            score += 10
-        elif pb_ratio < 1.5:
-            score += 8
-        elif pb_ratio < 2.0:
-            score += 6
-        elif pb_ratio < 3.0:
-            score += 3
-        else:
-            score += 0
-
-    # 6. 財務健全性スコア（20点）
-    debt_to_equity = metrics['debt_to_equity']
-    current_ratio = metrics['current_ratio']
-
-    financial_score = 0
-
-    # 負債資本比率（10点）
-    if debt_to_equity is not None:
-        if debt_to_equity < 50:
-            financial_score += 10
-        elif debt_to_equity < 100:
-            financial_score += 7
-        elif debt_to_equity < 150:
-            financial_score += 4
-        else:
-            financial_score += 0
-
-    # 流動比率（10点）
-    if current_ratio is not None:
-        if current_ratio >= 2.0:
-            financial_score += 10
-        elif current_ratio >= 1.5:
-            financial_score += 7
-        elif current_ratio >= 1.0:
-            financial_score += 4
-        else:
-            financial_score += 0
-
-    score += financial_score
-
-    return score
-
-
-# ===========================
-# 4. メイン処理
-# ===========================
-
-def main():
     print("=" * 80)
     print("Phase 1: 定量スクリーニング（1000銘柄）")
     print("=" * 80)
@@ -445,45 +262,24 @@ def main():
     print(f"✅ 合計: {len(japan_tickers) + len(us_tickers)}銘柄")
     print()
 
-    # データ取得
-    all_results = []
+    # データ取得（日本株・米国株で重複する銘柄は1回だけ取得）
+    universe = Universe(
+        name='定量スクリーニング（1000銘柄）',
+        segments=[
+            UniverseSegment('🇯🇵 日本株', 'JP', japan_tickers),
+            UniverseSegment('🇺🇸 米国株', 'US', us_tickers),
+        ],
+        score_column='quantitative_score',
+        metrics_fields=METRICS_FIELDS,
+        add_rank=False,
+    )
 
     print("📊 定量指標を取得中...")
     print()
 
-    # 日本株の処理
-    print("🇯🇵 日本株を評価中...")
-    for i, ticker in enumerate(japan_tickers, 1):
-        print(f"  [{i}/{len(japan_tickers)}] {ticker}", end='\r')
-        metrics = get_stock_metrics(ticker, market='JP')
-        score = calculate_quantitative_score(metrics)
-        metrics['quantitative_score'] = score
-        all_results.append(metrics)
-        time.sleep(0.5)  # API制限対策
-
-    print()
-    print(f"✅ 日本株 {len(japan_tickers)}銘柄の評価完了")
-    print()
-
-    # 米国株の処理
-    print("🇺🇸 米国株を評価中...")
-    for i, ticker in enumerate(us_tickers, 1):
-        print(f"  [{i}/{len(us_tickers)}] {ticker}", end='\r')
-        metrics = get_stock_metrics(ticker, market='US')
-        score = calculate_quantitative_score(metrics)
-        metrics['quantitative_score'] = score
-        all_results.append(metrics)
-        time.sleep(0.5)  # API制限対策
-
-    print()
-    print(f"✅ 米国株 {len(us_tickers)}銘柄の評価完了")
-    print()
-
-    # DataFrameに変換
-    df = pd.DataFrame(all_results)
-
-    # スコア順にソート
-    df = df.sort_values('quantitative_score', ascending=False)
+    engine = create_engine(args)
+    journal = ScreeningJournal(journal_path('phase1_quantitative_screening'))
+    df = engine.run(universe, journal=journal, resume=args.resume)
 
     # CSV出力
     output_file = 'phase1_quantitative_scores_1000stocks.csv'
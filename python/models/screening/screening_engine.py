@@ -0,0 +1,778 @@
+# -*- coding: utf-8 -*-
+"""
+Phase 1 スクリーニングエンジン（共通化版）
+
+phase1_* スクリプトごとに重複していた get_stock_metrics /
+calculate_quantitative_score と、取得・統合処理を1か所にまとめたもの。
+
+ユニバース定義（既存評価CSV + 追加銘柄リスト群）を受け取り、
+I/Oの前に既存CSVと全追加リストを横断して重複を除去し、
+未評価の銘柄だけを1回ずつ取得する。出力列は従来の各スクリプトと同じ。
+
+使用方法:
+    universe = Universe(
+        name='1,101銘柄評価',
+        existing=load_existing_evaluations(),
+        segments=[
+            UniverseSegment('日本株 成長分野', 'JP', get_japan_growth_stocks(),
+                            columns=growth_columns('JP Growth')),
+            UniverseSegment('米国株 成長分野', 'US', get_us_growth_stocks(),
+                            columns=growth_columns('US Growth')),
+        ],
+    )
+    all_data = ScreeningEngine().run(universe)
+"""
+
+import argparse
+import functools
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from python.services.market_data import (
+    ConcurrentFetcher, DataProvider, MetricsCache, RefreshPlanner, ResilientProvider, TokenBucket,
+    YFinanceProvider, create_provider, fetch_last_price,
+)
+from python.services.market_data.fetcher import DEFAULT_BURST, DEFAULT_MAX_WORKERS, DEFAULT_REQUESTS_PER_SECOND
+from python.services.market_data.providers import DEFAULT_ARCHIVE_DIR, PROVIDER_MODES
+
+from python.models.scoring import LOWER, Band, IntervalRule, RelativeModel, ScoreModel, ThresholdRule
+from python.models.scoring.relative import METHODS as RELATIVE_METHODS
+
+from .journal import ScreeningJournal
+
+# ===========================
+# 1. 定量指標の取得
+# ===========================
+
+_LIVE_PROVIDER = ResilientProvider(YFinanceProvider())
+
+# 各スクリプトが出力する指標列
+BASE_METRICS_FIELDS = [
+    'ticker', 'name', 'market', 'market_cap', 'roe', 'roa', 'pe_ratio', 'pb_ratio',
+    'dividend_yield', 'debt_to_equity', 'current_ratio',
+]
+
+# get_stock_metrics が返す指標フィールド
+METRICS_FIELDS = BASE_METRICS_FIELDS + ['revenue_growth', 'earnings_growth']
+
+# キャッシュ更新の判定用フィールド（出力列には含めない）
+REFRESH_FIELDS = ['price', 'earnings_date']
+
+# ディスクキャッシュに保存する全フィールド（キャッシュのキーに使用）
+CACHE_FIELDS = METRICS_FIELDS + REFRESH_FIELDS
+
+
+def _percent(value):
+    return value * 100 if value else None
+
+
+def _timestamp_date(value):
+    return date.fromtimestamp(value).isoformat() if value else None
+
+
+def empty_metrics(ticker, market='JP'):
+    """取得失敗時のレコード"""
+    record = {key: None for key in CACHE_FIELDS}
+    record.update({'ticker': ticker, 'name': ticker, 'market': market, 'market_cap': 0})
+    return record
+
+
+def is_failed_metrics(metrics):
+    """取得失敗レコード（識別子以外がすべて None/0）か"""
+    return all(
+        value in (None, 0)
+        for key, value in metrics.items()
+        if key not in ('ticker', 'name', 'market')
+    )
+
+
+def metrics_from_info(info, ticker, market='JP'):
+    """yfinance の info 辞書から定量指標を抽出"""
+    dividend_yield = info.get('dividendYield', 0)
+    if dividend_yield:
+        dividend_yield = dividend_yield * 100  # パーセント表示
+
+    return {
+        'ticker': ticker,
+        'name': info.get('longName', info.get('shortName', ticker)),
+        'market': market,
+        'market_cap': info.get('marketCap', 0),
+        'roe': _percent(info.get('returnOnEquity', None)),  # ROE（自己資本利益率）
+        'roa': _percent(info.get('returnOnAssets', None)),  # ROA（総資産利益率）
+        'pe_ratio': info.get('trailingPE', None),  # PER（株価収益率）
+        'pb_ratio': info.get('priceToBook', None),  # PBR（株価純資産倍率）
+        'dividend_yield': dividend_yield,
+        'debt_to_equity': info.get('debtToEquity', None),  # 負債資本比率
+        'current_ratio': info.get('currentRatio', None),  # 流動比率
+        'revenue_growth': _percent(info.get('revenueGrowth', None)),  # 売上成長率
+        'earnings_growth': _percent(info.get('earningsGrowth', None)),  # 利益成長率
+        'price': info.get('currentPrice', info.get('regularMarketPrice', None)),
+        'earnings_date': _timestamp_date(info.get('earningsTimestamp', None)),  # 決算発表日
+    }
+
+
+def get_stock_metrics(ticker, market='JP', provider=None):
+    """
+    個別銘柄の定量指標を取得
+
+    Args:
+        ticker: ティッカーシンボル
+        market: 'JP' (日本株) or 'US' (米国株)
+        provider: info の取得元（既定は yfinance）
+
+    Returns:
+        dict: 定量指標の辞書（CACHE_FIELDS）
+    """
+    provider = provider or _LIVE_PROVIDER
+    try:
+        info = provider.get_info(ticker)
+    except Exception as e:
+        print(f"\n⚠️ エラー: {ticker} - {str(e)}")
+        return empty_metrics(ticker, market)
+
+    return metrics_from_info(info, ticker, market)
+
+
+# 井村氏手法3.0の Tier 1 のうち、気配情報（株価・時価総額・出来高）だけで判定できる基準
+# 日本株: 時価総額 ≥ 300億円、1日売買代金 ≥ 1億円（米国株はドル建ての目安）
+QUOTE_TIER1_THRESHOLDS = {
+    'JP': {'market_cap': 30_000_000_000, 'traded_value': 100_000_000},
+    'US': {'market_cap': 200_000_000, 'traded_value': 700_000},
+}
+
+
+def get_quote_metrics(ticker, market='JP', provider=None):
+    """
+    2段階取得の1段目: 軽量な気配情報のみを取得
+
+    Returns:
+        dict: ticker, market と QUOTE_FIELDS（取得失敗時は None）
+    """
+    provider = provider or _LIVE_PROVIDER
+    try:
+        quote = provider.get_quote(ticker)
+    except Exception as e:
+        print(f"\n⚠️ エラー: {ticker} - {str(e)}")
+        return None
+
+    return {'ticker': ticker, 'market': market, **quote}
+
+
+def passes_quote_tier1(quote):
+    """
+    気配情報で Tier 1 の時価総額・流動性基準を満たすか
+
+    情報が欠けている銘柄は除外せず、2段目（全指標の取得）に回す。
+    """
+    if quote is None:
+        return True
+    thresholds = QUOTE_TIER1_THRESHOLDS.get(quote['market'])
+    if thresholds is None:
+        return True
+
+    market_cap = quote.get('market_cap')
+    if market_cap is not None and market_cap < thresholds['market_cap']:
+        return False
+
+    price, volume = quote.get('price'), quote.get('avg_volume')
+    if price and volume is not None and price * volume < thresholds['traded_value']:
+        return False
+    return True
+
+
+# ===========================
+# 2. 定量スコアの算出
+# ===========================
+
+# 定量スコア（0-100点）のルール表
+#   1. 時価総額（20点）: 大型株を優遇
+#   2. ROE（20点）: 高ROEを優遇
+#   3. 配当利回り（15点）: 高配当を優遇
+#   4. PER（15点）: 適正水準（10-20倍）を優遇
+#   5. PBR（10点）: 低PBRを優遇
+#   6. 財務健全性（20点）: 低負債（10点）、高流動比率（10点）を優遇
+QUANTITATIVE_SCORE_MODEL = ScoreModel(
+    'quantitative',
+    total='quantitative_score',
+    rules=[
+        # 100億円超 / 1000億円超 / 1兆円超 / 10兆円超
+        ThresholdRule('score_market_cap', 'market_cap',
+                      [10_000_000_000, 100_000_000_000, 1_000_000_000_000, 10_000_000_000_000],
+                      [0, 5, 10, 15, 20], inclusive=False),
+        ThresholdRule('score_roe', 'roe', [5, 10, 15, 20], [0, 5, 10, 15, 20]),
+        ThresholdRule('score_dividend', 'dividend_yield', [1.0, 2.0, 3.0, 4.0], [0, 4, 8, 12, 15]),
+        IntervalRule('score_per', 'pe_ratio', [
+            Band(10, 20, 15, closed='both'),
+            Band(5, 10, 10, closed='left'),
+            Band(20, 25, 10, closed='right'),
+            Band(0, 5, 5, closed='neither'),
+            Band(25, 30, 5, closed='right'),
+        ]),
+        ThresholdRule('score_pbr', 'pb_ratio', [1.0, 1.5, 2.0, 3.0], [10, 8, 6, 3, 0]),
+        ThresholdRule('score_debt_to_equity', 'debt_to_equity', [50, 100, 150], [10, 7, 4, 0]),
+        ThresholdRule('score_current_ratio', 'current_ratio', [1.0, 1.5, 2.0], [0, 4, 7, 10]),
+    ],
+)
+
+# calculate_quantitative_scores が出力する項目別スコアの列名
+QUANTITATIVE_COMPONENTS = QUANTITATIVE_SCORE_MODEL.rule_names
+
+# 相対評価モード（method → モデル）。配点は QUANTITATIVE_SCORE_MODEL と同じで、
+# 市場 × セクター内のパーセンタイル / z スコアで採点する。
+# PER は 10-20倍の区間が最高点のため、相対評価では「低いほど高評価」とする
+QUANTITATIVE_RELATIVE_MODELS = {
+    method: RelativeModel.from_score_model(QUANTITATIVE_SCORE_MODEL, method=method,
+                                           directions={'score_per': LOWER})
+    for method in RELATIVE_METHODS
+}
+
+
+def calculate_quantitative_score(metrics):
+    """
+    定量指標からスコア（0-100点）を算出（QUANTITATIVE_SCORE_MODEL を参照）
+
+    数値でない指標（None等）はその項目を0点とする。
+    """
+    return QUANTITATIVE_SCORE_MODEL.score_one(metrics)['quantitative_score']
+
+
+def calculate_quantitative_scores(df, weights=None, relative=None):
+    """
+    calculate_quantitative_score の列指向版（DataFrame 全体を一括で採点）
+
+    Args:
+        df: METRICS_FIELDS の列を持つDataFrame
+        weights: {項目別スコアの列名: 倍率}（既定はすべて1、重みを変えた再採点用）
+        relative: 'percentile' / 'zscore' なら df 全体を母集団とする
+                  市場 × セクター内の相対評価で採点（weights は無視）
+
+    Returns:
+        QUANTITATIVE_COMPONENTS と quantitative_score の列を持つDataFrame（index は df と同じ）
+    """
+    if relative is not None:
+        if relative not in QUANTITATIVE_RELATIVE_MODELS:
+            raise ValueError(f"relative must be one of {RELATIVE_METHODS}: {relative}")
+        return QUANTITATIVE_RELATIVE_MODELS[relative].evaluate(df)
+    model = QUANTITATIVE_SCORE_MODEL.with_weights(weights) if weights else QUANTITATIVE_SCORE_MODEL
+    return model.evaluate(df)
+
+
+# ===========================
+# 3. ユニバース定義
+# ===========================
+
+def growth_columns(sector, evaluation_type='growth_quantitative'):
+    """3エージェント評価列（未評価）+ セクターを持つ追加銘柄の列定義"""
+    return {
+        'evaluation_type': evaluation_type,
+        'hayato': None,
+        'researcher': None,
+        'japanese': None,
+        'sector': sector,
+    }
+
+
+@dataclass
+class UniverseSegment:
+    """追加評価する銘柄リスト1つ分"""
+    name: str  # 表示名（例: '日本株 成長分野'）
+    market: str  # 'JP' or 'US'
+    tickers: List[str]
+    columns: Dict[str, Any] = field(default_factory=dict)  # スコア列の後ろに付与する固定列
+
+
+@dataclass
+class Universe:
+    """既存評価CSV + 追加銘柄リスト群からなるスクリーニング対象"""
+    name: str
+    segments: List[UniverseSegment]
+    existing: Optional[pd.DataFrame] = None  # 既存評価データ（これに含まれる銘柄は取得しない）
+    score_column: str = 'final_score'
+    metrics_fields: List[str] = field(default_factory=lambda: list(BASE_METRICS_FIELDS))
+    add_rank: bool = True  # スコア順のrank列を先頭に付与するか
+
+
+def normalize_ticker(ticker):
+    """重複判定用のティッカー正規化（数字のみの日本株コード → XXXX.T）"""
+    ticker = str(ticker).strip()
+    if ticker.isdigit():
+        return f"{ticker}.T"
+    return ticker.upper()
+
+
+# ===========================
+# 4. スクリーニングエンジン
+# ===========================
+
+# 制限時間付きの実行で使う取得優先度の基準
+PRIORITY_KEYS = ('market_cap', 'score')
+
+
+class ScreeningEngine:
+    """
+    ユニバースを1回の実行で評価するエンジン
+
+    各銘柄は実行内でちょうど1回だけ取得される（既存CSVの銘柄は取得しない）。
+    """
+
+    def __init__(
+        self,
+        fetch_func: Callable[..., Dict[str, Any]] = get_stock_metrics,
+        score_func: Callable[[Dict[str, Any]], float] = calculate_quantitative_score,
+        fetcher: Optional[ConcurrentFetcher] = None,
+        cache: Optional[MetricsCache] = None,
+        use_cache: bool = True,
+        provider: Optional[DataProvider] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+        limiter: Optional[TokenBucket] = None,
+        refresh_planner: Optional[RefreshPlanner] = None,
+        quote_filter: Optional[Callable[[Optional[Dict[str, Any]]], bool]] = None,
+        quote_func: Callable[..., Optional[Dict[str, Any]]] = get_quote_metrics,
+        deadline_seconds: Optional[float] = None,
+        priority: Optional[Union[str, Dict[str, float]]] = None,
+        relative: Optional[str] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            fetch_func: 1銘柄分の指標を取得する関数
+            score_func: 指標の辞書からスコアを算出する関数
+            fetcher: 取得エンジン（未指定時はキャッシュ・再試行キュー付きで生成）
+            cache: ディスクキャッシュ（未指定かつ use_cache=True なら既定の場所に生成）
+            use_cache: fetcher 未指定時にディスクキャッシュを使うか
+            provider: info の取得元（fetch_func が既定の get_stock_metrics の場合に使用）
+            max_workers: fetcher 未指定時の同時実行数
+            requests_per_second: fetcher 未指定時のリクエストレート（None なら無制限）
+            limiter: fetcher 未指定時に使うトークンバケット（requests_per_second より優先）。
+                     provider を create_provider(limiter=...) で生成した場合は同じものを渡す
+            refresh_planner: キャッシュを決算発表日に連動して更新する場合の判定
+                             （ファンダメンタルが有効な銘柄は株価のみ取得）
+            quote_filter: 指定時は2段階取得を行う。全銘柄の気配情報を先に取得し、
+                          この関数を通過した銘柄だけ全指標を取得する
+            quote_func: 1銘柄分の気配情報を取得する関数
+            deadline_seconds: evaluate() の既定の制限時間（秒）
+            priority: evaluate() の既定の取得優先度
+            relative: 'percentile' / 'zscore' なら、combine() で既存データと新規評価分を
+                      合わせた全銘柄を母集団として、市場 × セクター内の相対評価で一括採点し直す
+                      （score_func の代わり。既存データには定量指標の列が必要）
+        """
+        if relative is not None and relative not in RELATIVE_METHODS:
+            raise ValueError(f"relative must be one of {RELATIVE_METHODS}: {relative}")
+        if fetcher is not None:
+            limiter = fetcher.limiter
+        elif limiter is None and requests_per_second is not None:
+            limiter = TokenBucket(requests_per_second, DEFAULT_BURST)
+        if provider is None and limiter is not None and (
+                fetch_func is get_stock_metrics or quote_func is get_quote_metrics):
+            # 既定の yfinance からの取得でも、再試行のリクエストをレート制限に含める
+            provider = ResilientProvider(YFinanceProvider(), limiter=limiter)
+        if provider is not None and fetch_func is get_stock_metrics:
+            fetch_func = functools.partial(get_stock_metrics, provider=provider)
+        if provider is not None and quote_func is get_quote_metrics:
+            quote_func = functools.partial(get_quote_metrics, provider=provider)
+        if fetcher is None:
+            if cache is None and use_cache:
+                cache = MetricsCache(CACHE_FIELDS)
+            fetcher = ConcurrentFetcher(fetch_func, max_workers=max_workers,
+                                        requests_per_second=None, limiter=limiter, cache=cache,
+                                        is_failed=is_failed_metrics,
+                                        planner=refresh_planner, price_func=fetch_last_price)
+        self.fetcher = fetcher
+        self.cache = fetcher.cache
+        self.score_func = score_func
+        self.deadline_seconds = deadline_seconds
+        self.priority = priority
+        self.relative = relative
+
+        self.quote_filter = quote_filter
+        self.quote_fetcher = None
+        if quote_filter is not None:
+            # レート制限は全指標の取得と共有する
+            self.quote_fetcher = ConcurrentFetcher(quote_func, max_workers=fetcher.max_workers,
+                                                   requests_per_second=None, limiter=fetcher.limiter)
+
+    def check_relative(self, universe: Universe) -> None:
+        """
+        相対評価で採点し直せるか確認（既存データに定量指標の列がなければ ValueError）
+
+        絶対評価のスコアと相対評価のスコアを同じ列で並べないよう、取得前に確認する。
+        """
+        if self.relative is None or universe.existing is None or universe.existing.empty:
+            return
+        fields = [rule.field for rule in QUANTITATIVE_SCORE_MODEL.rules]
+        missing = [f for f in fields if f not in universe.existing.columns]
+        if missing:
+            raise ValueError(f"relative scoring requires metric columns in existing evaluations: "
+                             f"missing {missing}")
+
+    def prefilter(self, tickers: List[str], market: Union[str, Sequence[str]], verbose: bool = True,
+                  deadline: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """
+        2段階取得の1段目: 気配情報で Tier 1 を満たさない銘柄を除外
+
+        Args:
+            tickers: ティッカーのリスト（取得順）
+            market: 'JP' or 'US'、または tickers と同じ長さの市場のリスト
+            verbose: 進捗を表示するか
+            deadline: 打ち切り時刻（time.monotonic() 基準）。気配情報を取得できなかった銘柄は
+                      通過・除外のどちらにも含めない（未評価として扱う）
+
+        Returns:
+            (全指標を取得する銘柄, 除外した銘柄)（いずれも入力順）
+        """
+        if self.quote_fetcher is None or not tickers:
+            return list(tickers), []
+
+        fetched = set()
+        quotes = self.quote_fetcher.fetch(tickers, market=market, show_progress=verbose,
+                                          on_result=lambda ticker, quote: fetched.add(ticker),
+                                          deadline=deadline)
+        survivors, rejected = [], []
+        for ticker, quote in zip(tickers, quotes):
+            if ticker in fetched:
+                (survivors if self.quote_filter(quote) else rejected).append(ticker)
+        if verbose:
+            print(f"\n  🔎 1段目（気配情報）: {len(survivors)}/{len(tickers)}銘柄が通過"
+                  f"（{len(rejected)}銘柄は全指標を取得せずに除外）")
+            if len(fetched) < len(tickers):
+                print(f"  ⏰ 気配情報を取得できなかった {len(tickers) - len(fetched)}銘柄は未評価")
+        return survivors, rejected
+
+    def plan(self, universe: Universe) -> Dict[str, List[str]]:
+        """
+        取得計画を作成（I/Oなし）
+
+        既存CSVの銘柄と、先に出現したセグメントの銘柄を除外する。
+
+        Returns:
+            {セグメント名: 取得するティッカーのリスト}
+        """
+        seen = set()
+        if universe.existing is not None and 'ticker' in universe.existing.columns:
+            seen.update(normalize_ticker(t) for t in universe.existing['ticker'].dropna())
+
+        plan = {}
+        for segment in universe.segments:
+            tickers = []
+            for ticker in segment.tickers:
+                key = normalize_ticker(ticker)
+                if key in seen:
+                    continue
+                seen.add(key)
+                tickers.append(ticker)
+            plan[segment.name] = tickers
+        return plan
+
+    def build_record(self, metrics, universe, segment):
+        """取得結果から出力レコードを組み立てる（列順は従来スクリプトと同じ）"""
+        record = {key: metrics.get(key) for key in universe.metrics_fields}
+        record[universe.score_column] = self.score_func(metrics)
+        record.update(segment.columns)
+        return record
+
+    def priorities(self, tickers: List[str], by: str = 'market_cap',
+                   markets: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """
+        キャッシュ済みの前回取得結果から取得の優先度を求める（キャッシュにない銘柄は含まない）
+
+        時価総額は通貨が市場ごとに異なる（日本株は円、米国株はドル）ため、
+        市場内のパーセンタイル順位（0-1）を優先度とし、市場をまたいで交互に並ぶようにする。
+
+        Args:
+            tickers: ティッカーのリスト
+            by: 'market_cap'（前回の時価総額）or 'score'（前回の指標から算出したスコア）
+            markets: tickers と同じ長さの市場のリスト（未指定時はキャッシュの 'market'）
+        """
+        if by not in PRIORITY_KEYS:
+            raise ValueError(f"by must be one of {PRIORITY_KEYS}: {by}")
+        if self.cache is None:
+            return {}
+
+        result = {}
+        market_of = {}
+        for i, ticker in enumerate(tickers):
+            entry = self.cache.load(ticker)
+            if entry is None:
+                continue
+            data = entry['data']
+            value = data.get('market_cap') if by == 'market_cap' else self.score_func(data)
+            if value:
+                result[ticker] = value
+                market_of[ticker] = markets[i] if markets is not None else data.get('market') or ''
+        if by == 'market_cap' and result:
+            values = pd.Series(result, dtype=float)
+            result = values.groupby(pd.Series(market_of)).rank(pct=True).to_dict()
+        return result
+
+    def evaluate(self, universe: Universe, plan: Optional[Dict[str, List[str]]] = None,
+                 verbose: bool = True, journal: Optional[ScreeningJournal] = None,
+                 resume: bool = False, deadline_seconds: Optional[float] = None,
+                 priority: Optional[Union[str, Dict[str, float]]] = None) -> pd.DataFrame:
+        """
+        追加銘柄を取得・採点し、新規評価分のDataFrameを返す
+
+        Args:
+            universe: スクリーニング対象
+            plan: 取得計画（未指定時は plan() で作成）
+            verbose: 進捗を表示するか
+            journal: 採点済みレコードを1件ずつ追記するチェックポイント
+            resume: True の場合、journal に記録済みの銘柄は取得せずに再利用する
+                    （False の場合、journal は空にしてから記録を始める）
+            deadline_seconds: 取得の制限時間（秒）。過ぎた時点で打ち切り、
+                              取得済みの銘柄だけで結果を返す（既定はエンジンの設定）
+            priority: 取得順の優先度。'market_cap' / 'score'（priorities() を参照）
+                      または {ticker: 優先度}。大きい順に取得し、不明な銘柄は最後に回す
+                      （既定はエンジンの設定）
+
+        Returns:
+            新規評価分のDataFrame（取得失敗の銘柄は含まない）。
+            attrs['coverage'] にセグメント別の網羅率を持つ
+        """
+        self.check_relative(universe)
+        plan = self.plan(universe) if plan is None else plan
+        deadline_seconds = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        priority = self.priority if priority is None else priority
+
+        journaled = {}
+        if journal is not None:
+            if resume:
+                journaled = journal.load()
+                if verbose:
+                    print(f"♻️ チェックポイントから再開: {len(journaled)}銘柄を再利用")
+            else:
+                journal.reset()
+
+        started = time.monotonic()
+        deadline = None if deadline_seconds is None else started + deadline_seconds
+
+        # 各セグメントの取得対象を集め、全セグメントをまとめて1回で取得する
+        built: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        planned: Dict[str, List[str]] = {}
+        pending_jobs = []
+        for segment in universe.segments:
+            tickers = plan[segment.name]
+            built[segment.name] = {t: journaled[t] for t in tickers if t in journaled}
+            pending = [t for t in tickers if t not in built[segment.name]]
+            if verbose:
+                skipped = len(segment.tickers) - len(tickers)
+                print(f"📊 {segment.name}: {len(pending)}銘柄を評価"
+                      f"（重複・評価済み {skipped}銘柄、"
+                      f"チェックポイント {len(built[segment.name])}銘柄をスキップ）")
+            planned[segment.name] = tickers
+            pending_jobs.extend((t, segment) for t in pending)
+
+        if priority is not None:
+            if isinstance(priority, str):
+                priority = self.priorities([t for t, _ in pending_jobs], by=priority,
+                                           markets=[segment.market for _, segment in pending_jobs])
+            # 優先度の降順（同順位・不明は元の順序を保つ）
+            pending_jobs.sort(key=lambda job: -priority.get(job[0], float('-inf')))
+
+        # 2段階取得の1段目も制限時間内に優先度の高い順に行う（除外した銘柄は計画からも外す）
+        survivors, rejected = self.prefilter([t for t, _ in pending_jobs],
+                                             [segment.market for _, segment in pending_jobs],
+                                             verbose=verbose, deadline=deadline)
+        if rejected:
+            rejected = set(rejected)
+            planned = {name: [t for t in tickers if t not in rejected] for name, tickers in planned.items()}
+        survivors = set(survivors)
+        jobs = [(t, segment) for t, segment in pending_jobs if t in survivors]
+
+        segment_of = {t: segment for t, segment in jobs}
+        failed = []
+
+        def on_result(ticker, metrics):
+            # 再試行後も取得できなかった銘柄は出力・網羅率・チェックポイントに含めない
+            # （market_cap=0 の0点の行として並ばないようにし、再開時に再取得する）
+            if is_failed_metrics(metrics):
+                failed.append(ticker)
+                return
+            segment = segment_of[ticker]
+            record = self.build_record(metrics, universe, segment)
+            built[segment.name][ticker] = record
+            if journal is not None:
+                journal.append(record)
+
+        results = self.fetcher.fetch(
+            [t for t, _ in jobs], market=[segment.market for _, segment in jobs],
+            on_result=on_result, show_progress=verbose, deadline=deadline,
+        )
+        fetched = sum(result is not None for result in results)
+        if verbose:
+            print()
+
+        if journal is not None:
+            journal.close()
+
+        records = []
+        coverage = []
+        for segment in universe.segments:
+            tickers = planned[segment.name]
+            covered = [t for t in tickers if t in built[segment.name]]
+            records.extend(built[segment.name][t] for t in covered)
+            coverage.append({
+                'segment': segment.name,
+                'planned': len(tickers),
+                'evaluated': len(covered),
+                'failed': sum(segment_of.get(t) is segment for t in failed),
+                'coverage': len(covered) / len(tickers) * 100 if tickers else 100.0,
+            })
+        coverage = pd.DataFrame(coverage)
+        # 優先順で先頭から途切れずに取得できた銘柄数（取得失敗で途切れる）
+        top_covered = next((n for n, result in enumerate(results)
+                            if result is None or is_failed_metrics(result)), len(results))
+
+        if verbose:
+            elapsed = time.monotonic() - started
+            rate = fetched / elapsed if elapsed > 0 else 0.0
+            print(f"  ⏱️ 取得時間: {elapsed:.1f}秒（{fetched}銘柄、{rate:.1f}銘柄/秒）")
+            if failed:
+                print(f"  ⚠️ 再試行後も取得できなかった銘柄: {len(failed)}銘柄"
+                      f"（{', '.join(failed[:10])}{' ほか' if len(failed) > 10 else ''}）")
+            if self.cache is not None:
+                print(f"  {self.cache.summary()}")
+            if deadline is not None:
+                print(f"  📋 網羅率（制限時間 {deadline_seconds:.0f}秒）:")
+                for row in coverage.itertuples():
+                    print(f"    {row.segment}: {row.evaluated}/{row.planned}銘柄 ({row.coverage:.1f}%)")
+                print(f"    取得順の上位 {top_covered}/{len(jobs)}銘柄まで欠けなく取得")
+
+        columns = list(universe.metrics_fields) + [universe.score_column]
+        for segment in universe.segments:
+            columns += [c for c in segment.columns if c not in columns]
+        df = pd.DataFrame(records, columns=columns)
+        df.attrs['coverage'] = coverage
+        df.attrs['top_covered'] = top_covered
+        return df
+
+    def combine(self, universe: Universe, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        既存データと新規評価分を統合し、スコア順に並べる
+
+        相対評価の場合は、統合した全銘柄を母集団としてスコアを算出し直す
+        （制限時間で打ち切った場合、母集団は取得できた銘柄と既存データのみ）。
+        """
+        self.check_relative(universe)
+        if universe.existing is not None:
+            all_data = pd.concat([universe.existing, new_df], ignore_index=True)
+        else:
+            all_data = new_df
+
+        if self.relative is not None and len(all_data):
+            all_data = all_data.copy()
+            scores = calculate_quantitative_scores(all_data, relative=self.relative)
+            all_data[universe.score_column] = scores['quantitative_score'].round(1)
+
+        all_data = all_data.sort_values(universe.score_column, ascending=False)
+
+        if universe.add_rank:
+            all_data = all_data.reset_index(drop=True)
+            if 'rank' in all_data.columns:
+                all_data = all_data.drop(columns=['rank'])
+            all_data.insert(0, 'rank', range(1, len(all_data) + 1))
+
+        return all_data
+
+    def run(self, universe: Universe, verbose: bool = True,
+            journal: Optional[ScreeningJournal] = None, resume: bool = False) -> pd.DataFrame:
+        """ユニバース全体を評価し、統合済みDataFrameを返す"""
+        new_df = self.evaluate(universe, verbose=verbose, journal=journal, resume=resume)
+        return self.combine(universe, new_df)
+
+
+# ===========================
+# 5. コマンドライン引数
+# ===========================
+
+def build_arg_parser(description=None):
+    """phase1_* スクリプト共通のコマンドライン引数"""
+    parser = argparse.ArgumentParser(
+        description=description,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='チェックポイントジャーナルに記録済みの銘柄を再取得せずに、中断した実行を再開する',
+    )
+    parser.add_argument(
+        '--provider', choices=PROVIDER_MODES, default='live',
+        help='データ取得元: live=yfinance, record=取得しつつ生データを保存, replay=保存済みデータを再生',
+    )
+    parser.add_argument(
+        '--archive', default=DEFAULT_ARCHIVE_DIR,
+        help='record/replay で使うアーカイブディレクトリ',
+    )
+    parser.add_argument(
+        '--replay-latency', type=float, default=0.0,
+        help='replay 時の1リクエストあたりの人工遅延（秒）',
+    )
+    parser.add_argument(
+        '--refresh-policy', choices=('daily', 'earnings'), default='daily',
+        help='キャッシュ更新: daily=毎日全指標を再取得, '
+             'earnings=決算発表後のみ全指標を再取得し、それ以外は株価のみ更新',
+    )
+    parser.add_argument(
+        '--two-stage', action='store_true',
+        help='全銘柄の気配情報を先に取得し、Tier 1 の時価総額・流動性基準を満たす銘柄のみ全指標を取得する'
+             '（除外された銘柄は出力に含まれない）',
+    )
+    parser.add_argument(
+        '--deadline', type=float, default=None, metavar='SEC',
+        help='取得の制限時間（秒）。優先度の高い順に取得し、時間内に取得できた銘柄だけで結果を出力する',
+    )
+    parser.add_argument(
+        '--priority', choices=PRIORITY_KEYS, default='market_cap',
+        help='--deadline 指定時の取得順: market_cap=前回の時価総額（市場内の順位で日本株・米国株を交互に）, score=前回のスコア（キャッシュから算出）',
+    )
+    parser.add_argument(
+        '--relative', choices=RELATIVE_METHODS, default=None,
+        help='定量スコアを絶対的な閾値ではなく市場 × セクター内の相対評価で算出する'
+             '（percentile=パーセンタイル, zscore=上下を切り詰めた z スコア）。'
+             '既存評価データと合わせた全銘柄が母集団となるため、既存データに定量指標の列が必要',
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=None,
+        help='live/record 時の1銘柄あたりのタイムアウト（秒）',
+    )
+    return parser
+
+
+def parse_run_args(argv=None, description=None):
+    """コマンドライン引数を解析"""
+    return build_arg_parser(description).parse_args(argv)
+
+
+def create_engine(args):
+    """
+    コマンドライン引数からエンジンを生成
+
+    replay ではレート制限とディスクキャッシュを無効にし、アーカイブのみから評価する。
+    record ではキャッシュを経由せず全銘柄を実際に取得してアーカイブする。
+    live / record のレート制限は、取得エンジンとプロバイダーの再試行で共有する。
+    """
+    limiter = None if args.provider == 'replay' else TokenBucket(DEFAULT_REQUESTS_PER_SECOND, DEFAULT_BURST)
+    provider = create_provider(args.provider, archive_dir=args.archive,
+                               latency_seconds=args.replay_latency,
+                               timeout_seconds=args.timeout, limiter=limiter)
+    if args.provider == 'live':
+        print("🌐 データ取得元: yfinance")
+    else:
+        print(f"💾 データ取得元: {args.provider}（{args.archive}）")
+    planner = RefreshPlanner() if args.refresh_policy == 'earnings' else None
+    return ScreeningEngine(
+        provider=provider,
+        use_cache=args.provider == 'live',
+        requests_per_second=None,
+        limiter=limiter,
+        refresh_planner=planner,
+        quote_filter=passes_quote_tier1 if args.two_stage else None,
+        deadline_seconds=args.deadline,
+        priority=args.priority if args.deadline is not None else None,
+        relative=args.relative,
+    )
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+チャンク単位のストリーミング・スクリーニング
+
+ユニバース全体を pd.read_csv で一度に読み込んでからソートして先頭を取る代わりに、
+CSV をチャンク単位で読み、チャンクごとに足切り・採点して、
+市場別・セクター別の上位K銘柄を有界のヒープで保持する。
+過去スナップショットを含む数百万行のユニバースでも、メモリ使用量は
+チャンクサイズと K × グループ数で決まる一定量に収まる。
+
+- iter_chunks:    CSV / DataFrame / DataFrame のイテラブルをチャンク単位で返す
+- TopK:           スコア上位K件（グループ別）を保持する有界ヒープ
+- RunningStats:   グループ別の件数・平均・標準偏差・最小・最大の逐次集計
+- StreamingScreener: 足切り（FilterExecutor）→ 採点（ScoreModel 等）→ TopK をまとめて実行
+
+使用方法:
+    screener = StreamingScreener(filters=IMURA_TIER1_FILTERS, score=IMURA_TIER2_MODEL,
+                                 k=30, group_by=['market', 'sector'])
+    result = screener.run('phase1_1100stocks_with_growth.csv')
+    result.top.frame()              # 全体の上位30銘柄
+    result.by_group['market'].frame('JP')
+"""
+
+import heapq
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from python.models.scoring import FilterExecutor, RangeFilter, ScoreModel
+
+DEFAULT_CHUNKSIZE = 100_000
+
+Source = Union[str, os.PathLike, pd.DataFrame, Iterable[pd.DataFrame]]
+GroupKey = Union[str, Sequence[str]]
+
+
+def iter_chunks(
+    source: Source,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[Sequence[str]] = None,
+    encoding: str = 'utf-8-sig',
+) -> Iterator[pd.DataFrame]:
+    """
+    データをチャンク単位で返す
+
+    Args:
+        source: CSVのパス、DataFrame、または DataFrame のイテラブル
+        chunksize: 1チャンクの行数（CSV・DataFrame の場合）
+        columns: 読み込む列（CSV の場合。None なら全列）
+        encoding: CSV の文字コード
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with pd.read_csv(source, chunksize=chunksize, usecols=columns, encoding=encoding) as reader:
+            yield from reader
+    elif isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    else:
+        yield from source
+
+
+def _group_label(group_by: GroupKey) -> str:
+    return group_by if isinstance(group_by, str) else '/'.join(group_by)
+
+
+class TopK:
+    """
+    スコア上位K件（グループ別）を保持する有界ヒープ
+
+    同点の場合は先に読み込んだ行を優先する（ソート後に先頭を取る場合と同じ）。
+    スコアが欠損の行は対象外。
+    """
+
+    def __init__(self, k: int, by: str, group_by: Optional[GroupKey] = None,
+                 ascending: bool = False):
+        """
+        初期化
+
+        Args:
+            k: 保持する件数（グループごと）
+            by: スコア列
+            group_by: グループ化する列（None なら全体で1グループ）
+            ascending: True なら値の小さい順の上位K件
+        """
+        if k < 1:
+            raise ValueError(f"k must be >= 1: {k}")
+        self.k = k
+        self.by = by
+        # タプルは pandas では1つの列名として扱われるためリストにする
+        self.group_by = group_by if group_by is None or isinstance(group_by, str) else list(group_by)
+        self.ascending = ascending
+        self._heaps: Dict[Any, List] = {}
+        self._seen = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """1チャンク分を取り込む"""
+        # index を通し番号（読み込み順）に置き換えて同点の順序に使う
+        chunk = chunk.set_axis(self._seen + np.arange(len(chunk)))
+        self._seen += len(chunk)
+        chunk = chunk[chunk[self.by].notna()]
+        if chunk.empty:
+            return
+        if self.group_by is None:
+            parts = [(None, chunk)]
+        else:
+            parts = chunk.groupby(self.group_by, sort=False, dropna=False)
+        for key, part in parts:
+            # チャンク内で先に K 件に絞ってからヒープに入れる
+            part = part.nsmallest(self.k, self.by) if self.ascending else part.nlargest(self.k, self.by)
+            heap = self._heaps.setdefault(key, [])
+            sign = -1.0 if self.ascending else 1.0
+            for position, value, record in zip(part.index, part[self.by], part.to_dict('records')):
+                item = (sign * float(value), -int(position), record)
+                if len(heap) < self.k:
+                    heapq.heappush(heap, item)
+                elif item[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, item)
+
+    def groups(self) -> List[Any]:
+        return list(self._heaps)
+
+    def frame(self, key: Any = None) -> pd.DataFrame:
+        """上位K件のDataFrame（スコア順）。group_by 指定時は key のグループ"""
+        items = sorted(self._heaps.get(key, []), key=lambda item: item[:2], reverse=True)
+        return pd.DataFrame([item[2] for item in items])
+
+
+class RunningStats:
+    """グループ別の件数・平均・標準偏差（不偏）・最小・最大の逐次集計"""
+
+    def __init__(self, value: str, group_by: Optional[GroupKey] = None):
+        self.value = value
+        self.group_by = group_by
+        self._parts: Optional[pd.DataFrame] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """1チャンク分を取り込む"""
+        values = pd.to_numeric(chunk[self.value], errors='coerce')
+        frame = pd.DataFrame({'value': values, 'square': values ** 2})
+        if self.group_by is None:
+            keys = pd.Series(0, index=chunk.index)
+        else:
+            keys = [chunk[c] for c in ([self.group_by] if isinstance(self.group_by, str) else self.group_by)]
+        grouped = frame.groupby(keys, dropna=True)
+        part = pd.DataFrame({
+            'count': grouped['value'].count(),
+            'sum': grouped['value'].sum(),
+            'sumsq': grouped['square'].sum(),
+            'min': grouped['value'].min(),
+            'max': grouped['value'].max(),
+        })
+        if self._parts is None:
+            self._parts = part
+            return
+        combined = pd.concat([self._parts, part])
+        by_key = combined.groupby(level=list(range(combined.index.nlevels)))
+        self._parts = by_key[['count', 'sum', 'sumsq']].sum().join(
+            by_key['min'].min()).join(by_key['max'].max())
+
+    def frame(self) -> pd.DataFrame:
+        """count / mean / std / min / max のDataFrame（index はグループ）"""
+        if self._parts is None:
+            return pd.DataFrame(columns=['count', 'mean', 'std', 'min', 'max'])
+        p = self._parts
+        count = p['count'].astype(float)
+        mean = p['sum'] / count.where(count > 0)
+        variance = (p['sumsq'] - count * mean ** 2) / (count - 1).where(count > 1)
+        result = pd.DataFrame({
+            'count': p['count'].astype(int),
+            'mean': mean,
+            'std': np.sqrt(variance.clip(lower=0)),
+            'min': p['min'],
+            'max': p['max'],
+        })
+        if self.group_by is None:
+            return result.reset_index(drop=True)
+        return result
+
+
+@dataclass
+class StreamResult:
+    """StreamingScreener.run() の結果"""
+
+    rows: int
+    passed: int
+    filters: pd.DataFrame
+    top: TopK
+    by_group: Dict[str, TopK] = field(default_factory=dict)
+
+
+class StreamingScreener:
+    """チャンクごとに足切り → 採点 → 上位K件の更新を行うスクリーナー"""
+
+    def __init__(
+        self,
+        filters: Optional[Union[FilterExecutor, Sequence[RangeFilter]]] = None,
+        score: Union[str, ScoreModel, Callable[[pd.DataFrame], pd.Series]] = 'total_score',
+        k: int = 30,
+        group_by: Sequence[GroupKey] = (),
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            filters: 足切り基準（FilterExecutor または RangeFilter のリスト）
+            score: スコア列名、ScoreModel（採点列を追加し total 列を使う）、
+                   または DataFrame → スコアの Series を返す関数（'score' 列として追加）
+            k: 保持する上位件数（全体・グループごと）
+            group_by: グループ別の上位K件を求める列（例: ['market', 'sector', ('market', 'sector')]）
+            chunksize: 1チャンクの行数
+            columns: CSV から読み込む列（None なら全列）
+        """
+        if filters is not None and not isinstance(filters, FilterExecutor):
+            filters = FilterExecutor(filters)
+        self.filters = filters
+        self.score = score
+        self.k = k
+        self.group_by = list(group_by)
+        self.chunksize = chunksize
+        self.columns = columns
+
+    @property
+    def score_column(self) -> str:
+        if isinstance(self.score, ScoreModel):
+            return self.score.total
+        if callable(self.score):
+            return 'score'
+        return self.score
+
+    def _score(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        if isinstance(self.score, ScoreModel):
+            scores = self.score.evaluate(chunk)
+            return chunk.drop(columns=scores.columns, errors='ignore').join(scores)
+        if callable(self.score):
+            return chunk.assign(score=self.score(chunk))
+        return chunk
+
+    def run(self, source: Source) -> StreamResult:
+        """
+        スクリーニングを実行
+
+        Args:
+            source: CSVのパス、DataFrame、または DataFrame のイテラブル
+
+        Returns:
+            StreamResult（読み込み行数、通過行数、基準別の評価・除外数、上位K件）
+        """
+        column = self.score_column
+        top = TopK(self.k, column)
+        by_group = {_group_label(g): TopK(self.k, column, group_by=g) for g in self.group_by}
+        filter_names = [f.name for f in self.filters.filters] if self.filters is not None else []
+        evaluated = dict.fromkeys(filter_names, 0)
+        rejected = dict.fromkeys(filter_names, 0)
+        rows = passed = 0
+
+        for chunk in iter_chunks(source, self.chunksize, self.columns):
+            rows += len(chunk)
+            if self.filters is not None:
+                result = self.filters.apply(chunk)
+                for step in result.waterfall.itertuples():
+                    evaluated[step.filter] += step.evaluated
+                    rejected[step.filter] += step.rejected
+                chunk = chunk[result.mask]
+            passed += len(chunk)
+            if chunk.empty:
+                continue
+            chunk = self._score(chunk)
+            top.update(chunk)
+            for heap in by_group.values():
+                heap.update(chunk)
+
+        filters = pd.DataFrame({
+            'filter': filter_names,
+            'evaluated': [evaluated[name] for name in filter_names],
+            'rejected': [rejected[name] for name in filter_names],
+        })
+        return StreamResult(rows=rows, passed=passed, filters=filters, top=top, by_group=by_group)
@@ -0,0 +1,22 @@
+"""
+資産シミュレーション
+
+積立・一括投資・取り崩しをキャッシュフロー・スケジュールとして宣言し、
+モンテカルロシミュレーションを、パスごとのループではなく
+(パス数, 期数) の乱数の配列に対する行列演算で一括評価するための共通基盤。
+"""
+
+from .adaptive import AdaptiveResult, simulate_adaptive
+from .montecarlo import SimulationResult, simulate
+from .parallel import ParallelResult, simulate_parallel
+from .schedule import CashFlowSchedule, Contribution, LumpSum, ReturnModel, Stream, Withdrawal
+from .sketch import QuantileSketch
+from .variance import GoalEstimate, estimate_success_probability
+
+__all__ = [
+    'CashFlowSchedule', 'Contribution', 'LumpSum', 'ReturnModel', 'Stream', 'Withdrawal',
+    'SimulationResult', 'simulate',
+    'ParallelResult', 'QuantileSketch', 'simulate_parallel',
+    'GoalEstimate', 'estimate_success_probability',
+    'AdaptiveResult', 'simulate_adaptive',
+]
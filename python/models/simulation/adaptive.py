@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+精度を指定する適応的モンテカルロシミュレーション
+
+シミュレーション回数を固定（MONTE_CARLO_ITERATIONS）する代わりに、バッチ単位でパスを追加し、
+目標達成確率の信頼区間（Wilson）の幅と、指定したパーセンタイルの信頼区間
+（順序統計量による分布によらない区間）の幅が許容値を下回った時点で停止する。
+達成がほぼ確実・ほぼ不可能な場合は少ないパス数で終わり、
+目標額付近の場合は上限までパスを追加して精度を確保する。
+
+乱数はバッチをまたいで1つの系列から引くため、N パスで停止した結果は
+simulate(schedule, N, random_state) の結果と一致する。
+
+使用方法:
+    result = simulate_adaptive(schedule, target=2400, percentiles=[10, 50], tolerance=1.0)
+    result.success_rate(2400), result.success_interval(), result.simulations, result.converged
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import stats
+
+from .montecarlo import DEFAULT_BLOCK_SIZE, RandomSource, SimulationResult, _random_state, simulate
+from .schedule import CashFlowSchedule
+
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_MAX_SIMULATIONS = 200_000
+DEFAULT_TOLERANCE = 1.0               # 達成確率の信頼区間の幅（%ポイント）
+DEFAULT_PERCENTILE_TOLERANCE = 0.01   # パーセンタイルの信頼区間の幅（推定値に対する比）
+DEFAULT_CONFIDENCE = 0.95
+
+
+def wilson_interval(successes: int, n: int, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """
+    二項比率の Wilson 信頼区間（0〜1）
+
+    正規近似の区間と違い、達成確率が 0 や 1 に近くても幅が0にならない。
+    """
+    if n <= 0:
+        return 0.0, 1.0
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def percentile_interval(sorted_values: np.ndarray, q: float,
+                        confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """
+    パーセンタイル q（0〜100）の信頼区間（順序統計量による、分布によらない区間）
+
+    順位 n × q / 100 ± z × √(n q (1 - q)) の値を区間の両端とする。
+    """
+    n = len(sorted_values)
+    fraction = q / 100
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    spread = z * np.sqrt(n * fraction * (1 - fraction))
+    lo = int(np.clip(np.floor(n * fraction - spread), 0, n - 1))
+    hi = int(np.clip(np.ceil(n * fraction + spread), 0, n - 1))
+    return float(sorted_values[lo]), float(sorted_values[hi])
+
+
+@dataclass
+class AdaptiveResult(SimulationResult):
+    """適応的シミュレーションの結果（停止までの全パスの最終資産額と停止時の信頼区間）"""
+
+    target: Optional[float] = None
+    confidence: float = DEFAULT_CONFIDENCE
+    converged: bool = False       # 許容値を満たして停止したか（False なら上限に到達）
+    batches: int = 0
+    percentile_intervals: Dict[float, Tuple[float, float]] = field(default_factory=dict)
+
+    def success_interval(self) -> Tuple[float, float]:
+        """target の達成確率の信頼区間（%）"""
+        if self.target is None:
+            raise ValueError("target was not given")
+        successes = int(np.count_nonzero(self.final_values >= self.target))
+        lo, hi = wilson_interval(successes, self.simulations, self.confidence)
+        return lo * 100, hi * 100
+
+
+def simulate_adaptive(
+    schedule: CashFlowSchedule,
+    target: Optional[float] = None,
+    percentiles: Sequence[float] = (),
+    tolerance: float = DEFAULT_TOLERANCE,
+    percentile_tolerance: float = DEFAULT_PERCENTILE_TOLERANCE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_simulations: int = DEFAULT_MAX_SIMULATIONS,
+    random_state: RandomSource = 42,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> AdaptiveResult:
+    """
+    信頼区間の幅が許容値を下回るまでバッチを追加してシミュレーションする
+
+    Args:
+        schedule: キャッシュフロー・スケジュール
+        target: 目標額（達成確率の信頼区間で停止を判定）
+        percentiles: 信頼区間で停止を判定するパーセンタイル（0〜100）
+        tolerance: 達成確率の信頼区間の幅の許容値（%ポイント）
+        percentile_tolerance: パーセンタイルの信頼区間の幅の許容値（推定値に対する比）
+        confidence: 信頼水準
+        batch_size: 1バッチのパス数
+        max_simulations: パス数の上限
+        random_state: 乱数のシード（np.random.seed と同じ系列）、RandomState または Generator
+        block_size: 1回に評価するパス数
+
+    Returns:
+        AdaptiveResult
+    """
+    if target is None and not len(percentiles):
+        raise ValueError("target or percentiles is required")
+    if batch_size < 1 or max_simulations < 1:
+        raise ValueError(f"batch_size and max_simulations must be >= 1: {batch_size}, {max_simulations}")
+    rng = _random_state(random_state)
+
+    batches: List[SimulationResult] = []
+    simulations = 0
+    converged = False
+    intervals: Dict[float, Tuple[float, float]] = {}
+    successes = 0
+    while simulations < max_simulations and not converged:
+        size = min(batch_size, max_simulations - simulations)
+        batch = simulate(schedule, size, random_state=rng, block_size=block_size)
+        batches.append(batch)
+        simulations += size
+
+        converged = True
+        if target is not None:
+            successes += int(np.count_nonzero(batch.final_values >= target))
+            lo, hi = wilson_interval(successes, simulations, confidence)
+            converged = (hi - lo) * 100 <= tolerance
+        if len(percentiles):
+            values = np.sort(np.concatenate([b.final_values for b in batches]))
+            intervals = {q: percentile_interval(values, q, confidence) for q in percentiles}
+            estimates = np.percentile(values, list(percentiles))
+            converged = converged and all(
+                hi - lo <= percentile_tolerance * abs(estimate)
+                for (lo, hi), estimate in zip(intervals.values(), estimates)
+            )
+
+    accounts = {name: np.concatenate([b.accounts[name] for b in batches]) for name in schedule.accounts}
+    return AdaptiveResult(
+        final_values=np.concatenate([b.final_values for b in batches]),
+        accounts=accounts,
+        target=target,
+        confidence=confidence,
+        converged=converged,
+        batches=len(batches),
+        percentile_intervals=intervals,
+    )
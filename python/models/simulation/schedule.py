@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+キャッシュフロー・スケジュール
+
+シミュレーションの対象を「資産の流れ（Stream）」の並びとして宣言的に記述する。
+各 Stream は運用期間（開始月〜終了月）、複利の頻度、リターンのモデル、
+入出金（毎期の積立・一括投資・毎期の取り崩し）を持つ。
+月は計画の開始（0）からの経過月数で、Stream ごとに独立したリターン系列で運用する。
+
+使用方法:
+    schedule = CashFlowSchedule([
+        Stream('既存資産', end=156, periods_per_year=1, flows=[LumpSum(1120)]),
+        Stream('NISA積立', start=24, end=168, flows=[Contribution(16.2)]),
+        Stream('取り崩し', start=168, end=288, flows=[LumpSum(500), Withdrawal(10)],
+               returns=ReturnModel(4.0, 8.0)),
+    ], returns=ReturnModel(6.0, 16.1))
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MONTHS_PER_YEAR = 12
+
+
+@dataclass(frozen=True)
+class ReturnModel:
+    """年率リターン（%）の正規分布"""
+
+    mean: float
+    volatility: float
+
+
+@dataclass(frozen=True)
+class Contribution:
+    """
+    毎期の積立
+
+    start〜end（月、end は含まない）に始まる各期の期首に amount を投資する。
+    None なら Stream の運用期間。
+    """
+
+    amount: float
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Withdrawal(Contribution):
+    """毎期の取り崩し（期首に amount を引き出す。評価額は0未満にならない）"""
+
+
+@dataclass(frozen=True)
+class LumpSum:
+    """
+    一括投資（amount が負なら引き出し）
+
+    month を含む期の期首に加算する（None なら運用開始時）。
+    運用終了月以降なら運用せずに最終評価額へ加算する。
+    """
+
+    amount: float
+    month: Optional[int] = None
+
+
+CashFlow = Union[Contribution, LumpSum]
+
+
+@dataclass
+class Stream:
+    """
+    独自のリターン系列で運用する資産の流れ
+
+    各期に value = (value + 期首の入出金) × (1 + r / periods_per_year / 100) で更新する
+    （r は年率%の正規乱数）。運用は start〜end の月のみで、終了後の評価額は据え置く。
+    """
+
+    name: str
+    start: int = 0
+    end: int = 0
+    flows: Sequence[CashFlow] = ()
+    returns: Optional[ReturnModel] = None   # None なら CashFlowSchedule の既定
+    periods_per_year: int = 12              # 12: 月次複利、1: 年次複利
+    account: Optional[str] = None           # 集計先の口座（None なら name）
+
+    def __post_init__(self):
+        if self.periods_per_year <= 0 or MONTHS_PER_YEAR % self.periods_per_year:
+            raise ValueError(f"periods_per_year must divide {MONTHS_PER_YEAR}: {self.periods_per_year}")
+        if self.end < self.start or (self.end - self.start) % self.months_per_period:
+            raise ValueError(f"invalid period for {self.name}: {self.start}-{self.end}")
+
+    @property
+    def months_per_period(self) -> int:
+        return MONTHS_PER_YEAR // self.periods_per_year
+
+    @property
+    def periods(self) -> int:
+        """運用期数（このパスで引く乱数の数）"""
+        return (self.end - self.start) // self.months_per_period
+
+    @property
+    def can_deplete(self) -> bool:
+        """引き出しがあるか（評価額を0で打ち切る）"""
+        return any(isinstance(f, Withdrawal) or (isinstance(f, LumpSum) and f.amount < 0)
+                   for f in self.flows)
+
+    def cash_flows(self) -> Tuple[np.ndarray, float]:
+        """
+        各期の期首の入出金
+
+        Returns:
+            (期ごとの入出金（periods,）, 運用終了後に加算する額)
+        """
+        flows = np.zeros(self.periods)
+        period_starts = self.start + np.arange(self.periods) * self.months_per_period
+        closing = 0.0
+        for flow in self.flows:
+            if isinstance(flow, LumpSum):
+                month = self.start if flow.month is None else flow.month
+                if month < self.start:
+                    raise ValueError(f"lump sum before start of {self.name}: month {month}")
+                if month >= self.end:
+                    closing += flow.amount
+                else:
+                    flows[(month - self.start) // self.months_per_period] += flow.amount
+            else:
+                lo = self.start if flow.start is None else flow.start
+                hi = self.end if flow.end is None else flow.end
+                amount = -flow.amount if isinstance(flow, Withdrawal) else flow.amount
+                flows[(period_starts >= lo) & (period_starts < hi)] += amount
+        return flows, closing
+
+
+@dataclass
+class CashFlowSchedule:
+    """資産の流れの並び（乱数はこの順・各 Stream の期の順に引く）"""
+
+    streams: Sequence[Stream]
+    returns: Optional[ReturnModel] = None   # Stream に returns がない場合の既定
+
+    def stream_returns(self, stream: Stream) -> ReturnModel:
+        returns = stream.returns or self.returns
+        if returns is None and stream.periods:
+            raise ValueError(f"no return model for {stream.name}")
+        return returns
+
+    def return_parameters(self) -> Tuple[np.ndarray, np.ndarray]:
+        """1パス分の乱数の並びに対応する年率リターンの平均・標準偏差"""
+        loc, scale = [np.empty(0)], [np.empty(0)]
+        for stream in self.streams:
+            if stream.periods:
+                returns = self.stream_returns(stream)
+                loc.append(np.full(stream.periods, float(returns.mean)))
+                scale.append(np.full(stream.periods, float(returns.volatility)))
+        return np.concatenate(loc), np.concatenate(scale)
+
+    def expected_final_value(self) -> float:
+        """
+        最終資産額の期待値
+
+        各期のリターンが独立なら、漸化式は各期の成長率について線形なので、期待値は
+        平均リターンでの確定的な複利計算（毎期の期首積立は compound_investment と同じ
+        年金終価の式）と一致する。評価額を0で打ち切る Stream があると一致しないため ValueError。
+        """
+        total = 0.0
+        for stream in self.streams:
+            if stream.can_deplete:
+                raise ValueError(f"expected value is not closed-form with withdrawals: {stream.name}")
+            flows, closing = stream.cash_flows()
+            if stream.periods:
+                growth = 1 + self.stream_returns(stream).mean / stream.periods_per_year / 100
+                total += float(np.sum(flows * growth ** np.arange(stream.periods, 0, -1)))
+            total += closing
+        return total
+
+    @property
+    def accounts(self) -> List[str]:
+        """口座名（最初に現れた順）"""
+        names = [stream.account or stream.name for stream in self.streams]
+        return list(dict.fromkeys(names))
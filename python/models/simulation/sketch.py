@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+マージ可能な分位点スケッチ
+
+最終資産額を対数間隔のビン（境界が gamma = (1 + α) / (1 - α) 倍ずつ増える）に数え、
+分位点をビンの代表値で返す（相対誤差 α 以内）。ビンの件数は整数なので、
+シャードごとのスケッチをどの順に合成しても同じ結果になる。
+全パスの値を保持せずに、1,000万パス規模の分位点を求めるために使う。
+
+使用方法:
+    sketch = QuantileSketch.from_values(values, relative_accuracy=0.001)
+    sketch.merge(other)
+    sketch.quantile([0.1, 0.5, 0.9])
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.001
+
+
+def _add(store: Tuple[int, np.ndarray], indexes: np.ndarray) -> Tuple[int, np.ndarray]:
+    """(先頭のビン番号, 件数) の store にビン番号の配列を加える"""
+    if not len(indexes):
+        return store
+    lo = int(indexes.min())
+    added = np.bincount(indexes - lo)
+    return _merge(store, (lo, added.astype(np.int64)))
+
+
+def _merge(a: Tuple[int, np.ndarray], b: Tuple[int, np.ndarray]) -> Tuple[int, np.ndarray]:
+    if not len(a[1]):
+        return b[0], b[1].copy()
+    if not len(b[1]):
+        return a
+    lo = min(a[0], b[0])
+    hi = max(a[0] + len(a[1]), b[0] + len(b[1]))
+    counts = np.zeros(hi - lo, dtype=np.int64)
+    counts[a[0] - lo:a[0] - lo + len(a[1])] += a[1]
+    counts[b[0] - lo:b[0] - lo + len(b[1])] += b[1]
+    return lo, counts
+
+
+class QuantileSketch:
+    """相対誤差 relative_accuracy 以内の分位点を返す、合成可能なヒストグラム"""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1): {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self._positive: Tuple[int, np.ndarray] = (0, np.zeros(0, dtype=np.int64))
+        self._negative: Tuple[int, np.ndarray] = (0, np.zeros(0, dtype=np.int64))   # 絶対値のビン
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @classmethod
+    def from_values(cls, values, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> 'QuantileSketch':
+        sketch = cls(relative_accuracy)
+        sketch.add(values)
+        return sketch
+
+    def _index(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def add(self, values) -> None:
+        """値（NaN は不可）を加える"""
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return
+        if np.isnan(values).any():
+            raise ValueError("values must not contain NaN")
+        self._positive = _add(self._positive, self._index(values[values > 0]))
+        self._negative = _add(self._negative, self._index(-values[values < 0]))
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+        lo, hi = float(values.min()), float(values.max())
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """other を合成する（相対誤差が同じスケッチのみ）"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different relative_accuracy")
+        if not other.count:
+            return self
+        self._positive = _merge(self._positive, other._positive)
+        self._negative = _merge(self._negative, other._negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """
+        分位点（q は 0〜1。配列なら同じ形で返す）
+
+        順位 q × (件数 - 1) の値（切り捨て）を相対誤差 relative_accuracy 以内で返す。
+        """
+        if not self.count:
+            raise ValueError("empty sketch")
+        qs = np.asarray(q, dtype=float)
+        if ((qs < 0) | (qs > 1)).any():
+            raise ValueError(f"quantile must be in [0, 1]: {q}")
+
+        # 値の小さい順のビン（負の値は絶対値のビンを逆順、0、正の値）
+        neg_offset, neg_counts = self._negative
+        pos_offset, pos_counts = self._positive
+        counts = np.concatenate([neg_counts[::-1], [self.zero_count], pos_counts])
+        values = np.concatenate([
+            -self._value_array(neg_offset, len(neg_counts))[::-1],
+            [0.0],
+            self._value_array(pos_offset, len(pos_counts)),
+        ])
+        cumulative = np.cumsum(counts)
+        ranks = np.floor(qs * (self.count - 1))
+        result = values[np.searchsorted(cumulative, ranks, side='right')]
+        result = np.clip(result, self.min, self.max)
+        return float(result) if result.ndim == 0 else result
+
+    def _value_array(self, offset: int, length: int) -> np.ndarray:
+        # ビン (gamma^(i-1), gamma^i] の代表値（ビン内のどの値とも相対誤差 α 以内）
+        return 2 * self.gamma ** np.arange(offset, offset + length, dtype=float) / (self.gamma + 1)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+分散減少法による目標達成確率の推定
+
+目標達成確率（最終資産額 ≧ 目標額となる確率）を、単純なモンテカルロより少ないパス数で
+同じ精度に推定するための手法を切り替えて使う。
+
+- antithetic: 対称変量法。標準正規乱数 z と -z の2パスを組にして評価する
+- sobol: 準モンテカルロ法。スクランブルした Sobol 列を正規分布の逆関数で変換する
+  （独立にスクランブルした replicates 組の推定値のばらつきで標準誤差を求める）
+- control_variate: 制御変量法。期待値が複利計算の式で求まる最終資産額
+  （CashFlowSchedule.expected_final_value、compound_investment と同じ式）を制御変量とし、
+  達成フラグ - β × (最終資産額 - 期待値) の平均で推定する
+
+推定結果には標準誤差と分散減少率（同じパス数の単純なモンテカルロの分散 p(1-p)/n との比）を含める。
+分散減少率が k なら、同じ精度に必要なパス数は単純なモンテカルロの 1/k になる。
+
+使用方法:
+    estimate = estimate_success_probability(schedule, target=2400, simulations=4096,
+                                            method='antithetic', control_variate=True)
+    print(estimate.summary())
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+from scipy import stats
+from scipy.stats import qmc
+
+from .montecarlo import RandomSource, _random_state, evaluate
+from .schedule import CashFlowSchedule
+
+METHODS = ('plain', 'antithetic', 'sobol')
+
+# 準モンテカルロ法で独立にスクランブルする組の数
+DEFAULT_REPLICATES = 8
+
+
+@dataclass
+class GoalEstimate:
+    """目標達成確率の推定結果"""
+
+    target: float
+    method: str
+    control_variate: bool
+    simulations: int
+    probability: float         # 達成確率（%）
+    standard_error: float      # 標準誤差（%ポイント）
+    variance_reduction: float  # 単純なモンテカルロ（同じパス数）の分散との比
+
+    def confidence_interval(self, level: float = 0.95) -> Tuple[float, float]:
+        """達成確率の信頼区間（%、正規近似）"""
+        z = stats.norm.ppf(0.5 + level / 2)
+        return self.probability - z * self.standard_error, self.probability + z * self.standard_error
+
+    @property
+    def equivalent_simulations(self) -> float:
+        """同じ精度に必要な単純なモンテカルロのパス数"""
+        return self.simulations * self.variance_reduction
+
+    def summary(self) -> str:
+        lo, hi = self.confidence_interval()
+        label = self.method + (' + control_variate' if self.control_variate else '')
+        return (f"達成確率 {self.probability:.2f}%（95%信頼区間 {lo:.2f}〜{hi:.2f}%、{label}、"
+                f"{self.simulations:,}パス、分散減少率 ×{self.variance_reduction:.1f}）")
+
+
+def _shocks(method: str, simulations: int, draws: int, rng, replicates: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    標準正規乱数 (パス数, 乱数の数) と、各パスの組（標準誤差を求める独立な単位）の番号
+    """
+    if method == 'plain':
+        return rng.standard_normal(size=(simulations, draws)), np.arange(simulations)
+    if method == 'antithetic':
+        half = simulations // 2
+        z = rng.standard_normal(size=(half, draws))
+        return np.concatenate([z, -z]), np.tile(np.arange(half), 2)
+    # Sobol 列は 2 のべき乗の点数で均等に分布する
+    m = max(int(np.log2(max(simulations // replicates, 1))), 1)
+    seeds = rng.integers(0, 2 ** 63, size=replicates)
+    # seed= は requirements.txt の対応範囲（scipy 1.10 以降）すべてで使える（rng= は 1.15 以降）
+    points = np.concatenate([qmc.Sobol(draws, scramble=True, seed=int(seed)).random_base2(m) for seed in seeds])
+    # 端点（0・1）は正規分布の逆関数が発散するため丸める
+    points = np.clip(points, np.finfo(float).eps, 1 - np.finfo(float).eps)
+    return stats.norm.ppf(points), np.repeat(np.arange(replicates), 2 ** m)
+
+
+def estimate_success_probability(
+    schedule: CashFlowSchedule,
+    target: float,
+    simulations: int = 4096,
+    method: str = 'antithetic',
+    control_variate: bool = True,
+    random_state: RandomSource = 42,
+    replicates: int = DEFAULT_REPLICATES,
+) -> GoalEstimate:
+    """
+    分散減少法で目標達成確率を推定する
+
+    Args:
+        schedule: キャッシュフロー・スケジュール
+        target: 目標額
+        simulations: パス数（antithetic は偶数に、sobol は replicates × 2 のべき乗に切り下げる）
+        method: 'plain' / 'antithetic' / 'sobol'
+        control_variate: 最終資産額を制御変量に使うか
+        random_state: 乱数のシード、RandomState または Generator
+        replicates: sobol の独立なスクランブルの組数
+
+    Returns:
+        GoalEstimate
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}: {method}")
+    if method == 'sobol' and replicates < 2:
+        raise ValueError(f"replicates must be >= 2: {replicates}")
+    loc, _ = schedule.return_parameters()
+    rng = _random_state(random_state)
+    if isinstance(rng, np.random.RandomState):
+        rng = np.random.Generator(np.random.PCG64(rng.randint(0, 2 ** 31)))
+
+    shocks, units = _shocks(method, simulations, len(loc), rng, replicates)
+    values = evaluate(schedule, shocks).final_values
+    n = len(values)
+    hits = (values >= target).astype(float)
+
+    counts = np.bincount(units)
+    observations = hits
+    if control_variate:
+        centered = values - schedule.expected_final_value()
+        # β は独立な単位の平均から推定する（対称変量の組では最終資産額の組平均がほぼ一定になるため）。
+        # sobol は組数が少ないため全パスから推定する（推定の偏りは O(1/n)）
+        if method == 'sobol':
+            x, y = centered, hits
+        else:
+            x, y = np.bincount(units, weights=centered) / counts, np.bincount(units, weights=hits) / counts
+        variance = np.dot(x - x.mean(), x - x.mean())
+        beta = np.dot(y - y.mean(), x - x.mean()) / variance if variance > 0 else 0.0
+        observations = hits - beta * centered
+
+    # 独立な単位（パス・対称変量の組・スクランブルの組）ごとの平均のばらつきで標準誤差を求める
+    unit_means = np.bincount(units, weights=observations) / counts
+    probability = float(observations.mean())
+    standard_error = float(np.std(unit_means, ddof=1) / np.sqrt(len(unit_means)))
+
+    plain_variance = probability * (1 - probability) / n
+    if standard_error > 0:
+        variance_reduction = plain_variance / standard_error ** 2
+    else:
+        variance_reduction = float('inf') if plain_variance > 0 else 1.0
+    return GoalEstimate(
+        target=target,
+        method=method,
+        control_variate=control_variate,
+        simulations=n,
+        probability=probability * 100,
+        standard_error=standard_error * 100,
+        variance_reduction=variance_reduction,
+    )
@@ -0,0 +1,24 @@
+"""
+市場データ取得サービス
+
+スクリーニングスクリプトから利用する、yfinance等の外部データ取得の共通基盤。
+"""
+
+from .rate_limiter import TokenBucket
+from .refresh import RefreshPlanner, earnings_calendar_from_master, fetch_last_price
+from .cache import MetricsCache
+from .fetcher import ConcurrentFetcher
+from .providers import (
+    DataProvider, ProviderError, RecordingProvider, ReplayProvider, YFinanceProvider,
+    create_provider,
+)
+from .resilience import CircuitBreaker, ResilientProvider, RetryPolicy
+from .price_history import add_momentum_columns, compute_momentum, download_close_prices
+
+__all__ = [
+    'TokenBucket', 'MetricsCache', 'ConcurrentFetcher',
+    'download_close_prices', 'compute_momentum', 'add_momentum_columns',
+    'DataProvider', 'ProviderError', 'YFinanceProvider', 'RecordingProvider', 'ReplayProvider',
+    'create_provider', 'ResilientProvider', 'RetryPolicy', 'CircuitBreaker',
+    'RefreshPlanner', 'earnings_calendar_from_master', 'fetch_last_price',
+]
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+銘柄指標のディスクキャッシュ（TTL付き）
+
+outputs/python/cache/ 配下に、1銘柄 = 1 JSONファイルで取得結果を保存する。
+キーは「ティッカー × フィールドセット」で、各エントリは取得日時（取得日）を持つ。
+同日中の再実行ではネットワークに一切アクセスせずに結果を返す。
+
+- TTL: 既定は「取得日当日のみ有効」。ttl_seconds を指定すると経過秒数で判定
+- stale-while-revalidate: 期限切れでも猶予期間内なら古い値を即座に返し、
+  バックグラウンドで再取得してキャッシュを更新
+- アトミック書き込み: 一時ファイルに書いてから os.replace で置き換える
+- 決算連動の更新: planner（RefreshPlanner）を渡すと TTL の代わりに決算発表日で
+  全指標の再取得を判定し、それ以外は株価のみ取得して換算する（refresh.py）
+
+使用方法:
+    cache = MetricsCache(fields=METRICS_FIELDS)
+    cached_get_stock_metrics = cache.read_through(get_stock_metrics)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from python.config.paths import OUTPUTS_PYTHON_CACHE_DIR
+
+from .rate_limiter import TokenBucket
+from .refresh import FRESH, PRICE, RefreshPlanner, reprice
+
+DEFAULT_NAMESPACE = 'metrics'
+
+# キャッシュしない値（取得失敗時のダミーレコードを判定するため）
+_IDENTITY_FIELDS = ('ticker', 'name', 'market')
+
+
+def _is_cacheable(record: Dict[str, Any]) -> bool:
+    """取得失敗レコード（識別子以外がすべて None/0）はキャッシュしない"""
+    return any(
+        value not in (None, 0)
+        for key, value in record.items()
+        if key not in _IDENTITY_FIELDS
+    )
+
+
+class MetricsCache:
+    """
+    ティッカー × フィールドセット単位のディスクキャッシュ
+
+    スレッドセーフ（ConcurrentFetcher のワーカーから同時に呼ばれてよい）。
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        cache_dir: str = OUTPUTS_PYTHON_CACHE_DIR,
+        namespace: str = DEFAULT_NAMESPACE,
+        ttl_seconds: Optional[float] = None,
+        stale_while_revalidate: bool = False,
+        stale_ttl_seconds: float = 7 * 24 * 3600,
+        cache_if: Callable[[Dict[str, Any]], bool] = _is_cacheable,
+    ):
+        """
+        初期化
+
+        Args:
+            fields: キャッシュするレコードのフィールド名（キーの一部になる）
+            cache_dir: キャッシュのルートディレクトリ
+            namespace: 用途別のサブディレクトリ名
+            ttl_seconds: 有効期間（秒）。None の場合は取得日当日のみ有効
+            stale_while_revalidate: 期限切れエントリを返しつつ裏で再取得するか
+            stale_ttl_seconds: 期限切れエントリを返してよい最大経過秒数
+            cache_if: レコードを保存するか判定する関数
+        """
+        self.fields = tuple(fields)
+        self.ttl_seconds = ttl_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.cache_if = cache_if
+
+        field_hash = hashlib.sha1(','.join(sorted(self.fields)).encode('utf-8')).hexdigest()[:12]
+        self.directory = os.path.join(cache_dir, namespace, field_hash)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.repriced = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._revalidating = set()
+        self._revalidator: Optional[ThreadPoolExecutor] = None
+
+    # ----- 低レベルAPI -----
+
+    def _path(self, ticker: str) -> str:
+        safe = ''.join(c if c.isalnum() or c in '.-_' else '_' for c in ticker)
+        return os.path.join(self.directory, f"{safe}.json")
+
+    def _is_fresh(self, entry: Dict[str, Any], now: float) -> bool:
+        if self.ttl_seconds is None:
+            return entry['fetch_date'] == date.fromtimestamp(now).isoformat()
+        return now - entry['fetched_at'] <= self.ttl_seconds
+
+    def load(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """エントリ（data, fetch_date, fetched_at を含む辞書）を読み込む"""
+        try:
+            with open(self._path(ticker), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if tuple(entry.get('fields', ())) != self.fields:
+            return None
+        return entry
+
+    def put(self, ticker: str, record: Dict[str, Any], fetched_at: Optional[float] = None,
+            priced_at: Optional[float] = None) -> None:
+        """
+        レコードをアトミックに書き込む
+
+        Args:
+            ticker: ティッカーシンボル
+            record: 保存するレコード
+            fetched_at: 全指標の取得日時（既定は現在）
+            priced_at: 株価の取得日時（既定は fetched_at）
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        entry = {
+            'ticker': ticker,
+            'fields': list(self.fields),
+            'fetch_date': date.fromtimestamp(fetched_at).isoformat(),
+            'fetched_at': fetched_at,
+            'priced_at': fetched_at if priced_at is None else priced_at,
+            'data': {key: record.get(key) for key in self.fields},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(ticker))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """有効期間内のレコードを返す（なければ None）"""
+        entry = self.load(ticker)
+        if entry is not None and self._is_fresh(entry, time.time()):
+            return dict(entry['data'])
+        return None
+
+    # ----- read-through -----
+
+    def _count(self, attr: str) -> None:
+        with self._stats_lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def _store(self, ticker: str, record: Dict[str, Any]) -> None:
+        if record is not None and self.cache_if(record):
+            self.put(ticker, record)
+
+    def _schedule_revalidation(self, ticker: str, fetch: Callable[[], Dict[str, Any]]) -> None:
+        with self._stats_lock:
+            if ticker in self._revalidating:
+                return
+            self._revalidating.add(ticker)
+            if self._revalidator is None:
+                self._revalidator = ThreadPoolExecutor(max_workers=2)
+
+        def revalidate():
+            try:
+                self._store(ticker, fetch())
+            finally:
+                with self._stats_lock:
+                    self._revalidating.discard(ticker)
+
+        self._revalidator.submit(revalidate)
+
+    def read_through(
+        self,
+        fetch_func: Callable[..., Dict[str, Any]],
+        limiter: Optional[TokenBucket] = None,
+        planner: Optional[RefreshPlanner] = None,
+        price_func: Optional[Callable[..., Optional[float]]] = None,
+    ) -> Callable[..., Dict[str, Any]]:
+        """
+        キャッシュを経由する取得関数を返す
+
+        Args:
+            fetch_func: fetch_func(ticker, market=market) 形式の取得関数
+            limiter: キャッシュミス時（実際の取得時）のみ消費するレートリミッター
+            planner: 決算連動の更新判定（指定時は TTL の代わりに使う）
+            price_func: price_func(ticker, market=market) 形式の株価取得関数
+                        （planner が株価のみの更新と判定した銘柄に使う）
+
+        Returns:
+            fetch_func と同じシグネチャの関数
+        """
+        def fetch(ticker: str, market: str = 'JP') -> Dict[str, Any]:
+            if limiter is not None:
+                limiter.acquire()
+            return fetch_func(ticker, market=market)
+
+        def full_fetch(ticker: str, market: str) -> Dict[str, Any]:
+            self._count('misses')
+            record = fetch(ticker, market)
+            self._store(ticker, record)
+            return record
+
+        def planned_fetch(ticker: str, market: str = 'JP') -> Dict[str, Any]:
+            entry = self.load(ticker)
+            decision = planner.decide(ticker, entry)
+            if decision == FRESH:
+                self._count('hits')
+                return dict(entry['data'])
+            if decision == PRICE and price_func is not None:
+                if limiter is not None:
+                    limiter.acquire()
+                try:
+                    record = reprice(entry['data'], price_func(ticker, market=market))
+                except Exception:
+                    record = None
+                if record is not None:
+                    self._count('repriced')
+                    self.put(ticker, record, fetched_at=entry['fetched_at'], priced_at=time.time())
+                    return record
+            return full_fetch(ticker, market)
+
+        def cached_fetch(ticker: str, market: str = 'JP') -> Dict[str, Any]:
+            now = time.time()
+            entry = self.load(ticker)
+            if entry is not None:
+                if self._is_fresh(entry, now):
+                    self._count('hits')
+                    return dict(entry['data'])
+                if self.stale_while_revalidate and now - entry['fetched_at'] <= self.stale_ttl_seconds:
+                    self._count('stale_hits')
+                    self._schedule_revalidation(ticker, lambda: fetch(ticker, market))
+                    return dict(entry['data'])
+
+            return full_fetch(ticker, market)
+
+        return planned_fetch if planner is not None else cached_fetch
+
+    def wait(self) -> None:
+        """バックグラウンドの再取得がすべて終わるまで待つ"""
+        if self._revalidator is not None:
+            self._revalidator.shutdown(wait=True)
+            self._revalidator = None
+
+    def summary(self) -> str:
+        """ヒット率の要約文字列"""
+        total = self.hits + self.stale_hits + self.repriced + self.misses
+        rate = (self.hits + self.stale_hits) / total * 100 if total else 0.0
+        repriced = f"株価のみ更新 {self.repriced} / " if self.repriced else ''
+        return (f"キャッシュ: ヒット {self.hits} / 期限切れ再利用 {self.stale_hits} / "
+                f"{repriced}取得 {self.misses} (ヒット率 {rate:.1f}%)")
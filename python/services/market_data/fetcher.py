@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+並列・レート制限付きの銘柄データ取得エンジン
+
+phase1_* スクリプトの「1銘柄ずつ取得 + time.sleep(0.5)」を置き換える。
+有界のスレッドプールで各銘柄のネットワーク待ちを重ね合わせつつ、
+共有トークンバケットで全体のリクエストレートをプロバイダー制限内に保つ。
+
+使用方法:
+    fetcher = ConcurrentFetcher(get_stock_metrics)
+    japan_metrics = fetcher.fetch(japan_tickers, market='JP')
+    us_metrics = fetcher.fetch(us_tickers, market='US')
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .cache import MetricsCache
+from .rate_limiter import TokenBucket
+from .refresh import RefreshPlanner
+from .resilience import deadline_scope
+
+# 従来の time.sleep(0.5) と同じ平均レート（2リクエスト/秒）
+# トークンは1銘柄ごとに1つ消費する。ResilientProvider の再試行も数えるには、
+# 同じバケットを ResilientProvider(limiter=...) に渡す
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_BURST = 4
+# ResilientProvider のタイムアウトで放棄した呼び出しはスレッドで実行を続けるため、
+# 実行中のリクエスト数は一時的にこの上限を超えうる
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRY_ROUNDS = 2
+
+# 制限時間を過ぎてから開始しようとした（取得しなかった）ジョブの結果
+_SKIPPED = object()
+
+
+class ConcurrentFetcher:
+    """
+    有界ワーカープール + 共有トークンバケットによる取得エンジン
+
+    fetch_func は fetch_func(ticker, market=market) の形で呼び出され、
+    1銘柄分の結果（通常は指標の辞書）を返す関数。
+    同じインスタンスで複数回 fetch() を呼ぶと、レート制限は全呼び出しで共有される。
+    cache を指定すると、キャッシュヒット時はレート制限を消費せずに即座に返す。
+    is_failed を指定すると、失敗した銘柄を再試行キューに回し、
+    全銘柄を一巡した後に最大 retry_rounds 回まで再取得する。
+    """
+
+    def __init__(
+        self,
+        fetch_func: Callable[..., Dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+        burst: float = DEFAULT_BURST,
+        limiter: Optional[TokenBucket] = None,
+        cache: Optional[MetricsCache] = None,
+        is_failed: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        retry_rounds: int = DEFAULT_RETRY_ROUNDS,
+        planner: Optional[RefreshPlanner] = None,
+        price_func: Optional[Callable[..., Optional[float]]] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            fetch_func: 1銘柄分のデータを取得する関数
+            max_workers: 同時実行スレッド数の上限
+            requests_per_second: 平均リクエストレート（limiter 未指定時、None なら無制限）
+            burst: 許容バースト数（limiter 未指定時）
+            limiter: 他の取得処理と共有するトークンバケット
+            cache: 読み書きするディスクキャッシュ
+            is_failed: 結果が取得失敗か判定する関数（None なら再試行しない）
+            retry_rounds: 再試行キューを処理する最大周回数
+            planner: キャッシュの決算連動更新判定（cache 指定時のみ有効）
+            price_func: planner が株価のみ更新と判定した銘柄の株価取得関数
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1: {max_workers}")
+
+        self.fetch_func = fetch_func
+        self.max_workers = max_workers
+        if limiter is None and requests_per_second is not None:
+            limiter = TokenBucket(requests_per_second, burst)
+        self.limiter = limiter
+        self.cache = cache
+        self.is_failed = is_failed
+        self.retry_rounds = retry_rounds
+
+        if cache is not None:
+            self._call = cache.read_through(fetch_func, limiter=self.limiter,
+                                            planner=planner, price_func=price_func)
+        else:
+            self._call = self._limited_fetch
+
+    def _limited_fetch(self, ticker: str, market: str = 'JP') -> Dict[str, Any]:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return self.fetch_func(ticker, market=market)
+
+    def _fetch_one(self, ticker: str, market: str, deadline: Optional[float] = None) -> Any:
+        if deadline is None:
+            return self._call(ticker, market=market)
+        # ワーカーの空きを待つ間に制限時間を過ぎたジョブはリクエストを送らない
+        if time.monotonic() >= deadline:
+            return _SKIPPED
+        # ResilientProvider の再試行・待機も制限時間で打ち切る
+        with deadline_scope(deadline):
+            return self._call(ticker, market=market)
+
+    def fetch(
+        self,
+        tickers: Sequence[str],
+        market: Union[str, Sequence[str]] = 'JP',
+        on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        show_progress: bool = True,
+        deadline: Optional[float] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        銘柄リストを並列取得
+
+        取得は tickers の順に開始されるため、優先度の高い銘柄を先頭に並べておけば
+        deadline で打ち切られても上位から順に結果が揃う。
+
+        Args:
+            tickers: ティッカーシンボルのリスト
+            market: 'JP' (日本株) or 'US' (米国株)、または tickers と同じ長さの市場のリスト
+            on_result: 1銘柄の取得完了ごとに (ticker, result) で呼ばれるコールバック
+                       （呼び出しはメインスレッドから、最終結果について1回だけ行われる）
+            show_progress: 進捗を表示するか
+            deadline: 打ち切り時刻（time.monotonic() 基準）。
+                      過ぎた時点で未開始の取得を取り消し、実行中の取得は待たずに返る
+                      （ResilientProvider 経由の取得は、制限時間を過ぎる試行・再試行を行わない）
+
+        Returns:
+            tickers と同じ順序の結果リスト（deadline までに取得できなかった銘柄は None）
+        """
+        tickers = list(tickers)
+        total = len(tickers)
+        markets = [market] * total if isinstance(market, str) else list(market)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        if total == 0:
+            return []
+
+        done = 0
+        pending = list(range(total))
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, total))
+        try:
+            for round_no in range(self.retry_rounds + 1):
+                can_retry = self.is_failed is not None and round_no < self.retry_rounds
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    if show_progress:
+                        print(f"\n  ⏰ 制限時間に達したため打ち切り: {done}/{total}銘柄を取得")
+                    break
+                futures = {
+                    executor.submit(self._fetch_one, tickers[i], markets[i], deadline): i
+                    for i in pending
+                }
+                retry_queue = []
+                try:
+                    for future in as_completed(futures, timeout=timeout):
+                        i = futures[future]
+                        result = future.result()
+                        if result is _SKIPPED:
+                            continue
+                        if can_retry and self.is_failed(result):
+                            retry_queue.append(i)
+                            continue
+                        results[i] = result
+                        done += 1
+                        if on_result is not None:
+                            on_result(tickers[i], result)
+                        if show_progress:
+                            print(f"  [{done}/{total}] {tickers[i]}", end='\r')
+                except FuturesTimeoutError:
+                    if show_progress:
+                        print(f"\n  ⏰ 制限時間に達したため打ち切り: {done}/{total}銘柄を取得")
+                    break
+
+                if not retry_queue:
+                    break
+                pending = sorted(retry_queue)
+                if show_progress:
+                    print(f"\n  🔁 再試行キュー: {len(pending)}銘柄（{round_no + 1}回目）")
+        finally:
+            # deadline で打ち切った場合は実行中の取得を待たない（結果は破棄される）
+            executor.shutdown(wait=deadline is None, cancel_futures=True)
+
+        return results
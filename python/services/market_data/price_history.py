@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+株価履歴の一括取得とモメンタム指標の算出
+
+井村氏手法3.0のモメンタムファクター（calculate_momentum_score）が参照する
+price_change_6m / distance_from_52w_high を、ユニバース全体について算出する。
+
+銘柄ごとに履歴を取得する代わりに、yfinance の複数銘柄一括ダウンロードを
+チャンク単位で呼び出し、終値の横持ちDataFrame（日付 × ティッカー）に対して
+1回のベクトル演算で全銘柄の指標を求める。
+
+使用方法:
+    df = add_momentum_columns(df)  # df['ticker'] に対応する2列を追加
+"""
+
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rate_limiter import TokenBucket
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_PERIOD = '1y'
+
+MOMENTUM_COLUMNS = ['price_change_6m', 'distance_from_52w_high']
+
+
+def _yf_download(tickers: List[str], period: str) -> pd.DataFrame:
+    import yfinance as yf
+
+    return yf.download(
+        tickers,
+        period=period,
+        auto_adjust=True,
+        group_by='column',
+        threads=True,
+        progress=False,
+    )
+
+
+def _extract_close(data: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """yf.download の戻り値から終値の横持ちDataFrameを取り出す"""
+    if data is None or data.empty:
+        return pd.DataFrame(columns=tickers, dtype=float)
+    if isinstance(data.columns, pd.MultiIndex):
+        close = data['Close']
+    else:
+        # 1銘柄のみ・単層カラムの場合
+        close = data[['Close']].rename(columns={'Close': tickers[0]})
+    return close.reindex(columns=tickers)
+
+
+def download_close_prices(
+    tickers: Sequence[str],
+    period: str = DEFAULT_PERIOD,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    download_func: Optional[Callable[[List[str], str], pd.DataFrame]] = None,
+    limiter: Optional[TokenBucket] = None,
+    show_progress: bool = True,
+) -> pd.DataFrame:
+    """
+    複数銘柄の終値をチャンク単位で一括取得
+
+    Args:
+        tickers: ティッカーシンボルのリスト
+        period: 取得期間（yfinance形式、52週高値のため既定は '1y'）
+        chunk_size: 1回のダウンロードに含める銘柄数
+        download_func: download_func(tickers, period) 形式の取得関数（既定は yf.download）
+        limiter: チャンクごとに1トークン消費するレートリミッター
+        show_progress: 進捗を表示するか
+
+    Returns:
+        終値のDataFrame（index: 日付, columns: ティッカー）。取得できない銘柄は全NaN列
+    """
+    download_func = download_func or _yf_download
+    tickers = list(dict.fromkeys(tickers))  # 順序を保った重複除去
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+    frames = []
+    for n, chunk in enumerate(chunks, 1):
+        if show_progress:
+            print(f"  [{n}/{len(chunks)}] 株価履歴を取得中 ({len(chunk)}銘柄)", end='\r')
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            data = download_func(chunk, period)
+        except Exception as e:
+            print(f"\n⚠️ エラー: 株価履歴の取得に失敗 ({chunk[0]} ほか{len(chunk)}銘柄) - {str(e)}")
+            data = None
+        frames.append(_extract_close(data, chunk))
+
+    if show_progress and chunks:
+        print()
+    if not frames:
+        return pd.DataFrame(dtype=float)
+
+    close = pd.concat(frames, axis=1).sort_index()
+    close.index = pd.to_datetime(close.index)
+    return close
+
+
+def compute_momentum(close: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    終値の横持ちDataFrameから全銘柄のモメンタム指標を一括算出
+
+    - price_change_6m: 6ヶ月前（基準日の6ヶ月前以前で直近の終値）からの騰落率（%）
+    - distance_from_52w_high: 直近52週の高値からの下落率（%、高値なら0）
+
+    Args:
+        close: 終値（index: 日付, columns: ティッカー）
+        as_of: 基準日（既定はデータの最終日）
+
+    Returns:
+        index: ティッカー, columns: MOMENTUM_COLUMNS のDataFrame
+    """
+    if close.empty:
+        return pd.DataFrame(columns=MOMENTUM_COLUMNS, index=close.columns, dtype=float)
+
+    close = close.astype(float)
+    as_of = close.index[-1] if as_of is None else pd.Timestamp(as_of)
+    close = close.loc[:as_of]
+    filled = close.ffill()
+
+    latest = filled.iloc[-1]
+
+    base_window = filled.loc[:as_of - pd.DateOffset(months=6)]
+    base = base_window.iloc[-1] if len(base_window) else pd.Series(np.nan, index=close.columns)
+
+    high_52w = close.loc[as_of - pd.DateOffset(weeks=52):].max()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change_6m = (latest / base - 1.0) * 100
+        distance_from_high = (1.0 - latest / high_52w) * 100
+
+    result = pd.DataFrame({
+        'price_change_6m': price_change_6m,
+        'distance_from_52w_high': distance_from_high,
+    })
+    return result.replace([np.inf, -np.inf], np.nan)
+
+
+def add_momentum_columns(
+    df: pd.DataFrame,
+    close: Optional[pd.DataFrame] = None,
+    ticker_column: str = 'ticker',
+    **download_kwargs,
+) -> pd.DataFrame:
+    """
+    スクリーニング結果にモメンタム列を追加（既存の同名列は上書き）
+
+    Args:
+        df: ティッカー列を持つスクリーニング結果
+        close: 取得済みの終値（未指定時は download_close_prices で一括取得）
+        ticker_column: ティッカー列名
+        **download_kwargs: download_close_prices に渡す引数
+
+    Returns:
+        MOMENTUM_COLUMNS を追加したDataFrameのコピー
+    """
+    tickers = df[ticker_column].astype(str)
+    if close is None:
+        close = download_close_prices(tickers.tolist(), **download_kwargs)
+
+    momentum = compute_momentum(close).reindex(tickers.values)
+
+    result = df.copy()
+    for column in MOMENTUM_COLUMNS:
+        result[column] = momentum[column].to_numpy()
+    return result
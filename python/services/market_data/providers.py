@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+銘柄情報（info）のデータプロバイダー
+
+スクリーニングが yf.Ticker を直接呼ばずに済むよう、取得元を差し替え可能にする。
+
+- live:   yfinance から取得
+- record: live と同じく取得しつつ、生の info を gzip 圧縮JSONでアーカイブ
+- replay: アーカイブから読み出して返す（ネットワーク不要）。
+          人工的な遅延を設定でき、オフライン環境でのベンチマークに使える
+
+使用方法:
+    provider = create_provider('replay', archive_dir=..., latency_seconds=0.2)
+    info = provider.get_info('7203.T')
+"""
+
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from python.config.paths import OUTPUTS_PYTHON_CACHE_DIR
+
+from .rate_limiter import TokenBucket
+
+DEFAULT_ARCHIVE_DIR = os.path.join(OUTPUTS_PYTHON_CACHE_DIR, 'info_archive')
+
+PROVIDER_MODES = ('live', 'record', 'replay')
+
+
+# get_quote が返すフィールド（株価・時価総額・平均出来高のみ）
+QUOTE_FIELDS = ('price', 'market_cap', 'avg_volume', 'currency')
+
+
+def quote_from_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """info 辞書から気配情報を抜き出す"""
+    return {
+        'price': info.get('currentPrice', info.get('regularMarketPrice')),
+        'market_cap': info.get('marketCap'),
+        'avg_volume': info.get('averageVolume'),
+        'currency': info.get('currency'),
+    }
+
+
+class ProviderError(Exception):
+    """プロバイダーがデータを返せない場合の例外"""
+
+
+def _archive_path(archive_dir: str, ticker: str) -> str:
+    safe = ''.join(c if c.isalnum() or c in '.-_' else '_' for c in ticker)
+    return os.path.join(archive_dir, f"{safe}.json.gz")
+
+
+class DataProvider:
+    """プロバイダーの基底クラス"""
+
+    name = 'base'
+
+    def get_info(self, ticker: str) -> Dict[str, Any]:
+        """銘柄の info 辞書を返す（取得できない場合は例外）"""
+        raise NotImplementedError
+
+    def get_quote(self, ticker: str) -> Dict[str, Any]:
+        """
+        軽量な気配情報（QUOTE_FIELDS）を返す
+
+        既定では info から抜き出す。info より軽い取得手段がある場合はオーバーライドする。
+        """
+        return quote_from_info(self.get_info(ticker))
+
+
+class YFinanceProvider(DataProvider):
+    """yfinance から取得するプロバイダー"""
+
+    name = 'live'
+
+    def get_info(self, ticker: str) -> Dict[str, Any]:
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info
+
+    def get_quote(self, ticker: str) -> Dict[str, Any]:
+        # fast_info は quoteSummary（info）を呼ばず、チャートAPIの軽量なレスポンスで済む
+        import yfinance as yf
+
+        fast_info = yf.Ticker(ticker).fast_info
+        return {
+            'price': fast_info['lastPrice'],
+            'market_cap': fast_info['marketCap'],
+            'avg_volume': fast_info['threeMonthAverageVolume'],
+            'currency': fast_info['currency'],
+        }
+
+
+class RecordingProvider(DataProvider):
+    """取得した生の info をアーカイブに保存するプロバイダー"""
+
+    name = 'record'
+
+    def __init__(self, inner: Optional[DataProvider] = None, archive_dir: str = DEFAULT_ARCHIVE_DIR):
+        """
+        初期化
+
+        Args:
+            inner: 実際に取得するプロバイダー（既定は YFinanceProvider）
+            archive_dir: アーカイブの保存先
+        """
+        self.inner = inner or YFinanceProvider()
+        self.archive_dir = archive_dir
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def get_quote(self, ticker: str) -> Dict[str, Any]:
+        # 気配情報はアーカイブしない（replay では info から復元する）
+        return self.inner.get_quote(ticker)
+
+    def get_info(self, ticker: str) -> Dict[str, Any]:
+        info = self.inner.get_info(ticker)
+        payload = {'ticker': ticker, 'recorded_at': time.time(), 'info': info}
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.archive_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8'))
+            os.replace(tmp_path, _archive_path(self.archive_dir, ticker))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return info
+
+
+class ReplayProvider(DataProvider):
+    """アーカイブから info を返すプロバイダー（ネットワーク不要）"""
+
+    name = 'replay'
+
+    def __init__(
+        self,
+        archive_dir: str = DEFAULT_ARCHIVE_DIR,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            archive_dir: RecordingProvider が保存したアーカイブ
+            latency_seconds: 1リクエストあたりの人工遅延（秒）
+            jitter_seconds: 遅延に加える一様乱数の幅（秒）
+            seed: ジッターの乱数シード（再現性のため）
+        """
+        if not os.path.isdir(archive_dir):
+            raise ProviderError(f"アーカイブが見つかりません: {archive_dir}")
+        self.archive_dir = archive_dir
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self._random = random.Random(seed)
+
+    def tickers(self) -> List[str]:
+        """アーカイブに含まれるティッカーの一覧"""
+        tickers = []
+        for filename in sorted(os.listdir(self.archive_dir)):
+            if filename.endswith('.json.gz'):
+                with gzip.open(os.path.join(self.archive_dir, filename), 'rt', encoding='utf-8') as f:
+                    tickers.append(json.load(f)['ticker'])
+        return tickers
+
+    def get_info(self, ticker: str) -> Dict[str, Any]:
+        delay = self.latency_seconds
+        if self.jitter_seconds:
+            delay += self._random.uniform(0, self.jitter_seconds)
+        if delay > 0:
+            time.sleep(delay)
+
+        path = _archive_path(self.archive_dir, ticker)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)['info']
+        except FileNotFoundError:
+            raise ProviderError(f"アーカイブに記録がありません: {ticker}") from None
+
+
+def create_provider(
+    mode: str = 'live',
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    latency_seconds: float = 0.0,
+    jitter_seconds: float = 0.0,
+    timeout_seconds: Optional[float] = None,
+    limiter: Optional[TokenBucket] = None,
+) -> DataProvider:
+    """
+    モード名からプロバイダーを生成
+
+    live / record は yfinance をタイムアウト・再試行・サーキットブレーカーで包む。
+
+    Args:
+        mode: 'live', 'record', 'replay' のいずれか
+        archive_dir: record / replay で使うアーカイブ
+        latency_seconds: replay の人工遅延（秒）
+        jitter_seconds: replay の遅延ジッター（秒）
+        timeout_seconds: live / record の1銘柄あたりのタイムアウト（秒、既定値は resilience 側）
+        limiter: live / record の再試行で消費するレートリミッター（ConcurrentFetcher と共有する）
+    """
+    # resilience が DataProvider を参照するため、循環 import を避けてここで読み込む
+    from .resilience import DEFAULT_TIMEOUT_SECONDS, ResilientProvider
+
+    if mode in ('live', 'record'):
+        live = ResilientProvider(
+            YFinanceProvider(),
+            timeout_seconds=DEFAULT_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds,
+            limiter=limiter,
+        )
+        if mode == 'live':
+            return live
+        return RecordingProvider(live, archive_dir=archive_dir)
+    if mode == 'replay':
+        return ReplayProvider(archive_dir, latency_seconds=latency_seconds,
+                              jitter_seconds=jitter_seconds)
+    raise ValueError(f"mode must be one of {PROVIDER_MODES}: {mode}")
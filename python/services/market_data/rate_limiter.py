@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+トークンバケット方式のレートリミッター
+
+複数スレッドから共有し、外部APIへのリクエスト数を
+プロバイダーの制限内（平均レート + バースト）に抑える。
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    スレッドセーフなトークンバケット
+
+    rate 個/秒でトークンが補充され、最大 capacity 個まで貯まる。
+    acquire() はトークンが得られるまで呼び出し元スレッドをブロックする。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初期化
+
+        Args:
+            rate: 1秒あたりの補充トークン数（平均リクエストレート）
+            capacity: バケット容量（許容バースト数、デフォルト: max(1, rate)）
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """トークンが即座に得られれば消費して True を返す（ブロックしない）"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        トークンを消費する（不足時は補充されるまで待機）
+
+        Returns:
+            待機した秒数
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"tokens ({tokens}) exceeds bucket capacity ({self.capacity})")
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+決算カレンダーに基づくキャッシュ更新計画
+
+ROE・ROA・負債比率・成長率などのファンダメンタル指標は決算発表でしか変わらない。
+そこでキャッシュ済みの銘柄ごとに次の3通りを判定する。
+
+- full:  前回取得の後に決算発表日を過ぎた（またはキャッシュなし）→ 全指標を再取得
+- price: ファンダメンタルは有効だが株価が古い → 株価だけ取得し、
+         時価総額・PER・PBR・配当利回りを株価の変化率で換算し直す
+- fresh: 株価も当日取得済み → キャッシュをそのまま使う
+
+1,000銘柄超のユニバースでも、日次の再実行で全指標を取り直すのは
+決算発表があった数銘柄だけになる。
+
+決算発表日は、取得レコードの earnings_date（yfinance の earningsTimestamp）と、
+明示的に渡すカレンダー（stock_analysis.stocks_data の latest_earnings_date 等）から得る。
+
+使用方法:
+    planner = RefreshPlanner(earnings_calendar=earnings_calendar_from_master(stocks_data))
+    cache = MetricsCache(CACHE_FIELDS)
+    cached = cache.read_through(get_stock_metrics, planner=planner, price_func=fetch_last_price)
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+FULL = 'full'
+PRICE = 'price'
+FRESH = 'fresh'
+
+# 株価に比例する指標（株価が r 倍になると r 倍）
+PRICE_PROPORTIONAL_FIELDS = ('market_cap', 'pe_ratio', 'pb_ratio')
+# 株価に反比例する指標
+PRICE_INVERSE_FIELDS = ('dividend_yield',)
+
+# 決算日が不明な銘柄のファンダメンタル有効期間（四半期）
+DEFAULT_FUNDAMENTALS_MAX_AGE_DAYS = 92
+
+DateLike = Union[str, date, datetime]
+
+
+def _to_date(value: Optional[DateLike]) -> Optional[date]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def earnings_calendar_from_master(stocks_data: Mapping[str, Mapping[str, Any]]) -> Dict[str, date]:
+    """
+    銘柄マスター（stock_analysis.stocks_data 形式）から決算カレンダーを作成
+
+    Returns:
+        {銘柄コード: 直近の決算発表日}
+    """
+    return {
+        code: _to_date(stock['latest_earnings_date'])
+        for code, stock in stocks_data.items()
+        if stock.get('latest_earnings_date')
+    }
+
+
+def reprice(record: Dict[str, Any], price: float) -> Optional[Dict[str, Any]]:
+    """
+    ファンダメンタルを据え置いたまま、株価依存の指標を新しい株価で換算
+
+    Returns:
+        換算後のレコード（元の株価が不明で換算できない場合は None）
+    """
+    old_price = record.get('price')
+    if not old_price or not price:
+        return None
+
+    ratio = price / old_price
+    updated = dict(record)
+    for key in PRICE_PROPORTIONAL_FIELDS:
+        if updated.get(key):
+            updated[key] = updated[key] * ratio
+    for key in PRICE_INVERSE_FIELDS:
+        if updated.get(key):
+            updated[key] = updated[key] / ratio
+    updated['price'] = price
+    return updated
+
+
+def fetch_last_price(ticker: str, market: str = 'JP') -> Optional[float]:
+    """yfinance の fast_info から直近株価のみを取得（info 全体より軽量）"""
+    import yfinance as yf
+
+    return yf.Ticker(ticker).fast_info['lastPrice']
+
+
+@dataclass
+class RefreshPlan:
+    """plan() の結果"""
+
+    full: List[str] = field(default_factory=list)
+    price: List[str] = field(default_factory=list)
+    fresh: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"更新計画: 全指標 {len(self.full)} / 株価のみ {len(self.price)} / "
+                f"キャッシュ {len(self.fresh)}")
+
+
+class RefreshPlanner:
+    """銘柄ごとに full / price / fresh を判定する"""
+
+    def __init__(
+        self,
+        earnings_calendar: Optional[Mapping[str, DateLike]] = None,
+        price_ttl_seconds: Optional[float] = None,
+        fundamentals_max_age_days: int = DEFAULT_FUNDAMENTALS_MAX_AGE_DAYS,
+        today: Optional[DateLike] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            earnings_calendar: {ティッカーまたは銘柄コード: 直近の決算発表日}
+            price_ttl_seconds: 株価の有効期間（秒）。None の場合は取得日当日のみ有効
+            fundamentals_max_age_days: 決算日が不明な銘柄のファンダメンタル有効期間（日）
+            today: 基準日（既定は実行日、テスト用）
+        """
+        self.earnings_calendar = {
+            code: _to_date(value) for code, value in (earnings_calendar or {}).items()
+        }
+        self.price_ttl_seconds = price_ttl_seconds
+        self.fundamentals_max_age_days = fundamentals_max_age_days
+        self._today = _to_date(today)
+
+    @property
+    def today(self) -> date:
+        return self._today or date.today()
+
+    def latest_earnings(self, ticker: str, data: Mapping[str, Any]) -> Optional[date]:
+        """基準日以前で直近の決算発表日（不明なら None）"""
+        code = ticker[:-2] if ticker.endswith('.T') else ticker
+        candidates = [
+            self.earnings_calendar.get(ticker),
+            self.earnings_calendar.get(code),
+            _to_date(data.get('earnings_date')),
+        ]
+        past = [d for d in candidates if d is not None and d <= self.today]
+        return max(past) if past else None
+
+    def decide(self, ticker: str, entry: Optional[Dict[str, Any]], now: Optional[float] = None) -> str:
+        """
+        キャッシュエントリ（MetricsCache.load の戻り値）に対する更新方法を判定
+
+        Returns:
+            FULL / PRICE / FRESH
+        """
+        if entry is None:
+            return FULL
+        now = time.time() if now is None else now
+
+        fetched = date.fromisoformat(entry['fetch_date'])
+        earnings = self.latest_earnings(ticker, entry['data'])
+        if earnings is not None:
+            # 決算発表日当日の取得は発表前の可能性があるため、翌日以降の取得のみ有効とする
+            if fetched <= earnings:
+                return FULL
+        elif self.today - fetched > timedelta(days=self.fundamentals_max_age_days):
+            return FULL
+
+        priced_at = entry.get('priced_at', entry['fetched_at'])
+        if self.price_ttl_seconds is None:
+            price_fresh = date.fromtimestamp(priced_at) == self.today
+        else:
+            price_fresh = now - priced_at <= self.price_ttl_seconds
+        return FRESH if price_fresh else PRICE
+
+    def plan(self, tickers: List[str], cache) -> RefreshPlan:
+        """
+        ユニバース全体の更新計画を作成（I/Oはキャッシュの読み込みのみ）
+
+        Args:
+            tickers: ティッカーのリスト
+            cache: MetricsCache
+        """
+        result = RefreshPlan()
+        now = time.time()
+        for ticker in tickers:
+            getattr(result, self.decide(ticker, cache.load(ticker), now)).append(ticker)
+        return result
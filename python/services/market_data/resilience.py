@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+取得処理の耐障害性（タイムアウト・バックオフ・サーキットブレーカー）
+
+yfinance への1リクエストが応答しないまま実行全体を止めたり、
+スロットリング中に大量の銘柄が取得失敗（market_cap=0）のまま採点されたりしないよう、
+プロバイダーを次の3段で包む。
+
+- タイムアウト: 1銘柄ごとの上限秒数。超えた呼び出しは放棄して失敗扱い
+- バックオフ: 429 / 5xx / タイムアウト等の一時的な失敗は、
+  指数バックオフ + ジッターで待ってから再試行（limiter を共有すると再試行もレート制限に含める）
+- サーキットブレーカー: 直近の失敗率が閾値を超えたら、全ワーカーの取得を
+  一定時間停止してプロバイダー側の制限解除を待つ
+
+ConcurrentFetcher.fetch(deadline=...) の実行中は deadline_scope で制限時間が設定され、
+制限時間を過ぎる試行・待機・再試行は行わずに失敗とする。
+
+使用方法:
+    provider = ResilientProvider(YFinanceProvider(), timeout_seconds=15)
+    info = provider.get_info('7203.T')
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .providers import DataProvider, ProviderError
+from .rate_limiter import TokenBucket
+
+DEFAULT_TIMEOUT_SECONDS = 15.0
+
+# 一時的な失敗とみなすHTTPステータス
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# requests / yfinance 等の一時的な失敗の例外クラス名（依存ライブラリを import せずに判定）
+_RETRYABLE_EXCEPTION_NAMES = frozenset({
+    'Timeout', 'ReadTimeout', 'ConnectTimeout', 'ConnectionError', 'ChunkedEncodingError',
+    'YFRateLimitError',
+})
+
+
+class FetchTimeoutError(ProviderError):
+    """1銘柄の取得がタイムアウトした"""
+
+
+class TransientProviderError(ProviderError):
+    """再試行すれば成功しうる失敗（スロットリング時の空レスポンス等）"""
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for obj in (exc, getattr(exc, 'response', None)):
+        code = getattr(obj, 'status_code', None) or getattr(obj, 'status', None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """一時的な失敗（再試行する価値がある例外）か"""
+    if isinstance(exc, (FetchTimeoutError, TransientProviderError, TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in _RETRYABLE_EXCEPTION_NAMES:
+        return True
+    code = _status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    message = str(exc)
+    return '429' in message or 'Too Many Requests' in message
+
+
+_scope = threading.local()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """このスレッドでの取得の打ち切り時刻（time.monotonic() 基準、None なら無制限）を設定"""
+    previous = getattr(_scope, 'deadline', None)
+    _scope.deadline = deadline
+    try:
+        yield
+    finally:
+        _scope.deadline = previous
+
+
+def current_deadline() -> Optional[float]:
+    """deadline_scope で設定された打ち切り時刻"""
+    return getattr(_scope, 'deadline', None)
+
+
+def call_with_timeout(func: Callable[[], Any], timeout_seconds: Optional[float]) -> Any:
+    """
+    func() をタイムアウト付きで実行
+
+    Python のスレッドは外部から停止できないため、タイムアウトした呼び出しは
+    デーモンスレッドのまま放棄する（プロセス終了を妨げない）。
+    """
+    if timeout_seconds is None:
+        return func()
+
+    outcome: Dict[str, Any] = {}
+
+    def target():
+        try:
+            outcome['value'] = func()
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout_seconds)
+    if thread.is_alive():
+        raise FetchTimeoutError(f"{timeout_seconds:.0f}秒以内に応答がありません")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+class RetryPolicy:
+    """指数バックオフ + フルジッターの再試行ポリシー"""
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            max_attempts: 1銘柄あたりの最大試行回数（初回を含む）
+            base_delay: 1回目の再試行前の待機時間の上限（秒）
+            max_delay: 待機時間の上限（秒）
+            seed: ジッターの乱数シード
+        """
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be >= 1: {max_attempts}")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random(seed)
+
+    def delay(self, attempt: int) -> float:
+        """attempt 回目（1始まり）の失敗後の待機時間"""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._random.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """
+    失敗率ベースのサーキットブレーカー（スレッド間で共有）
+
+    直近 window 件の結果のうち失敗が error_rate 以上になると開き、
+    cooldown_seconds の間は before_call() を呼んだ全スレッドを待機させる。
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        error_rate: float = 0.5,
+        min_calls: int = 10,
+        cooldown_seconds: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        初期化
+
+        Args:
+            window: 失敗率を計算する直近の結果数
+            error_rate: ブレーカーを開く失敗率
+            min_calls: 判定に必要な最小結果数
+            cooldown_seconds: 開いてから取得を再開するまでの秒数
+            sleep: 待機関数（テスト用）
+        """
+        self.window = window
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self._sleep = sleep
+        self._results = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def before_call(self, deadline: Optional[float] = None) -> None:
+        """ブレーカーが開いている間は待機する（deadline までに閉じなければ FetchTimeoutError）"""
+        while True:
+            with self._lock:
+                remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            if deadline is not None and time.monotonic() + remaining > deadline:
+                raise FetchTimeoutError("取得の停止中に制限時間に達します")
+            self._sleep(remaining)
+
+    def record(self, success: bool) -> None:
+        """1件の結果を記録し、必要ならブレーカーを開く"""
+        with self._lock:
+            self._results.append(success)
+            if len(self._results) < self.min_calls:
+                return
+            failures = self._results.count(False)
+            if failures / len(self._results) < self.error_rate:
+                return
+            self._open_until = time.monotonic() + self.cooldown_seconds
+            self._results.clear()
+            self.trips += 1
+        print(f"\n⏸️ エラー率が {self.error_rate:.0%} を超えたため、"
+              f"{self.cooldown_seconds:.0f}秒間取得を停止します")
+
+
+def _has_content(info: Dict[str, Any]) -> bool:
+    # スロットリング中の yfinance は例外ではなく、ほぼ空の info を返すことがある
+    return bool(info) and len(info) > 1
+
+
+class ResilientProvider(DataProvider):
+    """タイムアウト・再試行・サーキットブレーカーで包んだプロバイダー"""
+
+    def __init__(
+        self,
+        inner: DataProvider,
+        timeout_seconds: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        validate: Callable[[Dict[str, Any]], bool] = _has_content,
+        sleep: Callable[[float], None] = time.sleep,
+        limiter: Optional[TokenBucket] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            inner: 実際に取得するプロバイダー
+            timeout_seconds: 1回の取得のタイムアウト（秒、None なら無制限。
+                             タイムアウトした呼び出しは放棄したスレッドで実行を続ける）
+            retry: 再試行ポリシー
+            breaker: 共有するサーキットブレーカー
+            validate: 取得結果が有効か判定する関数（無効なら一時的な失敗として再試行）
+            sleep: 待機関数（テスト用）
+            limiter: 再試行のたびに1トークン消費するレートリミッター。
+                     初回の試行は ConcurrentFetcher が1銘柄ごとに消費するため、
+                     同じバケットを共有すると実際のリクエスト数だけ消費される
+        """
+        self.inner = inner
+        self.name = inner.name
+        self.timeout_seconds = timeout_seconds
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(sleep=sleep)
+        self.validate = validate
+        self._sleep = sleep
+        self.limiter = limiter
+
+    def get_info(self, ticker: str) -> Dict[str, Any]:
+        return self._call(self.inner.get_info, ticker, self.validate)
+
+    def get_quote(self, ticker: str) -> Dict[str, Any]:
+        return self._call(self.inner.get_quote, ticker, lambda quote: quote.get('price') is not None)
+
+    def _timeout(self, deadline: Optional[float]) -> Optional[float]:
+        # 1回の試行のタイムアウト（制限時間の残りを超えない）
+        if deadline is None:
+            return self.timeout_seconds
+        remaining = deadline - time.monotonic()
+        return remaining if self.timeout_seconds is None else min(self.timeout_seconds, remaining)
+
+    def _call(self, func, ticker, validate):
+        deadline = current_deadline()
+        attempt = 1
+        while True:
+            self.breaker.before_call(deadline)
+            timeout = self._timeout(deadline)
+            if timeout is not None and timeout <= 0:
+                raise FetchTimeoutError(f"制限時間を過ぎたため取得しません: {ticker}")
+            try:
+                result = call_with_timeout(lambda: func(ticker), timeout)
+                if not validate(result):
+                    raise TransientProviderError(f"空のレスポンス: {ticker}")
+            except Exception as e:
+                retryable = is_retryable(e)
+                # 一時的な失敗のみをエラー率に数える（上場廃止等の恒久的な失敗では止めない）
+                if retryable:
+                    self.breaker.record(False)
+                if not retryable or attempt >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.delay(attempt)
+                # 待機後に制限時間が残らない場合は再試行しない
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+            else:
+                self.breaker.record(True)
+                return result
+
+            self._sleep(delay)
+            attempt += 1
+            if self.limiter is not None:
+                self.limiter.acquire()
@@ -0,0 +1,118 @@
+"""
+テスト: python/models/screening/diversification.py
+
+セクター上限・市場別配分の選定が逐次処理（スコア順に1銘柄ずつ採用）と一致すること、
+選定数の上限、最低セクター数のバックフィル、ウェイト上限をテストします。
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.screening.diversification import cap_weights, select_diversified
+
+
+def _pool(n=1500, sectors=12, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'ticker': [f'T{i}' for i in range(n)],
+        'total_score': rng.permutation(n).astype(float),
+        'sector': rng.choice([f'S{k}' for k in range(sectors)], n),
+        'market': rng.choice(['JP', 'US'], n, p=[0.7, 0.3]),
+    })
+
+
+def _reference_greedy(df, max_stocks, sector_cap, quota=None):
+    """逐次処理による選定（回帰確認用）"""
+    selected, sector_counts, market_counts = [], {}, {}
+    for idx, row in df.sort_values('total_score', ascending=False).iterrows():
+        if len(selected) >= max_stocks:
+            break
+        if sector_counts.get(row['sector'], 0) >= sector_cap:
+            continue
+        if quota is not None and market_counts.get(row['market'], 0) >= quota.get(row['market'], 0):
+            continue
+        selected.append(idx)
+        sector_counts[row['sector']] = sector_counts.get(row['sector'], 0) + 1
+        market_counts[row['market']] = market_counts.get(row['market'], 0) + 1
+    return selected
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_sector_cap_matches_greedy(seed):
+    df = _pool(seed=seed)
+    result = select_diversified(df, max_stocks=50)
+
+    assert result.index.tolist() == _reference_greedy(df, 50, sector_cap=5)
+    assert result['sector'].value_counts().max() <= 5
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_market_split_matches_greedy(seed):
+    df = _pool(seed=seed)
+    result = select_diversified(df, max_stocks=60, market_split={'JP': 0.4, 'US': 0.6})
+
+    assert result.index.tolist() == _reference_greedy(df, 60, sector_cap=6, quota={'JP': 24, 'US': 36})
+    assert result['market'].value_counts().to_dict() == {'JP': 24, 'US': 36}
+
+
+def test_selection_is_bounded_with_few_sectors():
+    # 6セクター未満でも max_stocks を超えない（従来は上限を超えて追加し続けた）
+    df = _pool(n=500, sectors=3)
+    result = select_diversified(df, max_stocks=50, sector_cap_ratio=0.5)
+
+    assert len(result) == 50
+    assert result['sector'].nunique() == 3
+
+
+def test_backfill_guarantees_min_sectors():
+    df = _pool(n=400, sectors=8)
+    # 上位は2セクターに集中させる
+    df.loc[df['sector'].isin(['S0', 'S1']), 'total_score'] += 10_000
+    result = select_diversified(df, max_stocks=10, sector_cap_ratio=0.5, min_sectors=6)
+
+    assert len(result) == 10
+    assert result['sector'].nunique() == 6
+    # 入れ替えで加わったのは各セクターの最上位銘柄
+    top = df.sort_values('total_score', ascending=False).groupby('sector').head(1)
+    added = result[~result['sector'].isin(['S0', 'S1'])]
+    assert set(added.index) <= set(top.index)
+
+
+def _rows(rows):
+    return pd.DataFrame(rows, columns=['ticker', 'sector', 'market']).assign(
+        total_score=lambda d: np.arange(len(d), 0, -1, dtype=float)).set_index('ticker')
+
+
+def test_backfill_only_adds_new_sectors():
+    # X1 は US の枠が埋まって除外されたが、セクター X は JP の X2・X3 で採用済み。
+    # X1 と A2 を入れ替えてもセクター数は増えず、X がセクター上限を超える
+    df = _rows([('A1', 'A', 'US'), ('A2', 'A', 'US'), ('X1', 'X', 'US'),
+                ('X2', 'X', 'JP'), ('X3', 'X', 'JP'), ('B1', 'B', 'JP')])
+    result = select_diversified(df, max_stocks=6, sector_cap_ratio=0.34, min_sectors=6,
+                                market_split={'US': 0.34, 'JP': 0.66})
+
+    assert result.index.tolist() == ['A1', 'A2', 'X2', 'X3', 'B1']
+    assert result['sector'].value_counts().max() <= 2
+
+
+def test_backfill_uses_best_row_allowed_by_market_quota():
+    # セクター C の最上位 C1 は枠のない市場（EU）のため、JP の C2 と入れ替える
+    df = _rows([('A1', 'A', 'US'), ('B1', 'B', 'US'), ('A2', 'A', 'JP'), ('B2', 'B', 'JP'),
+                ('C1', 'C', 'EU'), ('C2', 'C', 'JP')])
+    result = select_diversified(df, max_stocks=4, sector_cap_ratio=0.5, min_sectors=3,
+                                market_split={'US': 0.5, 'JP': 0.5})
+
+    assert result.index.tolist() == ['A1', 'B1', 'A2', 'C2']
+
+
+def test_weight_cap():
+    weights = cap_weights(np.array([10.0, 1.0, 1.0, 1.0]), max_weight=0.4)
+    assert weights.tolist() == pytest.approx([0.4, 0.2, 0.2, 0.2])
+
+    # 銘柄数 × 上限 < 1 の場合は残りを現金とする
+    assert cap_weights(np.ones(10), max_weight=0.05).sum() == pytest.approx(0.5)
+
+    result = select_diversified(_pool(), max_stocks=50, weighting='score', max_weight=0.03)
+    assert result['weight'].max() <= 0.03 + 1e-12
+    assert result['weight'].sum() == pytest.approx(1.0)
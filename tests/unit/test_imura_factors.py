@@ -0,0 +1,116 @@
+"""
+テスト: python/models/screening/imura_factors.py
+
+ルール表による Tier 2 スコア（一括・行ごと）が、ルール表化する前の
+if/elif による採点と一致することをテストします。
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.screening.imura_factors import TIER2_FACTORS, score_tier2
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', 'python', 'models', 'screening',
+                      'imura_method_3.0_screening.py')
+
+
+@pytest.fixture(scope='module')
+def imura():
+    # ファイル名に '.' を含むため importlib で読み込む
+    spec = importlib.util.spec_from_file_location('imura_method_3_0_screening', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _nan_or(row, key, default=np.nan):
+    value = row.get(key, default)
+    return np.nan if value is None else value
+
+
+def _reference_tier2(row):
+    """ルール表化する前の行ごとの採点（回帰確認用）"""
+    per, pbr = row['pe_ratio'], _nan_or(row, 'price_book_ratio')
+    div = row['dividend_yield'] / 100
+    value = (20 if per < 10 else 15 if per < 15 else 10 if per < 20 else 5 if per < 30 else 0)
+    value += 10 if pbr < 1.0 else 5 if pbr < 1.5 else 0
+    value += 10 if 4.0 <= div <= 6.0 else 5 if 3.0 <= div < 4.0 else 0
+
+    roe, de = row['roe'], _nan_or(row, 'debt_equity_ratio')
+    margin, fcf = _nan_or(row, 'operating_margin'), _nan_or(row, 'fcf_to_sales')
+    quality = 15 if roe >= 30 else 10 if roe >= 15 else 5 if roe >= 10 else 0
+    quality += 10 if de < 50 else 5 if de < 100 else 0
+    quality += 10 if margin >= 15 else 5 if margin >= 10 else 0
+    quality += 5 if fcf >= 10 else 0
+
+    change, distance = _nan_or(row, 'price_change_6m'), _nan_or(row, 'distance_from_52w_high')
+    momentum = 10 if change > 20 else 7 if change > 10 else 5 if change > 0 else 0
+    momentum += 10 if distance < 10 else 5 if distance < 20 else 0
+
+    years, rating = _nan_or(row, 'consecutive_dividend_years', 0), _nan_or(row, 'analyst_rating')
+    other = (5 if years >= 5 else 0) + (5 if rating >= 3.5 else 0)
+    return {'value_score': value, 'quality_score': quality,
+            'momentum_score': momentum, 'other_score': other}
+
+
+def _sample_with_gaps(imura):
+    df = imura.create_sample_data()
+    rng = np.random.default_rng(1)
+    # 閾値ちょうどの値と欠損を混ぜる
+    df.loc[::7, 'pe_ratio'] = rng.choice([10, 15, 20, 30], len(df.loc[::7]))
+    df.loc[::11, 'dividend_yield'] = rng.choice([300, 400, 600], len(df.loc[::11]))
+    for column in ['price_book_ratio', 'operating_margin', 'price_change_6m',
+                   'analyst_rating', 'roe', 'consecutive_dividend_years']:
+        df.loc[rng.choice(len(df), 50, replace=False), column] = np.nan
+    return df
+
+
+def test_score_tier2_matches_reference(imura):
+    df = _sample_with_gaps(imura)
+    scores = score_tier2(df)
+    expected = pd.DataFrame([_reference_tier2(row) for _, row in df.iterrows()], index=df.index)
+
+    for factor in TIER2_FACTORS:
+        assert scores[factor].tolist() == expected[factor].tolist(), factor
+        assert (scores[TIER2_FACTORS[factor]].sum(axis=1) == scores[factor]).all()
+    assert (scores['total_score'] == expected.sum(axis=1)).all()
+
+
+def test_row_functions_match_reference(imura):
+    df = _sample_with_gaps(imura).head(100)
+    for _, row in df.iterrows():
+        expected = _reference_tier2(row)
+        assert imura.calculate_value_score(row) == expected['value_score']
+        assert imura.calculate_quality_score(row) == expected['quality_score']
+        assert imura.calculate_momentum_score(row) == expected['momentum_score']
+        assert imura.calculate_other_score(row) == expected['other_score']
+
+
+def test_score_tier2_treats_missing_optional_columns_as_nan():
+    df = pd.DataFrame({'pe_ratio': [8.0], 'dividend_yield': [450.0], 'roe': [31.0]})
+    scores = score_tier2(df)
+
+    assert scores.loc[0, 'value_score'] == 30
+    assert scores.loc[0, 'quality_score'] == 15
+    assert scores.loc[0, 'total_score'] == 45
+    assert scores.loc[0, 'total_score'] == sum(_reference_tier2(df.iloc[0]).values())
+
+
+def test_tier1_filters_match_combined_mask(imura, capsys):
+    df = _sample_with_gaps(imura)
+    df.loc[::13, 'debt_equity_ratio'] = 200  # 境界（除外）
+    df.loc[::17, 'free_cash_flow'] = 0
+    expected = ((df['pe_ratio'] >= 5) & (df['pe_ratio'] <= 30)
+                & (df['dividend_yield'] >= 250) & (df['dividend_yield'] <= 600)
+                & (df['roe'] >= 8.0) & (df['debt_equity_ratio'] < 200)
+                & (df['free_cash_flow'] > 0) & (df['market_cap'] >= 30000)
+                & (df['avg_volume'] >= 100000000))
+
+    filtered = imura.apply_tier1_filters(df)
+
+    assert filtered.index.tolist() == df.index[expected].tolist()
+    assert '✅ Tier 1通過銘柄' in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""
+テスト: python/services/market_data/cache.py
+
+ディスクキャッシュのTTL判定、read-through、stale-while-revalidateをテストします。
+"""
+
+import os
+import time
+
+from python.services.market_data import ConcurrentFetcher, MetricsCache
+
+FIELDS = ['ticker', 'name', 'market', 'market_cap', 'roe']
+
+
+def _counting_fetch(calls):
+    def fetch(ticker, market='JP'):
+        calls.append(ticker)
+        return {'ticker': ticker, 'name': ticker, 'market': market,
+                'market_cap': 100 * len(calls), 'roe': 12.5}
+    return fetch
+
+
+def test_read_through_fetches_once_per_day(tmp_path):
+    """同日中の2回目の呼び出しはキャッシュから返ることを確認"""
+    calls = []
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path))
+    cached = cache.read_through(_counting_fetch(calls))
+
+    first = cached('7203.T', market='JP')
+    second = cached('7203.T', market='JP')
+
+    assert calls == ['7203.T']
+    assert first == second
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_ttl_expiry_triggers_refetch(tmp_path):
+    """TTLを過ぎたエントリは再取得されることを確認"""
+    calls = []
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path), ttl_seconds=60)
+    cache.put('AAPL', {'ticker': 'AAPL', 'market_cap': 1}, fetched_at=time.time() - 120)
+
+    record = cache.read_through(_counting_fetch(calls))('AAPL', market='US')
+
+    assert calls == ['AAPL']
+    assert record['market_cap'] == 100
+    assert cache.get('AAPL')['market_cap'] == 100
+
+
+def test_stale_while_revalidate_returns_old_value(tmp_path):
+    """期限切れでも古い値を即座に返し、裏で更新することを確認"""
+    calls = []
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path), ttl_seconds=60,
+                         stale_while_revalidate=True)
+    cache.put('AAPL', {'ticker': 'AAPL', 'market_cap': 1}, fetched_at=time.time() - 120)
+
+    record = cache.read_through(_counting_fetch(calls))('AAPL', market='US')
+    cache.wait()
+
+    assert record['market_cap'] == 1
+    assert calls == ['AAPL']
+    assert cache.get('AAPL')['market_cap'] == 100
+
+
+def test_failed_records_are_not_cached(tmp_path):
+    """取得失敗のダミーレコードはキャッシュされないことを確認"""
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path))
+    cached = cache.read_through(lambda t, market='JP': {
+        'ticker': t, 'name': t, 'market': market, 'market_cap': 0, 'roe': None})
+    cached('XXXX')
+    assert cache.get('XXXX') is None
+
+
+def test_writes_leave_no_temp_files(tmp_path):
+    """アトミック書き込み後に一時ファイルが残らないことを確認"""
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path))
+    cache.put('7203.T', {'ticker': '7203.T', 'market_cap': 1})
+    assert [f for f in os.listdir(cache.directory) if f.endswith('.tmp')] == []
+
+
+def test_fetcher_cache_hits_skip_fetch(tmp_path):
+    """ConcurrentFetcherにキャッシュを渡すと2回目は取得関数が呼ばれないことを確認"""
+    calls = []
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path))
+    fetcher = ConcurrentFetcher(_counting_fetch(calls), requests_per_second=1000,
+                                burst=10, cache=cache)
+    fetcher.fetch(['A', 'B'], show_progress=False)
+    fetcher.fetch(['A', 'B'], show_progress=False)
+    assert sorted(calls) == ['A', 'B']
@@ -0,0 +1,96 @@
+"""
+テスト: python/services/market_data/fetcher.py, rate_limiter.py
+
+並列取得エンジンとトークンバケットの動作をテストします。
+"""
+
+import threading
+import time
+
+import pytest
+
+from python.services.market_data import ConcurrentFetcher, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_blocks():
+    """容量分は即時に取得でき、それ以降はブロックされることを確認"""
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_rejects_invalid_rate():
+    """rateが0以下の場合はValueError"""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_fetch_preserves_input_order():
+    """完了順に関わらず入力順で結果が返ることを確認"""
+    def fetch(ticker, market='JP'):
+        time.sleep(0.01 * (5 - int(ticker)))
+        return {'ticker': ticker, 'market': market}
+
+    fetcher = ConcurrentFetcher(fetch, max_workers=5, requests_per_second=1000, burst=10)
+    results = fetcher.fetch(['1', '2', '3', '4', '5'], market='US', show_progress=False)
+
+    assert [r['ticker'] for r in results] == ['1', '2', '3', '4', '5']
+    assert all(r['market'] == 'US' for r in results)
+
+
+def test_fetch_overlaps_latency_within_worker_bound():
+    """待ち時間が重なり、同時実行数がmax_workersを超えないことを確認"""
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    def fetch(ticker, market='JP'):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.05)
+        with lock:
+            state['active'] -= 1
+        return {'ticker': ticker}
+
+    fetcher = ConcurrentFetcher(fetch, max_workers=4, requests_per_second=1000, burst=20)
+    start = time.monotonic()
+    fetcher.fetch([str(i) for i in range(12)], show_progress=False)
+    elapsed = time.monotonic() - start
+
+    assert state['peak'] <= 4
+    assert elapsed < 12 * 0.05
+
+
+def test_fetch_calls_on_result_for_every_ticker():
+    """on_resultが全銘柄分呼ばれることを確認"""
+    seen = []
+    fetcher = ConcurrentFetcher(lambda t, market='JP': {'ticker': t},
+                                requests_per_second=1000, burst=10)
+    fetcher.fetch(['A', 'B', 'C'], on_result=lambda t, r: seen.append(t), show_progress=False)
+    assert sorted(seen) == ['A', 'B', 'C']
+
+
+def test_fetch_markets_per_ticker():
+    fetcher = ConcurrentFetcher(lambda t, market='JP': {'ticker': t, 'market': market},
+                                requests_per_second=None)
+    results = fetcher.fetch(['1', '2'], market=['JP', 'US'], show_progress=False)
+    assert [r['market'] for r in results] == ['JP', 'US']
+
+
+def test_fetch_sends_no_requests_after_deadline():
+    """制限時間を過ぎてから開始するジョブはリクエストを送らないことを確認"""
+    calls = []
+
+    def fetch(ticker, market='JP'):
+        calls.append(ticker)
+        time.sleep(0.1)
+        return {'ticker': ticker}
+
+    fetcher = ConcurrentFetcher(fetch, max_workers=1, requests_per_second=None)
+    assert fetcher.fetch(['A', 'B'], show_progress=False, deadline=time.monotonic() - 1) == [None, None]
+    assert calls == []
+
+    results = fetcher.fetch(['A', 'B', 'C', 'D'], show_progress=False, deadline=time.monotonic() + 0.15)
+    time.sleep(0.3)
+    assert results[0] == {'ticker': 'A'} and results[2:] == [None, None]
+    assert calls == ['A', 'B']
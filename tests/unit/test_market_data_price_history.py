@@ -0,0 +1,66 @@
+"""
+テスト: python/services/market_data/price_history.py
+
+株価履歴のチャンク取得とモメンタム指標の一括算出をテストします。
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.services.market_data import (
+    add_momentum_columns, compute_momentum, download_close_prices,
+)
+
+
+def _close():
+    dates = pd.bdate_range('2024-01-01', '2024-12-31')
+    n = len(dates)
+    return pd.DataFrame({
+        'UP': np.linspace(100, 200, n),          # 単調上昇 → 高値圏
+        'PEAK': np.concatenate([np.linspace(100, 200, n // 2),
+                                np.linspace(200, 150, n - n // 2)]),
+        'EMPTY': np.full(n, np.nan),
+    }, index=dates)
+
+
+def test_compute_momentum_matches_scalar_definition():
+    """各銘柄の騰落率・高値乖離率が定義どおりに計算されることを確認"""
+    close = _close()
+    result = compute_momentum(close)
+
+    last_date = close.index[-1]
+    base = close.loc[:last_date - pd.DateOffset(months=6), 'UP'].iloc[-1]
+    assert result.loc['UP', 'price_change_6m'] == pytest.approx((200 / base - 1) * 100)
+    assert result.loc['UP', 'distance_from_52w_high'] == pytest.approx(0.0)
+    assert result.loc['PEAK', 'distance_from_52w_high'] == pytest.approx(25.0)
+    assert result.loc['EMPTY'].isna().all()
+
+
+def test_download_close_prices_uses_chunks():
+    """チャンク単位で取得し、全銘柄を1つのDataFrameに結合することを確認"""
+    close = _close()
+    requested = []
+
+    def fake_download(tickers, period):
+        requested.append(list(tickers))
+        data = close[tickers]
+        data.columns = pd.MultiIndex.from_product([['Close'], tickers])
+        return data
+
+    result = download_close_prices(['UP', 'PEAK', 'EMPTY', 'UP'], chunk_size=2,
+                                   download_func=fake_download, show_progress=False)
+
+    assert requested == [['UP', 'PEAK'], ['EMPTY']]
+    assert list(result.columns) == ['UP', 'PEAK', 'EMPTY']
+
+
+def test_add_momentum_columns_aligns_by_ticker():
+    """スクリーニング結果の行順に合わせて列が追加されることを確認"""
+    df = pd.DataFrame({'ticker': ['PEAK', 'MISSING', 'UP'], 'score': [1, 2, 3]})
+    result = add_momentum_columns(df, close=_close())
+
+    assert result['distance_from_52w_high'].iloc[0] == pytest.approx(25.0)
+    assert np.isnan(result['price_change_6m'].iloc[1])
+    assert result['distance_from_52w_high'].iloc[2] == pytest.approx(0.0)
+    assert 'price_change_6m' not in df.columns
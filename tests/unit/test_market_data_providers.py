@@ -0,0 +1,108 @@
+"""
+テスト: python/services/market_data/providers.py
+
+record → replay の往復、欠損ティッカーの扱い、人工遅延、
+ReplayProvider を使ったオフラインでのスクリーニングをテストします。
+"""
+
+import time
+
+import pytest
+
+from python.models.screening.screening_engine import (
+    ScreeningEngine, Universe, UniverseSegment, get_stock_metrics, metrics_from_info,
+)
+from python.services.market_data import (
+    DataProvider, ProviderError, RecordingProvider, ReplayProvider, create_provider,
+)
+
+INFO = {
+    '7203.T': {'longName': 'Toyota Motor', 'marketCap': 40_000_000_000_000,
+               'returnOnEquity': 0.12, 'trailingPE': 10.0, 'dividendYield': 0.03},
+    '8306.T': {'shortName': 'MUFG', 'marketCap': 20_000_000_000_000,
+               'returnOnEquity': 0.08, 'priceToBook': 0.9},
+}
+
+
+class FakeProvider(DataProvider):
+    def __init__(self):
+        self.calls = []
+
+    def get_info(self, ticker):
+        self.calls.append(ticker)
+        return INFO[ticker]
+
+
+def _record(tmp_path):
+    inner = FakeProvider()
+    recorder = RecordingProvider(inner, archive_dir=str(tmp_path))
+    for ticker in INFO:
+        assert recorder.get_info(ticker) == INFO[ticker]
+    return inner
+
+
+def test_record_then_replay_roundtrip(tmp_path):
+    _record(tmp_path)
+    replay = ReplayProvider(str(tmp_path))
+
+    assert sorted(replay.tickers()) == sorted(INFO)
+    for ticker, info in INFO.items():
+        assert replay.get_info(ticker) == info
+
+
+def test_replay_missing_ticker_and_archive(tmp_path):
+    _record(tmp_path)
+    replay = ReplayProvider(str(tmp_path))
+    with pytest.raises(ProviderError):
+        replay.get_info('9999.T')
+    with pytest.raises(ProviderError):
+        ReplayProvider(str(tmp_path / 'missing'))
+
+
+def test_replay_quote_is_derived_from_info(tmp_path):
+    _record(tmp_path)
+    quote = ReplayProvider(str(tmp_path)).get_quote('7203.T')
+    assert quote['market_cap'] == 40_000_000_000_000
+    assert quote['price'] is None and quote['avg_volume'] is None
+
+
+def test_replay_latency(tmp_path):
+    _record(tmp_path)
+    replay = create_provider('replay', archive_dir=str(tmp_path), latency_seconds=0.05)
+
+    started = time.monotonic()
+    replay.get_info('7203.T')
+    assert time.monotonic() - started >= 0.05
+
+
+def test_get_stock_metrics_with_provider(tmp_path):
+    _record(tmp_path)
+    replay = ReplayProvider(str(tmp_path))
+
+    metrics = get_stock_metrics('7203.T', provider=replay)
+    assert metrics == metrics_from_info(INFO['7203.T'], '7203.T')
+    assert metrics['name'] == 'Toyota Motor'
+    assert metrics['roe'] == pytest.approx(12.0)
+
+    # 記録がない銘柄は取得失敗レコードになる
+    failed = get_stock_metrics('9999.T', provider=replay)
+    assert failed['market_cap'] == 0 and failed['roe'] is None
+
+
+def test_engine_runs_offline_with_replay(tmp_path):
+    _record(tmp_path / 'archive')
+    engine = ScreeningEngine(
+        provider=ReplayProvider(str(tmp_path / 'archive')),
+        use_cache=False,
+        requests_per_second=None,
+    )
+    universe = Universe(
+        name='replay',
+        segments=[UniverseSegment('日本株', 'JP', ['7203.T', '8306.T'])],
+    )
+
+    result = engine.run(universe, verbose=False)
+
+    assert result['ticker'].tolist() == ['7203.T', '8306.T']
+    assert result.loc[0, 'name'] == 'Toyota Motor'
+    assert result.loc[1, 'name'] == 'MUFG'
@@ -0,0 +1,104 @@
+"""
+テスト: python/services/market_data/refresh.py
+
+決算発表日に連動したキャッシュ更新判定と、株価のみの更新による指標の換算をテストします。
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from python.services.market_data import MetricsCache, RefreshPlanner, earnings_calendar_from_master
+from python.services.market_data.refresh import FRESH, FULL, PRICE, reprice
+
+FIELDS = ['ticker', 'market_cap', 'roe', 'pe_ratio', 'dividend_yield', 'price', 'earnings_date']
+
+
+def _timestamp(day):
+    return datetime.combine(day, datetime.min.time()).timestamp() + 12 * 3600
+
+
+def _entry(fetched, priced=None, earnings_date=None):
+    return {
+        'fetch_date': fetched.isoformat(),
+        'fetched_at': _timestamp(fetched),
+        'priced_at': _timestamp(priced or fetched),
+        'data': {'price': 1000.0, 'earnings_date': earnings_date},
+    }
+
+
+def test_decide_full_only_after_new_earnings():
+    today = date(2025, 11, 5)
+    planner = RefreshPlanner(earnings_calendar={'6723': '2025-10-31'}, today=today)
+
+    # 決算発表前の取得 → 全指標を再取得
+    assert planner.decide('6723.T', _entry(date(2025, 10, 20))) == FULL
+    # 決算発表後の取得で株価が古い → 株価のみ
+    assert planner.decide('6723.T', _entry(date(2025, 11, 1))) == PRICE
+    # 株価も当日取得済み → キャッシュ
+    assert planner.decide('6723.T', _entry(date(2025, 11, 1), priced=today)) == FRESH
+    # キャッシュなし
+    assert planner.decide('6723.T', None) == FULL
+
+
+def test_decide_uses_record_earnings_date_and_ignores_future_dates():
+    planner = RefreshPlanner(today=date(2025, 11, 5))
+
+    assert planner.decide('AAPL', _entry(date(2025, 10, 1), earnings_date='2025-10-30')) == FULL
+    assert planner.decide('AAPL', _entry(date(2025, 10, 1), earnings_date='2026-01-29')) == PRICE
+
+
+def test_decide_falls_back_to_max_age_without_calendar():
+    today = date(2025, 11, 5)
+    planner = RefreshPlanner(today=today, fundamentals_max_age_days=92)
+
+    assert planner.decide('AAPL', _entry(today - timedelta(days=30))) == PRICE
+    assert planner.decide('AAPL', _entry(today - timedelta(days=120))) == FULL
+
+
+def test_earnings_calendar_from_master():
+    calendar = earnings_calendar_from_master({
+        '6723': {'name': 'ルネサス', 'latest_earnings_date': '2025-10-31'},
+        '9999': {'name': '不明'},
+    })
+    assert calendar == {'6723': date(2025, 10, 31)}
+
+
+def test_reprice_scales_price_dependent_fields():
+    record = {'price': 1000.0, 'market_cap': 5e12, 'pe_ratio': 10.0,
+              'dividend_yield': 3.0, 'roe': 12.0}
+    updated = reprice(record, 1100.0)
+
+    assert updated['market_cap'] == pytest.approx(5.5e12)
+    assert updated['pe_ratio'] == pytest.approx(11.0)
+    assert updated['dividend_yield'] == pytest.approx(3.0 / 1.1)
+    assert updated['roe'] == 12.0
+    assert reprice({'price': None}, 1100.0) is None
+
+
+def test_read_through_with_planner_fetches_price_only(tmp_path):
+    """決算発表がなければ、2回目以降は株価のみ取得して換算することを確認"""
+    fetch_calls, price_calls = [], []
+
+    def fetch(ticker, market='JP'):
+        fetch_calls.append(ticker)
+        return {'ticker': ticker, 'market_cap': 5e12, 'roe': 12.0, 'pe_ratio': 10.0,
+                'dividend_yield': 3.0, 'price': 1000.0, 'earnings_date': None}
+
+    def price(ticker, market='JP'):
+        price_calls.append(ticker)
+        return 1200.0
+
+    cache = MetricsCache(FIELDS, cache_dir=str(tmp_path))
+    cache.put('7203.T', fetch('7203.T'), fetched_at=time.time() - 86400 * 3)
+    fetch_calls.clear()
+
+    cached = cache.read_through(fetch, planner=RefreshPlanner(), price_func=price)
+    first = cached('7203.T')
+    second = cached('7203.T')
+
+    assert fetch_calls == [] and price_calls == ['7203.T']
+    assert first['pe_ratio'] == pytest.approx(12.0)
+    assert second == first
+    assert cache.repriced == 1 and cache.hits == 1
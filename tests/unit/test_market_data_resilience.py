@@ -0,0 +1,176 @@
+"""
+テスト: python/services/market_data/resilience.py
+
+再試行判定、バックオフ、タイムアウト、サーキットブレーカー、
+ConcurrentFetcher の再試行キューをテストします。
+"""
+
+import time
+
+import pytest
+
+from python.services.market_data import (
+    CircuitBreaker, ConcurrentFetcher, DataProvider, ProviderError, ResilientProvider,
+    RetryPolicy,
+)
+from python.services.market_data.resilience import FetchTimeoutError, deadline_scope, is_retryable
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyProvider(DataProvider):
+    """指定回数だけ失敗してから成功するプロバイダー"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def get_info(self, ticker):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'longName': ticker, 'marketCap': 1}
+
+
+def _resilient(inner, **kwargs):
+    sleeps = []
+    kwargs.setdefault('retry', RetryPolicy(max_attempts=4, seed=0))
+    provider = ResilientProvider(inner, sleep=sleeps.append, **kwargs)
+    return provider, sleeps
+
+
+def test_is_retryable_classifies_status_codes():
+    assert is_retryable(HTTPError(429))
+    assert is_retryable(HTTPError(503))
+    assert not is_retryable(HTTPError(404))
+    assert is_retryable(Exception('Too Many Requests. Rate limited.'))
+    assert not is_retryable(KeyError('marketCap'))
+
+
+def test_backoff_is_exponential_with_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, seed=0)
+    for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)]:
+        assert 0 <= policy.delay(attempt) <= cap
+
+
+def test_retries_transient_errors_then_succeeds():
+    inner = FlakyProvider([HTTPError(429), HTTPError(502)])
+    provider, sleeps = _resilient(inner)
+
+    assert provider.get_info('7203.T')['longName'] == '7203.T'
+    assert inner.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_permanent_errors_are_not_retried():
+    inner = FlakyProvider([HTTPError(404)])
+    provider, sleeps = _resilient(inner)
+
+    with pytest.raises(HTTPError):
+        provider.get_info('7203.T')
+    assert inner.calls == 1 and sleeps == []
+
+
+def test_empty_info_is_treated_as_transient():
+    class EmptyProvider(DataProvider):
+        def get_info(self, ticker):
+            return {'trailingPegRatio': None}
+
+    provider, sleeps = _resilient(EmptyProvider(), retry=RetryPolicy(max_attempts=2))
+    with pytest.raises(ProviderError):
+        provider.get_info('7203.T')
+    assert len(sleeps) == 1
+
+
+def test_retries_consume_shared_rate_limit():
+    """再試行も共有のトークンバケットを消費し、消費数が実際のリクエスト数と一致することを確認"""
+    class CountingLimiter:
+        acquired = 0
+
+        def acquire(self, tokens=1.0):
+            self.acquired += 1
+            return 0.0
+
+    limiter = CountingLimiter()
+    inner = FlakyProvider([HTTPError(429), HTTPError(503), HTTPError(404)])
+    provider, _ = _resilient(inner, limiter=limiter)
+    fetcher = ConcurrentFetcher(lambda ticker, market='JP': provider.get_info(ticker), limiter=limiter)
+
+    # 1銘柄目は429・503の後に404（恒久的な失敗）で終わり、2銘柄目は1回で成功する
+    with pytest.raises(HTTPError):
+        fetcher.fetch(['7203.T'], show_progress=False)
+    fetcher.fetch(['6758.T'], show_progress=False)
+    assert inner.calls == 4
+    assert limiter.acquired == inner.calls
+
+def test_timeout_abandons_hung_call():
+    class HungProvider(DataProvider):
+        def get_info(self, ticker):
+            time.sleep(5)
+
+    provider, _ = _resilient(HungProvider(), timeout_seconds=0.05,
+                             retry=RetryPolicy(max_attempts=1))
+    started = time.monotonic()
+    with pytest.raises(FetchTimeoutError):
+        provider.get_info('7203.T')
+    assert time.monotonic() - started < 1.0
+
+
+def test_retries_stop_at_deadline():
+    """deadline_scope の制限時間を過ぎる試行・再試行は行わないことを確認"""
+    class ThrottledProvider(DataProvider):
+        calls = 0
+
+        def get_info(self, ticker):
+            self.calls += 1
+            time.sleep(0.2)
+            raise HTTPError(429)
+
+    inner = ThrottledProvider()
+    provider, _ = _resilient(inner, retry=RetryPolicy(max_attempts=10, base_delay=0.01, seed=0))
+    started = time.monotonic()
+    with deadline_scope(started + 0.3):
+        with pytest.raises(ProviderError):
+            provider.get_info('7203.T')
+    # 2回目の試行は残り時間でタイムアウトし、それ以上は再試行しない
+    assert inner.calls == 2
+    assert time.monotonic() - started < 0.45
+
+    with deadline_scope(time.monotonic() - 1):
+        with pytest.raises(FetchTimeoutError):
+            provider.get_info('7203.T')
+    assert inner.calls == 2
+
+def test_circuit_breaker_opens_on_error_spike():
+    sleeps = []
+    breaker = CircuitBreaker(window=4, error_rate=0.5, min_calls=4, cooldown_seconds=0.05,
+                             sleep=sleeps.append)
+    for success in (True, False, True, False):
+        breaker.record(success)
+
+    assert breaker.trips == 1 and breaker.is_open
+    breaker.before_call()
+    assert sleeps and sleeps[0] <= 0.05
+
+
+def test_fetcher_retry_queue_refetches_failed_tickers():
+    attempts = {}
+
+    def fetch(ticker, market='JP'):
+        attempts[ticker] = attempts.get(ticker, 0) + 1
+        ok = ticker != 'B' or attempts[ticker] > 1
+        return {'ticker': ticker, 'ok': ok}
+
+    seen = []
+    fetcher = ConcurrentFetcher(fetch, requests_per_second=None,
+                                is_failed=lambda r: not r['ok'], retry_rounds=2)
+    results = fetcher.fetch(['A', 'B', 'C'], on_result=lambda t, r: seen.append(t),
+                            show_progress=False)
+
+    assert [r['ok'] for r in results] == [True, True, True]
+    assert attempts == {'A': 1, 'B': 2, 'C': 1}
+    assert sorted(seen) == ['A', 'B', 'C']
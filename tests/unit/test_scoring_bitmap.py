@@ -0,0 +1,100 @@
+"""
+テスト: python/models/scoring/bitmap.py
+
+条件式（AND / OR / NOT）の該当数・該当銘柄が DataFrame のマスクと一致すること、
+チャンクごとの索引の連結、2^k 通りの組み合わせの集計をテストします。
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.scoring import PredicateIndex, RangeFilter
+
+PREDICATES = {
+    'dividend': RangeFilter('配当利回り ≧ 3%', 'dividend_yield', min=300),
+    'roe': RangeFilter('ROE ≧ 10%', 'roe', min=10.0),
+    'per': RangeFilter('PER 5-20倍', 'pe_ratio', min=5, max=20),
+    'jp': lambda df: df['market'] == 'JP',
+}
+
+
+def _universe(n=1003, seed=0):
+    # 行数は8の倍数にしない（末尾のバイトのパディングを確認するため）
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ticker': [f'T{i}' for i in range(n)],
+        'market': rng.choice(['JP', 'US'], n),
+        'dividend_yield': rng.uniform(0, 600, n),
+        'roe': rng.normal(10, 5, n),
+        'pe_ratio': rng.uniform(0, 40, n),
+    })
+    df.loc[::17, 'roe'] = np.nan
+    return df
+
+
+def _masks(df):
+    return {
+        'dividend': df['dividend_yield'] >= 300,
+        'roe': df['roe'] >= 10.0,
+        'per': df['pe_ratio'].between(5, 20),
+        'jp': df['market'] == 'JP',
+    }
+
+
+def test_expressions_match_dataframe_masks():
+    df = _universe()
+    index = PredicateIndex.from_frame(df, PREDICATES, key='ticker')
+    m = _masks(df)
+
+    cases = {
+        'dividend & roe & per': m['dividend'] & m['roe'] & m['per'],
+        'dividend | ~jp': m['dividend'] | ~m['jp'],
+        'not (roe or per)': ~(m['roe'] | m['per']),
+        '~roe': ~m['roe'],   # 欠損は roe を満たさない側
+        'dividend ^ per': m['dividend'] ^ m['per'],
+    }
+    for expr, expected in cases.items():
+        assert index.count(expr) == expected.sum(), expr
+        np.testing.assert_array_equal(index.mask(expr), expected.to_numpy())
+    assert index.members(['dividend', 'jp']).tolist() == df.loc[m['dividend'] & m['jp'], 'ticker'].tolist()
+    assert index.count([]) == len(df)
+
+    with pytest.raises(KeyError):
+        index.count('dividend & growth')
+    with pytest.raises(ValueError):
+        index.count('dividend + roe')
+
+
+def test_concat_chunks_matches_whole_frame():
+    df = _universe()
+    parts = [PredicateIndex.from_frame(df.iloc[i:i + 250], PREDICATES) for i in range(0, len(df), 250)]
+    whole = PredicateIndex.from_frame(df, PREDICATES)
+    joined = PredicateIndex.concat(parts)
+
+    assert len(joined) == len(df)
+    for expr in ['dividend & ~roe', 'jp | per']:
+        np.testing.assert_array_equal(joined.mask(expr), whole.mask(expr))
+        np.testing.assert_array_equal(joined.members(expr), np.flatnonzero(whole.mask(expr)))
+
+
+def test_combinations_count_every_subset():
+    df = _universe()
+    index = PredicateIndex.from_frame(df, PREDICATES)
+    m = _masks(df)
+    names = ['dividend', 'roe', 'per']
+    table = index.combinations(names)
+
+    assert len(table) == 8
+    assert table['exact'].sum() == len(df)
+    for row in table.itertuples(index=False):
+        chosen = [name for name in names if getattr(row, name)]
+        rest = [name for name in names if not getattr(row, name)]
+        every = np.ones(len(df), dtype=bool)
+        for name in chosen:
+            every &= m[name].to_numpy()
+        exact = every.copy()
+        for name in rest:
+            exact &= ~m[name].to_numpy()
+        assert row.all == every.sum()
+        assert row.exact == exact.sum()
@@ -0,0 +1,71 @@
+"""
+テスト: python/models/scoring/filters.py
+
+選択率順の評価、残存行のみの評価、ウォーターフォールの集計、
+欠損値・境界値の扱いをテストします。
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.scoring import FilterExecutor, RangeFilter
+
+
+def _frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'a': rng.uniform(0, 100, n),
+        'b': rng.uniform(0, 100, n),
+        'c': rng.uniform(0, 100, n),
+    })
+    df.loc[::9, 'b'] = np.nan
+    return df
+
+
+FILTERS = [
+    RangeFilter('a ≥ 10', 'a', min=10),                      # 通過率 約90%
+    RangeFilter('b 20-40', 'b', min=20, max=40),             # 約18%
+    RangeFilter('c < 50', 'c', max=50, max_inclusive=False),  # 約50%
+]
+
+
+def test_executor_matches_combined_mask_and_orders_by_selectivity():
+    df = _frame()
+    result = FilterExecutor(FILTERS, sample_size=500).apply(df)
+
+    expected = (df['a'] >= 10) & (df['b'] >= 20) & (df['b'] <= 40) & (df['c'] < 50)
+    assert result.mask.tolist() == expected.tolist()
+    assert result.passed == expected.sum() and result.total == len(df)
+    assert result.waterfall['filter'].tolist() == ['b 20-40', 'c < 50', 'a ≥ 10']
+
+
+def test_waterfall_counts_come_from_survivors():
+    df = _frame()
+    waterfall = FilterExecutor(FILTERS).apply(df).waterfall
+
+    assert waterfall['evaluated'].iloc[0] == len(df)
+    # 各基準は直前までの残存行だけを評価する
+    assert waterfall['evaluated'].iloc[1:].tolist() == waterfall['survivors'].iloc[:-1].tolist()
+    assert (waterfall['evaluated'] - waterfall['rejected'] == waterfall['survivors']).all()
+    assert waterfall['pass_rate'].iloc[0] == pytest.approx(waterfall['survivors'].iloc[0] / len(df))
+
+
+def test_range_filter_bounds_and_missing():
+    values = [None, 'n/a', 5.0, 7.5, 10.0]
+    assert RangeFilter('x', 'x', min=5, max=10).evaluate(values).tolist() == [
+        False, False, True, True, True]
+    assert RangeFilter('x', 'x', min=5, max=10, min_inclusive=False,
+                       max_inclusive=False).evaluate(values).tolist() == [
+        False, False, False, True, False]
+    with pytest.raises(ValueError):
+        RangeFilter('x', 'x')
+
+
+def test_executor_empty_and_all_rejected():
+    empty = FilterExecutor(FILTERS).apply(_frame().head(0))
+    assert empty.passed == 0 and empty.waterfall['evaluated'].tolist() == [0, 0, 0]
+
+    result = FilterExecutor([RangeFilter('none', 'a', min=1000)] + FILTERS).apply(_frame(100))
+    assert result.passed == 0
+    assert result.waterfall['evaluated'].tolist()[1:] == [0, 0, 0]
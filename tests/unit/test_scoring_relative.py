@@ -0,0 +1,120 @@
+"""
+テスト: python/models/scoring/relative.py
+
+市場 × セクター内のパーセンタイル（groupby.rank との一致）、小さいグループの
+フォールバック、z スコアの切り詰め、ScoreModel からの変換とスナップショットのキャッシュをテストします。
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.scoring import HIGHER, LOWER, RelativeFactor, RelativeModel, ThresholdRule, ScoreModel
+from python.models.scoring import relative
+from python.models.screening.imura_factors import IMURA_TIER2_MODEL, score_tier2
+from python.models.screening.screening_engine import calculate_quantitative_scores
+
+
+def _universe(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'market': rng.choice(['JP', 'US'], n),
+        'sector': rng.choice(['銀行', '商社', '電機', '医薬品'], n),
+        'roe': rng.normal(10, 5, n),
+        'per': rng.normal(15, 4, n),
+    })
+
+
+def _model(**kwargs):
+    return RelativeModel('test', [
+        RelativeFactor('score_roe', 'roe', 20),
+        RelativeFactor('score_per', 'per', 10, direction=LOWER),
+    ], **kwargs)
+
+
+def test_percentile_matches_groupby_rank():
+    df = _universe()
+    df.loc[[3, 7], 'roe'] = np.nan
+    scores = _model().evaluate(df, use_cache=False)
+
+    keys = [df['market'], df['sector']]
+    roe = df['roe'].groupby(keys).rank(pct=True)
+    per = (-df['per']).groupby(keys).rank(pct=True)
+    np.testing.assert_allclose(scores['score_roe'], (roe * 20).fillna(0))
+    np.testing.assert_allclose(scores['score_per'], per * 10)
+    np.testing.assert_allclose(scores['total_score'], scores['score_roe'] + scores['score_per'])
+    assert scores.loc[[3, 7], 'score_roe'].tolist() == [0, 0]
+
+
+def test_small_groups_fall_back_to_coarser_level():
+    df = _universe()
+    df.loc[:2, 'sector'] = '空運'   # 3銘柄だけのセクター
+    df.loc[5, 'sector'] = None       # セクター欠損
+    fractions = _model(min_group_size=5).fractions(df)
+
+    market = df['roe'].groupby(df['market']).rank(pct=True)
+    np.testing.assert_allclose(fractions.loc[:2, 'score_roe'], market.loc[:2])
+    assert fractions.loc[5, 'score_roe'] == pytest.approx(market.loc[5])
+
+    # group_by の列がなければ全体で評価
+    whole = _model().fractions(df.drop(columns=['market', 'sector']))
+    np.testing.assert_allclose(whole['score_roe'], df['roe'].rank(pct=True))
+
+
+def test_zscore_is_winsorized_and_bounded():
+    df = pd.DataFrame({'roe': [1.0, 2, 3, 4, 5, 6, 7, 8, 9, 1000], 'per': 15.0})
+    fractions = _model(method='zscore', group_by=(), winsorize=(0.0, 0.8)).fractions(df)
+
+    roe = fractions['score_roe']
+    assert roe.between(0, 1).all()
+    assert roe.is_monotonic_increasing
+    # 外れ値は上限（80%点 = 8.2）に切り詰められ、他の銘柄の z スコアを押しつぶさない
+    assert roe.iloc[-1] == pytest.approx(roe.iloc[-2])
+    raw = _model(method='zscore', group_by=(), winsorize=(0.0, 1.0)).fractions(df)['score_roe']
+    assert roe.iloc[-2] - roe.iloc[0] > 10 * (raw.iloc[-2] - raw.iloc[0])
+    # 全銘柄が同じ値なら平均（割合 0.5）
+    assert (fractions['score_per'] == 0.5).all()
+
+
+def test_from_score_model_infers_directions():
+    model = ScoreModel('m', rules=[
+        ThresholdRule('roe', 'roe', [5, 10], [0, 5, 10]),
+        ThresholdRule('pbr', 'pbr', [1, 2], [10, 5, 0], weight=2),
+    ], groups={'quality': ['roe']})
+    converted = RelativeModel.from_score_model(model)
+
+    assert [(f.direction, f.points, f.weight) for f in converted.factors] == [
+        (HIGHER, 10, 1), (LOWER, 10, 2)]
+    with pytest.raises(ValueError):
+        RelativeModel.from_score_model(IMURA_TIER2_MODEL)   # 配当利回りの区間は向きを推定できない
+
+
+def test_relative_tier2_and_quantitative_scores():
+    df = _universe().rename(columns={'per': 'pe_ratio'})
+    tier2 = score_tier2(df, relative='percentile')
+
+    assert list(tier2.columns) == list(score_tier2(df).columns)
+    assert tier2['total_score'].between(0, 110).all()
+    assert calculate_quantitative_scores(df, relative='zscore')['quantitative_score'].between(0, 100).all()
+    with pytest.raises(ValueError):
+        score_tier2(df, relative='rank')
+
+
+def test_fractions_are_cached_per_snapshot(monkeypatch):
+    relative.clear_cache()
+    df = _universe()
+    model = _model()
+    calls = []
+    original = RelativeModel.fractions
+    monkeypatch.setattr(RelativeModel, 'fractions', lambda self, d: calls.append(1) or original(self, d))
+
+    first = model.evaluate(df)
+    pd.testing.assert_frame_equal(model.evaluate(df.copy()), first)
+    assert len(calls) == 1
+
+    changed = df.copy()
+    changed.loc[0, 'roe'] += 1
+    model.evaluate(changed)
+    model.evaluate(changed, snapshot='2026-10-01')
+    model.evaluate(df, snapshot='2026-10-01')   # 同じキーなら内容が違っても再計算しない
+    assert len(calls) == 3
@@ -0,0 +1,111 @@
+"""
+テスト: python/models/scoring/rules.py
+
+閾値の境界（以上/超）、区間・対応表ルール、上下限と係数、
+JSON 保存・復元とルール表のハッシュ、researcher評価スコアの回帰と
+銘柄一覧CSV（東証プライム）の読み込みをテストします。
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.analysis.japan_top100_evaluation import (
+    DATA_SHORTAGE_NOTE, RESEARCHER_SCORE_MODEL, SECTOR_BASE_SCORES, SPECIAL_ADJUSTMENTS,
+    calculate_researcher_score, load_universe, score_researcher, top100_stocks,
+)
+from python.models.scoring import Band, IntervalRule, LookupRule, ScoreModel, ThresholdRule
+
+
+def test_threshold_rule_inclusive_and_exclusive():
+    values = [None, 4.9, 5.0, 5.1, 10.0, 'n/a']
+    inclusive = ThresholdRule('a', 'x', [5, 10], [0, 1, 2], missing=-1)
+    exclusive = ThresholdRule('b', 'x', [5, 10], [0, 1, 2], inclusive=False, missing=-1)
+
+    assert inclusive.evaluate(values).tolist() == [-1, 0, 1, 1, 2, -1]
+    assert exclusive.evaluate(values).tolist() == [-1, 0, 0, 1, 1, -1]
+
+
+def test_threshold_rule_validation():
+    with pytest.raises(ValueError):
+        ThresholdRule('a', 'x', [5, 10], [0, 1])
+    with pytest.raises(ValueError):
+        ThresholdRule('a', 'x', [10, 5], [0, 1, 2])
+
+
+def test_interval_and_lookup_rules():
+    interval = IntervalRule('band', 'x', [Band(4, 6, 10, closed='both'), Band(3, 4, 5)],
+                            default=1, missing=-1)
+    assert interval.evaluate([np.nan, 2.9, 3.0, 4.0, 6.0, 6.1]).tolist() == [-1, 1, 5, 10, 10, 1]
+
+    lookup = LookupRule('sector', 's', {'金融': 75, '商社': 80}, default=70)
+    assert lookup.evaluate(['商社', 'その他', None]).tolist() == [80, 70, 70]
+    with_missing = LookupRule('code', 'c', {'7203': 10, 1301: 2.5}, missing=-1)
+    assert with_missing.evaluate(pd.Series(['7203', 1301, np.nan, 7203])).tolist() == [10, 2.5, -1, 0]
+
+
+def test_model_clip_multiplier_and_truncate():
+    model = ScoreModel(
+        'example',
+        rules=[ThresholdRule('a', 'x', [1], [0, 90]), ThresholdRule('b', 'y', [1], [0, 20])],
+        clip=(0, 100),
+        multipliers=[ThresholdRule('penalty', 'x', [2], [0.75, 1], missing=1)],
+        truncate=True,
+    )
+    result = model.evaluate(pd.DataFrame({'x': [1.5, 3.0, np.nan], 'y': [2, 2, 2]}))
+
+    # 110 → 100（上限）→ × 0.75 = 75 / 110 → 100 / 欠損は係数1
+    assert result['total_score'].tolist() == [75, 100, 20]
+    assert result['a'].tolist() == [90, 90, 0]
+    assert model.score_one({'x': 1.5, 'y': 2})['total_score'] == 75
+
+
+def test_model_roundtrip_and_fingerprint():
+    spec = json.loads(json.dumps(RESEARCHER_SCORE_MODEL.to_dict(), ensure_ascii=False))
+    restored = ScoreModel.from_dict(spec)
+
+    assert restored.fingerprint() == RESEARCHER_SCORE_MODEL.fingerprint()
+    assert restored.with_weights({'size_bonus': 2}).fingerprint() != restored.fingerprint()
+
+
+def _reference_researcher_score(code, sector, market_cap):
+    """ルール表化する前の採点（回帰確認用）"""
+    score = SECTOR_BASE_SCORES.get(sector, 70)
+    score += 5 if market_cap >= 10.0 else 3 if market_cap >= 5.0 else 0 if market_cap >= 2.0 else -3
+    score += SPECIAL_ADJUSTMENTS.get(code, 0)
+    score = max(0, min(100, score))
+    return int(score * 0.75) if market_cap < 2.0 else score
+
+
+def test_researcher_score_matches_reference():
+    df = pd.DataFrame(top100_stocks, columns=["順位", "コード", "企業名", "時価総額(兆円)", "セクター"])
+    expected = [_reference_researcher_score(c, s, m)
+                for c, s, m in zip(df["コード"], df["セクター"], df["時価総額(兆円)"])]
+
+    assert RESEARCHER_SCORE_MODEL.evaluate(df)["researcher_score"].tolist() == expected
+    for (_, row), score in zip(df.iterrows(), expected):
+        assert calculate_researcher_score(row)[0] == score
+
+
+def test_load_universe_and_score(tmp_path):
+    path = tmp_path / 'data_j.csv'
+    pd.DataFrame({
+        'コード': ['7203', '0130A', '8058', '9999'],
+        '銘柄名': ['トヨタ自動車', '新規上場', '三菱商事', 'スタンダード銘柄'],
+        '市場・商品区分': ['プライム（内国株式）'] * 3 + ['スタンダード（内国株式）'],
+        '33業種区分': ['輸送用機器', '建設業', '卸売業', '卸売業'],
+        '時価総額(億円)': [496000, 1500, 149000, 100],
+    }).to_csv(path, index=False, encoding='utf-8-sig')
+
+    df = load_universe(path)
+    assert df['コード'].tolist() == ['7203', '8058', '0130A']   # 時価総額順、先頭の0も保持
+    assert df['No'].tolist() == [1, 2, 3]
+    assert df['セクター'].tolist() == ['輸送機器', '商社', '建設業']
+
+    scored = score_researcher(df)
+    expected = [_reference_researcher_score(c, s, m)
+                for c, s, m in zip(df['コード'], df['セクター'], df['時価総額(兆円)'])]
+    assert scored['researcherスコア'].tolist() == expected
+    assert scored['備考'].tolist() == ['-', '-', DATA_SHORTAGE_NOTE]
@@ -0,0 +1,324 @@
+"""
+テスト: python/models/screening/screening_engine.py
+
+ユニバースの重複除去、出力列、定量スコアの算出をテストします。
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.screening.screening_engine import (
+    BASE_METRICS_FIELDS, CACHE_FIELDS, QUANTITATIVE_COMPONENTS, ScreeningEngine, Universe, UniverseSegment,
+    calculate_quantitative_score, calculate_quantitative_scores, empty_metrics, growth_columns,
+    is_failed_metrics, passes_quote_tier1,
+)
+from python.services.market_data import ConcurrentFetcher, MetricsCache
+
+
+def _fake_fetch(calls):
+    def fetch(ticker, market='JP'):
+        calls.append(ticker)
+        record = empty_metrics(ticker, market)
+        record.update({'name': f'Company {ticker}', 'market_cap': 2_000_000_000_000,
+                       'roe': 16.0, 'pe_ratio': 12.0, 'dividend_yield': 3.5})
+        return record
+    return fetch
+
+
+def _engine(calls):
+    fetcher = ConcurrentFetcher(_fake_fetch(calls), requests_per_second=1000, burst=10)
+    return ScreeningEngine(fetcher=fetcher)
+
+
+def _universe():
+    existing = pd.DataFrame({
+        'rank': [1, 2],
+        'ticker': ['7203', '8306.T'],
+        'final_score': [80.0, 70.0],
+        'market': ['JP', 'JP'],
+        'evaluation_type': ['3agent', '3agent'],
+    })
+    return Universe(
+        name='test',
+        existing=existing,
+        segments=[
+            UniverseSegment('JP', 'JP', ['7203.T', '6758.T', '6758.T', '9984.T'],
+                            columns=growth_columns('JP Growth')),
+            UniverseSegment('US', 'US', ['AAPL', '9984.T', 'aapl', 'MSFT'],
+                            columns=growth_columns('US Growth')),
+        ],
+    )
+
+
+def test_plan_dedupes_against_existing_and_segments():
+    """既存CSV・セグメント間・セグメント内の重複が取得前に除去されることを確認"""
+    plan = _engine([]).plan(_universe())
+    assert plan == {'JP': ['6758.T', '9984.T'], 'US': ['AAPL', 'MSFT']}
+
+
+def test_run_fetches_each_ticker_once():
+    """各銘柄がちょうど1回だけ取得されることを確認"""
+    calls = []
+    _engine(calls).run(_universe(), verbose=False)
+    assert sorted(calls) == ['6758.T', '9984.T', 'AAPL', 'MSFT']
+
+
+def test_output_columns_match_legacy_layout():
+    """従来スクリプトと同じ列順で出力されることを確認"""
+    engine = _engine([])
+    universe = _universe()
+    new_df = engine.evaluate(universe, verbose=False)
+    assert list(new_df.columns) == BASE_METRICS_FIELDS + [
+        'final_score', 'evaluation_type', 'hayato', 'researcher', 'japanese', 'sector']
+
+    all_data = engine.combine(universe, new_df)
+    assert list(all_data['rank']) == list(range(1, 7))
+    assert all_data['final_score'].is_monotonic_decreasing
+
+
+def test_quantitative_score_ladders():
+    """各項目の閾値で点数が正しく加算されることを確認"""
+    metrics = {'market_cap': 2_000_000_000_000, 'roe': 16.0, 'dividend_yield': 3.5,
+               'pe_ratio': 12.0, 'pb_ratio': 0.9, 'debt_to_equity': 60,
+               'current_ratio': 1.2}
+    assert calculate_quantitative_score(metrics) == 15 + 15 + 12 + 15 + 10 + 7 + 4
+
+
+def test_quantitative_score_ignores_missing_values():
+    """欠損値（None）の項目は0点になることを確認"""
+    assert calculate_quantitative_score(empty_metrics('XXXX')) == 0
+
+
+def test_two_stage_fetches_full_metrics_only_for_survivors():
+    """気配情報で除外された銘柄は全指標を取得しないことを確認"""
+    calls, quote_calls = [], []
+    caps = {'1111.T': 500_000_000_000, '2222.T': 5_000_000_000, '3333.T': None}
+
+    def quote(ticker, market='JP'):
+        quote_calls.append(ticker)
+        return {'ticker': ticker, 'market': market, 'price': 1000.0,
+                'market_cap': caps[ticker], 'avg_volume': 1_000_000}
+
+    fetcher = ConcurrentFetcher(_fake_fetch(calls), requests_per_second=1000, burst=10)
+    engine = ScreeningEngine(fetcher=fetcher, quote_filter=passes_quote_tier1, quote_func=quote)
+    universe = Universe(name='two-stage',
+                        segments=[UniverseSegment('日本株', 'JP', list(caps))])
+
+    result = engine.evaluate(universe, verbose=False)
+
+    assert sorted(quote_calls) == sorted(caps)
+    # 時価総額50億円の銘柄は除外、時価総額不明の銘柄は2段目に回す
+    assert sorted(calls) == ['1111.T', '3333.T']
+    assert result['ticker'].tolist() == ['1111.T', '3333.T']
+
+
+def test_passes_quote_tier1_thresholds():
+    base = {'ticker': 'X', 'market': 'JP', 'price': 1000.0, 'market_cap': 50_000_000_000}
+    assert passes_quote_tier1(dict(base, avg_volume=200_000))
+    assert not passes_quote_tier1(dict(base, avg_volume=50_000))  # 売買代金5,000万円
+    assert not passes_quote_tier1(dict(base, market_cap=10_000_000_000, avg_volume=200_000))
+    assert passes_quote_tier1(None)
+
+
+def test_deadline_returns_partial_results_in_priority_order():
+    """制限時間で打ち切り、優先度の高い銘柄から結果が揃うことを確認"""
+    calls = []
+    slow = _fake_fetch(calls)
+
+    def fetch(ticker, market='JP'):
+        time.sleep(0.1)
+        return slow(ticker, market)
+
+    fetcher = ConcurrentFetcher(fetch, max_workers=1, requests_per_second=None)
+    engine = ScreeningEngine(fetcher=fetcher)
+    universe = Universe(name='deadline', segments=[
+        UniverseSegment('日本株', 'JP', ['A.T', 'B.T', 'C.T']),
+        UniverseSegment('米国株', 'US', ['D', 'E']),
+    ])
+    priority = {'E': 5.0, 'C.T': 4.0, 'A.T': 3.0}
+
+    result = engine.evaluate(universe, verbose=False, deadline_seconds=0.25, priority=priority)
+
+    assert calls[:2] == ['E', 'C.T']
+    assert set(result['ticker']) <= {'E', 'C.T', 'A.T'}
+    assert {'E', 'C.T'} <= set(result['ticker'])
+    coverage = result.attrs['coverage'].set_index('segment')
+    assert coverage.loc['米国株', 'planned'] == 2
+    assert coverage.loc['米国株', 'evaluated'] == 1
+    assert result.attrs['top_covered'] >= 2
+
+
+
+def test_permanent_failures_are_excluded_from_output_and_coverage():
+    """再試行後も取得できなかった銘柄は0点の行として出力せず、網羅率にも数えないことを確認"""
+    calls = []
+    good = _fake_fetch(calls)
+
+    def fetch(ticker, market='JP'):
+        return empty_metrics(ticker, market) if ticker == 'BAD.T' else good(ticker, market)
+
+    fetcher = ConcurrentFetcher(fetch, requests_per_second=None, is_failed=is_failed_metrics)
+    engine = ScreeningEngine(fetcher=fetcher)
+    universe = Universe(name='failure', segments=[UniverseSegment('日本株', 'JP', ['A.T', 'BAD.T', 'B.T'])])
+
+    result = engine.evaluate(universe, verbose=False)
+
+    assert result['ticker'].tolist() == ['A.T', 'B.T']
+    coverage = result.attrs['coverage'].iloc[0]
+    assert (coverage['planned'], coverage['evaluated'], coverage['failed']) == (3, 2, 1)
+    assert coverage['coverage'] < 100
+    assert 'BAD.T' not in engine.combine(universe, result)['ticker'].tolist()
+
+
+def test_market_cap_priority_is_ranked_within_each_market(tmp_path):
+    """時価総額の優先度は市場内の順位で比べ、円建ての日本株がドル建ての米国株より常に先にならないことを確認"""
+    calls = []
+    cache = MetricsCache(CACHE_FIELDS, cache_dir=str(tmp_path))
+    caps = {'J1.T': 30e12, 'J2.T': 5e12, 'J3.T': 1e12, 'U1': 3e12, 'U2': 5e11, 'U3': 1e11}
+    for ticker, cap in caps.items():
+        # 前日以前の取得結果（今回は再取得する）
+        cache.put(ticker, {'ticker': ticker, 'market_cap': cap}, fetched_at=time.time() - 3 * 86400)
+
+    fetcher = ConcurrentFetcher(_fake_fetch(calls), max_workers=1, requests_per_second=None, cache=cache)
+    engine = ScreeningEngine(fetcher=fetcher)
+    universe = Universe(name='mixed', segments=[
+        UniverseSegment('日本株', 'JP', ['J3.T', 'J2.T', 'J1.T']),
+        UniverseSegment('米国株', 'US', ['U3', 'U2', 'U1']),
+    ])
+
+    engine.evaluate(universe, verbose=False, priority='market_cap')
+
+    assert calls == ['J1.T', 'U1', 'J2.T', 'U2', 'J3.T', 'U3']
+
+
+def test_deadline_bounds_two_stage_quote_pass():
+    """2段階取得の1段目も制限時間で打ち切り、気配情報を取得できなかった銘柄は未評価とすることを確認"""
+    calls, quote_calls = [], []
+
+    def quote(ticker, market='JP'):
+        quote_calls.append(ticker)
+        time.sleep(0.1)
+        return {'ticker': ticker, 'market': market, 'price': 1000.0,
+                'market_cap': 500_000_000_000, 'avg_volume': 1_000_000}
+
+    fetcher = ConcurrentFetcher(_fake_fetch(calls), max_workers=1, requests_per_second=None)
+    engine = ScreeningEngine(fetcher=fetcher, quote_filter=passes_quote_tier1, quote_func=quote)
+    universe = Universe(name='deadline', segments=[
+        UniverseSegment('日本株', 'JP', ['A.T', 'B.T', 'C.T']),
+        UniverseSegment('米国株', 'US', ['D', 'E']),
+    ])
+
+    started = time.monotonic()
+    result = engine.evaluate(universe, verbose=False, deadline_seconds=0.25,
+                             priority={'E': 5.0, 'C.T': 4.0, 'A.T': 3.0})
+
+    assert time.monotonic() - started < 0.45
+    # 気配情報も全セグメントを通した優先度の順に取得する
+    assert quote_calls[:2] == ['E', 'C.T'] and len(quote_calls) < 5
+    assert set(calls) <= set(quote_calls[:2])
+    coverage = result.attrs['coverage'].set_index('segment')
+    assert coverage['planned'].sum() == 5
+    assert coverage['evaluated'].sum() == len(result) < 5
+
+
+def test_relative_rescores_existing_and_new_rows_together():
+    """相対評価では既存データと新規評価分を1つの母集団として採点し直すことを確認"""
+    calls = []
+    fetcher = ConcurrentFetcher(_fake_fetch(calls), requests_per_second=1000, burst=10)
+    engine = ScreeningEngine(fetcher=fetcher, relative='percentile')
+    existing = pd.DataFrame([
+        dict(empty_metrics('7203.T'), market_cap=40_000_000_000_000, roe=25.0, pe_ratio=9.0,
+             dividend_yield=4.5, final_score=35.0),
+        dict(empty_metrics('8306.T'), market_cap=50_000_000_000, roe=3.0, pe_ratio=40.0,
+             dividend_yield=0.5, final_score=5.0),
+    ])
+    universe = Universe(name='relative', existing=existing,
+                        segments=[UniverseSegment('JP', 'JP', ['6758.T', '9984.T'])])
+
+    all_data = engine.run(universe, verbose=False)
+
+    expected = calculate_quantitative_scores(
+        pd.concat([existing, engine.evaluate(universe, verbose=False)], ignore_index=True),
+        relative='percentile')['quantitative_score'].round(1)
+    scores = all_data.set_index('ticker')['final_score']
+    assert scores.to_dict() == dict(zip(['7203.T', '8306.T', '6758.T', '9984.T'], expected))
+    assert all_data['ticker'].tolist()[0] == '7203.T' and all_data['ticker'].tolist()[-1] == '8306.T'
+
+    # 指標の列がない既存データ（3エージェント評価）とは並べられないため、取得前に拒否する
+    calls.clear()
+    with pytest.raises(ValueError):
+        engine.evaluate(_universe(), verbose=False)
+    assert calls == []
+
+
+def _random_metrics(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # 閾値ちょうどの値、欠損、非数値を混ぜる
+    def column(values, boundaries):
+        values = list(rng.choice(list(values) + list(boundaries), n))
+        for i in rng.choice(n, n // 10, replace=False):
+            values[i] = rng.choice([None, np.nan, 'N/A'])
+        return values
+
+    return pd.DataFrame({
+        'market_cap': column(rng.uniform(0, 2e13, 50), [1e10, 1e11, 1e12, 1e13]),
+        'roe': column(rng.uniform(-10, 40, 50), [5, 10, 15, 20]),
+        'dividend_yield': column(rng.uniform(0, 6, 50), [1.0, 2.0, 3.0, 4.0]),
+        'pe_ratio': column(rng.uniform(-5, 40, 50), [0, 5, 10, 20, 25, 30]),
+        'pb_ratio': column(rng.uniform(0, 4, 50), [1.0, 1.5, 2.0, 3.0]),
+        'debt_to_equity': column(rng.uniform(0, 200, 50), [50, 100, 150]),
+        'current_ratio': column(rng.uniform(0, 3, 50), [1.0, 1.5, 2.0]),
+    })
+
+
+def _reference_quantitative_score(metrics):
+    """ルール表化する前の if/elif による採点（回帰確認用）"""
+    def number(key):
+        value = metrics[key]
+        return value if isinstance(value, (int, float, np.number)) else np.nan
+
+    cap, roe, dy = number('market_cap'), number('roe'), number('dividend_yield')
+    per, pbr = number('pe_ratio'), number('pb_ratio')
+    de, cr = number('debt_to_equity'), number('current_ratio')
+    score = 0
+    score += 20 if cap > 1e13 else 15 if cap > 1e12 else 10 if cap > 1e11 else 5 if cap > 1e10 else 0
+    score += 20 if roe >= 20 else 15 if roe >= 15 else 10 if roe >= 10 else 5 if roe >= 5 else 0
+    score += 15 if dy >= 4 else 12 if dy >= 3 else 8 if dy >= 2 else 4 if dy >= 1 else 0
+    if 10 <= per <= 20:
+        score += 15
+    elif 5 <= per < 10 or 20 < per <= 25:
+        score += 10
+    elif 0 < per < 5 or 25 < per <= 30:
+        score += 5
+    score += 10 if pbr < 1.0 else 8 if pbr < 1.5 else 6 if pbr < 2.0 else 3 if pbr < 3.0 else 0
+    score += 10 if de < 50 else 7 if de < 100 else 4 if de < 150 else 0
+    score += 10 if cr >= 2.0 else 7 if cr >= 1.5 else 4 if cr >= 1.0 else 0
+    return score
+
+
+def test_vectorized_quantitative_score_matches_scalar():
+    """列指向版・スカラー版のスコアが従来の採点と一致することを確認（欠損・非数値・閾値ちょうどを含む）"""
+    df = _random_metrics(2000)
+    expected = [_reference_quantitative_score(row) for row in df.to_dict('records')]
+
+    result = calculate_quantitative_scores(df)
+
+    assert result['quantitative_score'].tolist() == expected
+    assert [calculate_quantitative_score(row) for row in df.to_dict('records')[:200]] == expected[:200]
+    assert (result[QUANTITATIVE_COMPONENTS].sum(axis=1) == result['quantitative_score']).all()
+
+
+def test_vectorized_quantitative_score_numeric_columns_and_weights():
+    df = pd.DataFrame({
+        'market_cap': [2e13, np.nan], 'roe': [16.0, np.nan], 'dividend_yield': [3.5, np.nan],
+        'pe_ratio': [12.0, np.nan], 'pb_ratio': [0.8, np.nan],
+        'debt_to_equity': [40.0, np.nan], 'current_ratio': [2.5, np.nan],
+    })
+    result = calculate_quantitative_scores(df)
+    assert result['quantitative_score'].tolist() == [92, 0]
+
+    weighted = calculate_quantitative_scores(df, weights={'score_roe': 2.0})
+    assert weighted['quantitative_score'].tolist() == [107, 0]
@@ -0,0 +1,82 @@
+"""
+テスト: python/models/screening/journal.py
+
+チェックポイントジャーナルの追記・読み込みと、エンジンの再開動作をテストします。
+"""
+
+from python.models.screening.journal import ScreeningJournal
+from python.models.screening.screening_engine import (
+    ScreeningEngine, Universe, UniverseSegment, empty_metrics,
+)
+from python.services.market_data import ConcurrentFetcher
+
+
+def _fetcher(calls, fail=()):
+    def fetch(ticker, market='JP'):
+        calls.append(ticker)
+        record = empty_metrics(ticker, market)
+        if ticker not in fail:
+            record.update({'market_cap': 2_000_000_000_000, 'roe': 16.0})
+        return record
+    return ConcurrentFetcher(fetch, requests_per_second=1000, burst=10)
+
+
+def _universe():
+    return Universe(name='test', segments=[
+        UniverseSegment('JP', 'JP', ['7203.T', '6758.T', '9984.T'],
+                        columns={'evaluation_type': 'quantitative'}),
+    ])
+
+
+def test_append_and_load_roundtrip(tmp_path):
+    """追記したレコードが読み込めることを確認（同一ティッカーは最後の行を採用）"""
+    journal = ScreeningJournal(str(tmp_path / 'run.journal.jsonl'))
+    journal.append({'ticker': 'A', 'final_score': 10})
+    journal.append({'ticker': 'B', 'final_score': None})
+    journal.append({'ticker': 'A', 'final_score': 20})
+    journal.close()
+
+    records = journal.load()
+    assert list(records) == ['A', 'B']
+    assert records['A']['final_score'] == 20
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    """書き込み途中で切れた最終行を無視し、その後の追記が壊れないことを確認"""
+    path = tmp_path / 'run.journal.jsonl'
+    path.write_text('{"ticker": "A", "final_score": 10}\n{"ticker": "B", "fin', encoding='utf-8')
+
+    journal = ScreeningJournal(str(path))
+    assert list(journal.load()) == ['A']
+
+    journal.append({'ticker': 'C', 'final_score': 30})
+    journal.close()
+    assert list(journal.load()) == ['A', 'C']
+
+
+def test_resume_skips_journaled_tickers(tmp_path):
+    """再開時はジャーナル記録済みの銘柄を取得せず、失敗銘柄のみ再取得することを確認"""
+    journal = ScreeningJournal(str(tmp_path / 'run.journal.jsonl'))
+
+    first_calls = []
+    ScreeningEngine(fetcher=_fetcher(first_calls, fail={'9984.T'})).evaluate(
+        _universe(), verbose=False, journal=journal)
+    assert sorted(journal.load()) == ['6758.T', '7203.T']
+
+    resumed_calls = []
+    df = ScreeningEngine(fetcher=_fetcher(resumed_calls)).evaluate(
+        _universe(), verbose=False, journal=journal, resume=True)
+
+    assert resumed_calls == ['9984.T']
+    assert list(df['ticker']) == ['7203.T', '6758.T', '9984.T']
+    assert df['final_score'].tolist() == [30, 30, 30]
+
+
+def test_fresh_run_resets_journal(tmp_path):
+    """--resume なしの実行ではジャーナルが空から始まることを確認"""
+    journal = ScreeningJournal(str(tmp_path / 'run.journal.jsonl'))
+    journal.append({'ticker': 'OLD', 'final_score': 1})
+    journal.close()
+
+    ScreeningEngine(fetcher=_fetcher([])).evaluate(_universe(), verbose=False, journal=journal)
+    assert 'OLD' not in journal.load()
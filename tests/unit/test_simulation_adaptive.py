@@ -0,0 +1,65 @@
+"""
+テスト: python/models/simulation/adaptive.py
+
+信頼区間の幅による停止（達成がほぼ確実な場合は1バッチ、目標付近では追加）、
+上限での打ち切り、固定回数のシミュレーションとの一致、信頼区間の計算をテストします。
+"""
+
+import numpy as np
+import pytest
+
+from python.models.simulation import (
+    CashFlowSchedule, Contribution, LumpSum, ReturnModel, Stream, simulate, simulate_adaptive,
+)
+from python.models.simulation.adaptive import percentile_interval, wilson_interval
+
+
+def _schedule():
+    return CashFlowSchedule([
+        Stream('既存資産', end=60, periods_per_year=1, flows=[LumpSum(1000.0)]),
+        Stream('積立', start=12, end=60, flows=[Contribution(10.0)]),
+    ], returns=ReturnModel(6.0, 16.1))
+
+
+def test_stops_when_interval_is_narrow_enough():
+    easy = simulate_adaptive(_schedule(), target=500, batch_size=500, tolerance=2.0)
+    assert easy.converged and easy.batches == 1 and easy.simulations == 500
+
+    median = np.median(simulate(_schedule(), 5000, random_state=0).final_values)
+    hard = simulate_adaptive(_schedule(), target=median, batch_size=500, tolerance=4.0)
+    lo, hi = hard.success_interval()
+    assert hard.converged and hard.batches > 1
+    assert hi - lo <= 4.0
+    assert lo <= hard.success_rate(median) <= hi
+
+    # 停止までの結果は同じ seed の固定回数のシミュレーションと一致する
+    fixed = simulate(_schedule(), hard.simulations, random_state=42)
+    np.testing.assert_array_equal(hard.final_values, fixed.final_values)
+    np.testing.assert_array_equal(hard.accounts['積立'], fixed.accounts['積立'])
+
+
+def test_budget_and_percentile_intervals():
+    capped = simulate_adaptive(_schedule(), target=2000, tolerance=0.1, batch_size=400, max_simulations=1000)
+    assert not capped.converged
+    assert capped.simulations == 1000 and capped.batches == 3
+
+    result = simulate_adaptive(_schedule(), percentiles=[10, 50], percentile_tolerance=0.05, batch_size=500)
+    assert result.converged
+    for q, (lo, hi) in result.percentile_intervals.items():
+        estimate = result.percentile(q)
+        assert lo <= estimate <= hi
+        assert hi - lo <= 0.05 * estimate
+
+    with pytest.raises(ValueError):
+        simulate_adaptive(_schedule())
+
+
+def test_interval_helpers():
+    lo, hi = wilson_interval(100, 100)
+    assert hi == 1.0 and 0.95 < lo < 1.0      # 全パス達成でも幅は0にならない
+    lo, hi = wilson_interval(50, 100)
+    assert lo < 0.5 < hi and hi - lo == pytest.approx(0.19, abs=0.01)
+
+    values = np.arange(1000, dtype=float)
+    lo, hi = percentile_interval(values, 50)
+    assert lo < 500 < hi and hi - lo == pytest.approx(2 * 1.96 * np.sqrt(250), abs=2)
@@ -0,0 +1,130 @@
+"""
+テスト: python/models/simulation/
+
+行列演算のシミュレーションが、従来の1パスずつのループ（np.random.seed + スカラーの
+np.random.normal）とビット単位で一致すること、ブロックサイズによらないこと、
+キャッシュフロー・スケジュールの入出金（積立・一括投資・取り崩し）をテストします。
+"""
+
+import numpy as np
+import pytest
+
+from python.models.simulation import (
+    CashFlowSchedule, Contribution, LumpSum, ReturnModel, Stream, Withdrawal, simulate,
+)
+
+MEAN, VOLATILITY = 6.0, 16.1
+
+
+def _schedule():
+    # investment_analysis.monte_carlo_simulation と同じ構成
+    return CashFlowSchedule([
+        Stream('既存資産', end=156, periods_per_year=1, flows=[LumpSum(1120.0)]),
+        Stream('積立2025-2026', end=24, flows=[Contribution(12.3)]),
+        Stream('積立2027-2038', start=24, end=168, flows=[Contribution(16.2)]),
+        Stream('妻NISA', start=36, end=168, flows=[Contribution(5.0)]),
+    ], returns=ReturnModel(MEAN, VOLATILITY))
+
+
+def _reference_loop(simulations, seed=42):
+    """従来の実装（investment_analysis.monte_carlo_simulation）"""
+    np.random.seed(seed)
+    final_values = []
+    for _ in range(simulations):
+        existing_value = 1120.0
+        for year in range(13):
+            annual_return = np.random.normal(MEAN, VOLATILITY)
+            existing_value *= (1 + annual_return / 100)
+        total_value = existing_value
+        for monthly, months in [(12.3, 24), (16.2, 144), (5.0, 132)]:
+            accumulation = 0
+            for month in range(months):
+                annual_return = np.random.normal(MEAN, VOLATILITY)
+                accumulation = (accumulation + monthly) * (1 + annual_return / 12 / 100)
+            total_value = total_value + accumulation
+        final_values.append(total_value)
+    return np.array(final_values)
+
+
+def test_matches_reference_loop_bit_for_bit():
+    expected = _reference_loop(300)
+    result = simulate(_schedule(), simulations=300, random_state=42)
+
+    np.testing.assert_array_equal(result.final_values, expected)
+    target = np.median(expected)
+    assert result.success_rate(target) == np.sum(expected >= target) / 300 * 100
+    np.testing.assert_array_equal(result.percentile([10, 50, 90]), np.percentile(expected, [10, 50, 90]))
+    assert list(result.accounts) == ['既存資産', '積立2025-2026', '積立2027-2038', '妻NISA']
+
+
+def test_accounts_follow_legacy_grouping():
+    # nisa_2026_strategy_analysis と同じ形: 資産ごとのリターン、リターン不明の資産は運用しない
+    allocation = {'除く日本': 120, 'S&P500': 0, '配当株・REIT': 60, '不明': 30}
+    models = {'除く日本': (12.8, 16.3), '配当株・REIT': (4.0, 12.0)}
+
+    np.random.seed(42)
+    expected = []
+    for _ in range(200):
+        existing_value = 1000.0
+        for year in range(3):
+            existing_value *= (1 + np.random.normal(12.8, 16.3) / 100)
+        new_investment_value = 0
+        for asset, amount in allocation.items():
+            if amount > 0:
+                value = amount
+                for year in range(2):
+                    if asset not in models:
+                        continue
+                    value *= (1 + np.random.normal(*models[asset]) / 100)
+                new_investment_value += value
+        accumulation = 0
+        for month in range(12):
+            accumulation = (accumulation + 16.2) * (1 + np.random.normal(12.5, 16.1) / 12 / 100)
+        expected.append(existing_value + new_investment_value + accumulation)
+
+    streams = [Stream('既存資産', end=36, periods_per_year=1, returns=ReturnModel(12.8, 16.3),
+                      flows=[LumpSum(1000.0)])]
+    for asset, amount in allocation.items():
+        if amount > 0:
+            returns = ReturnModel(*models[asset]) if asset in models else None
+            streams.append(Stream(asset, start=12, end=36 if returns else 12, periods_per_year=1,
+                                  returns=returns, flows=[LumpSum(amount)], account='2026年投資分'))
+    streams.append(Stream('積立', start=24, end=36, returns=ReturnModel(12.5, 16.1), flows=[Contribution(16.2)]))
+    result = simulate(CashFlowSchedule(streams), simulations=200, random_state=42, block_size=64)
+
+    np.testing.assert_array_equal(result.final_values, np.array(expected))
+    assert list(result.accounts) == ['既存資産', '2026年投資分', '積立']
+
+
+def test_block_size_and_deterministic_cash_flows():
+    whole = simulate(_schedule(), simulations=250, block_size=1000)
+    blocks = simulate(_schedule(), simulations=250, block_size=64)
+    np.testing.assert_array_equal(whole.final_values, blocks.final_values)
+    assert whole.simulations == 250
+
+    # 標準偏差0なら確定的な計算と一致する（月1%）
+    flat = ReturnModel(12.0, 0.0)
+    schedule = CashFlowSchedule([
+        Stream('積立', end=12, flows=[LumpSum(100.0), Contribution(1.0, start=6), LumpSum(50.0, month=9),
+                                     LumpSum(7.0, month=12)]),
+        Stream('取り崩し', end=12, flows=[LumpSum(10.0), Withdrawal(3.0)]),
+    ], returns=flat)
+    result = simulate(schedule, simulations=3)
+
+    expected = 0.0
+    for month in range(12):
+        expected += (100.0 if month == 0 else 0) + (1.0 if month >= 6 else 0) + (50.0 if month == 9 else 0)
+        expected *= 1.01
+    expected += 7.0   # 運用終了時の一括投資は運用しない
+    np.testing.assert_allclose(result.accounts['積立'], expected)
+
+    depleted = 0.0
+    for month in range(12):
+        depleted = max(depleted + (10.0 if month == 0 else 0) - 3.0, 0) * 1.01
+    assert depleted == 0
+    np.testing.assert_allclose(result.accounts['取り崩し'], depleted)
+
+    with pytest.raises(ValueError):
+        Stream('年次', end=18, periods_per_year=1)
+    with pytest.raises(ValueError):
+        simulate(CashFlowSchedule([Stream('リターンなし', end=12)]), simulations=1)
@@ -0,0 +1,69 @@
+"""
+テスト: python/models/simulation/parallel.py, sketch.py
+
+シャードごとの乱数系列（SeedSequence.spawn）による並列シミュレーションが
+ワーカー数によらずビット単位で一致すること、分位点スケッチの精度と合成をテストします。
+"""
+
+import numpy as np
+import pytest
+
+from python.models.simulation import (
+    CashFlowSchedule, Contribution, LumpSum, QuantileSketch, ReturnModel, Stream, simulate, simulate_parallel,
+)
+from python.models.simulation.parallel import shard_sizes
+
+
+def _schedule():
+    return CashFlowSchedule([
+        Stream('既存資産', end=60, periods_per_year=1, flows=[LumpSum(1000.0)]),
+        Stream('積立', end=60, flows=[Contribution(10.0)]),
+    ], returns=ReturnModel(6.0, 16.1))
+
+
+def test_results_do_not_depend_on_worker_count():
+    kwargs = dict(targets=[1500, 2000], seed=7, shard_size=700)
+    serial = simulate_parallel(_schedule(), 3000, workers=1, **kwargs)
+    pooled = simulate_parallel(_schedule(), 3000, workers=2, **kwargs)
+
+    assert serial.shards == 5
+    assert serial.successes == pooled.successes
+    assert serial.total == pooled.total
+    np.testing.assert_array_equal(serial.percentile([1, 50, 99]), pooled.percentile([1, 50, 99]))
+
+    # シャード i は SeedSequence(seed).spawn した i 番目の系列で評価される
+    seeds = np.random.SeedSequence(7).spawn(5)
+    values = np.concatenate([
+        simulate(_schedule(), size, random_state=np.random.Generator(np.random.PCG64(s))).final_values
+        for size, s in zip(shard_sizes(3000, 700), seeds)
+    ])
+    assert serial.successes[1500] == np.count_nonzero(values >= 1500)
+    assert serial.success_rate(2000) == np.count_nonzero(values >= 2000) / 3000 * 100
+    assert serial.mean() == pytest.approx(values.mean())
+    with pytest.raises(KeyError):
+        serial.success_rate(2500)
+
+
+def test_quantile_sketch_accuracy_and_merge():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(7, 0.8, 20000), -rng.lognormal(3, 1, 500), np.zeros(50)])
+    rng.shuffle(values)
+    sketch = QuantileSketch.from_values(values, relative_accuracy=0.005)
+
+    qs = np.array([0, 0.01, 0.1, 0.5, 0.9, 0.999, 1])
+    exact = np.sort(values)[np.floor(qs * (len(values) - 1)).astype(int)]
+    estimate = sketch.quantile(qs)
+    assert np.all(np.abs(estimate - exact) <= 0.005 * np.abs(exact) + 1e-12)
+
+    # 合成の順序によらない
+    parts = [QuantileSketch.from_values(chunk, 0.005) for chunk in np.array_split(values, 4)]
+    forward, backward = QuantileSketch(0.005), QuantileSketch(0.005)
+    for part in parts:
+        forward.merge(part)
+    for part in reversed(parts):
+        backward.merge(part)
+    np.testing.assert_array_equal(forward.quantile(qs), estimate)
+    np.testing.assert_array_equal(backward.quantile(qs), estimate)
+
+    with pytest.raises(ValueError):
+        forward.merge(QuantileSketch(0.01))
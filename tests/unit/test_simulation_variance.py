@@ -0,0 +1,57 @@
+"""
+テスト: python/models/simulation/variance.py
+
+制御変量の期待値（複利計算の式）、分散減少法（対称変量・Sobol 列・制御変量）の
+推定値が単純なモンテカルロの結果と整合し、分散減少率が報告されることをテストします。
+"""
+
+import numpy as np
+import pytest
+
+from python.models.simulation import (
+    CashFlowSchedule, Contribution, LumpSum, ReturnModel, Stream, Withdrawal, estimate_success_probability, simulate,
+)
+
+
+def _schedule():
+    return CashFlowSchedule([
+        Stream('既存資産', end=60, periods_per_year=1, flows=[LumpSum(1000.0)]),
+        Stream('積立', start=12, end=60, flows=[Contribution(10.0)]),
+    ], returns=ReturnModel(6.0, 16.1))
+
+
+def test_expected_final_value_matches_compound_investment():
+    # investment_analysis.compound_investment と同じ年金終価の式（期首積立）
+    monthly_rate = 6.0 / 12 / 100
+    compound = 10.0 * (((1 + monthly_rate) ** 48 - 1) / monthly_rate) * (1 + monthly_rate)
+    expected = 1000.0 * 1.06 ** 5 + compound
+    assert _schedule().expected_final_value() == pytest.approx(expected, rel=1e-12)
+
+    values = simulate(_schedule(), simulations=40000, random_state=0).final_values
+    assert values.mean() == pytest.approx(expected, rel=0.01)
+
+    with pytest.raises(ValueError):
+        CashFlowSchedule([Stream('取り崩し', end=12, flows=[LumpSum(100.0), Withdrawal(1.0)])],
+                         returns=ReturnModel(6.0, 16.1)).expected_final_value()
+
+
+def test_estimates_agree_and_report_variance_reduction():
+    values = simulate(_schedule(), simulations=100000, random_state=1).final_values
+    target = np.percentile(values, 40)
+    truth = np.mean(values >= target) * 100
+
+    plain = estimate_success_probability(_schedule(), target, 4096, method='plain', control_variate=False)
+    assert plain.variance_reduction == pytest.approx(1.0, abs=0.01)
+
+    for method, control_variate in [('plain', True), ('antithetic', False), ('antithetic', True), ('sobol', False)]:
+        estimate = estimate_success_probability(_schedule(), target, 4096, method, control_variate)
+        lo, hi = estimate.confidence_interval(0.999)
+        assert lo <= truth <= hi, (method, control_variate)
+        assert estimate.variance_reduction > 1.2, (method, control_variate)
+        assert estimate.equivalent_simulations > estimate.simulations
+        assert '分散減少率' in estimate.summary()
+
+    sobol = estimate_success_probability(_schedule(), target, 5000, method='sobol', replicates=4)
+    assert sobol.simulations == 4 * 1024
+    with pytest.raises(ValueError):
+        estimate_success_probability(_schedule(), target, method='importance')
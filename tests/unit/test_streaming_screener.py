@@ -0,0 +1,94 @@
+"""
+テスト: python/models/screening/streaming.py
+
+チャンク単位の上位K件・逐次集計が、全件を読み込んでソート・集計した結果と
+一致すること（チャンクサイズによらない）をテストします。
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python.models.scoring import RangeFilter
+from python.models.screening.imura_factors import IMURA_TIER2_MODEL
+from python.models.screening.streaming import RunningStats, StreamingScreener, TopK, iter_chunks
+
+
+def _universe(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ticker': [f'T{i}' for i in range(n)],
+        'market': rng.choice(['JP', 'US'], n),
+        'sector': rng.choice(['Tech', 'Finance', 'Energy', 'Health'], n),
+        'score': rng.integers(0, 50, n).astype(float),  # 同点を多く含む
+        'pe_ratio': rng.uniform(0, 40, n),
+        'roe': rng.uniform(-5, 30, n),
+        'dividend_yield': rng.uniform(0, 700, n),
+    })
+    df.loc[::13, 'score'] = np.nan
+    return df
+
+
+def _expected_top(df, k, by='score', group=None):
+    ranked = df[df[by].notna()].sort_values(by, ascending=False, kind='stable')
+    if group is not None:
+        ranked = ranked[ranked['market'] == group]
+    return ranked.head(k)['ticker'].tolist()
+
+
+@pytest.mark.parametrize('chunksize', [251, 1000, 10_000])
+def test_top_k_matches_full_sort(chunksize):
+    df = _universe()
+    overall = TopK(25, 'score')
+    by_market = TopK(25, 'score', group_by='market')
+    for chunk in iter_chunks(df, chunksize):
+        overall.update(chunk)
+        by_market.update(chunk)
+
+    assert overall.frame()['ticker'].tolist() == _expected_top(df, 25)
+    for market in ('JP', 'US'):
+        assert by_market.frame(market)['ticker'].tolist() == _expected_top(df, 25, group=market)
+
+    smallest = TopK(5, 'score', ascending=True)
+    for chunk in iter_chunks(df, chunksize):
+        smallest.update(chunk)
+    expected = df[df['score'].notna()].sort_values('score', kind='stable').head(5)['ticker'].tolist()
+    assert smallest.frame()['ticker'].tolist() == expected
+
+
+def test_running_stats_match_groupby():
+    df = _universe()
+    stats = RunningStats('score', group_by='market')
+    overall = RunningStats('score')
+    for chunk in iter_chunks(df, 333):
+        stats.update(chunk)
+        overall.update(chunk)
+
+    expected = df.groupby('market')['score'].agg(['count', 'mean', 'std', 'min', 'max'])
+    pd.testing.assert_frame_equal(stats.frame(), expected, check_names=False, check_dtype=False)
+    assert overall.frame().loc[0, 'mean'] == pytest.approx(df['score'].mean())
+    assert overall.frame().loc[0, 'std'] == pytest.approx(df['score'].std())
+
+
+def test_streaming_screener_from_csv(tmp_path):
+    df = _universe()
+    path = tmp_path / 'universe.csv'
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+    screener = StreamingScreener(
+        filters=[RangeFilter('PER 5-30倍', 'pe_ratio', min=5, max=30),
+                 RangeFilter('ROE ≥ 8%', 'roe', min=8.0)],
+        score=IMURA_TIER2_MODEL, k=10, group_by=['market', ('market', 'sector')], chunksize=700,
+    )
+    result = screener.run(str(path))
+
+    loaded = pd.read_csv(path, encoding='utf-8-sig')
+    passed = loaded[loaded['pe_ratio'].between(5, 30) & (loaded['roe'] >= 8.0)]
+    scored = passed.join(IMURA_TIER2_MODEL.evaluate(passed))
+
+    assert result.rows == len(df) and result.passed == len(passed)
+    assert result.filters['evaluated'].sum() - result.filters['rejected'].sum() >= len(passed)
+    assert result.top.frame()['ticker'].tolist() == _expected_top(scored, 10, by='total_score')
+    jp_tech = result.by_group['market/sector'].frame(('JP', 'Tech'))
+    expected = scored[(scored['market'] == 'JP') & (scored['sector'] == 'Tech')]
+    assert jp_tech['ticker'].tolist() == _expected_top(expected, 10, by='total_score')